@@ -54,6 +54,18 @@ SETTINGS = dict(
     character_desc_label2='Traits',
     character_desc_label3='',
     location_desc_label='Summary',
+    cache_dir='',
+    cache_size='100',
+    json_backend='auto',
+    csv_workers='0',
+)
+
+OPTIONS = dict(
+    use_mmap=True,
+    use_offset_index=False,
+    use_cache=False,
+    preflight=False,
+    parallel_csv=False,
 )
 
 
@@ -79,7 +91,7 @@ def main(sourcePath, suffix, silent=True):
     else:
         sourceDir += '/'
     iniFiles = [f'{sourceDir}{iniFileName}']
-    configuration = Configuration(SETTINGS)
+    configuration = Configuration(SETTINGS, OPTIONS)
     for iniFile in iniFiles:
         configuration.read(iniFile)
     kwargs = {'suffix': suffix}
@@ -10,6 +10,7 @@ odt_full_synopsis -- Provide a class for Markdown scene descriptions export.
 odt_location_sheets -- Provide a class for Markdown descriptions export.
 odt_report -- Provide a class for Markdown project report export.
 aeon3md_converter -- Provide an Aeon3 converter class for yWriter projects. 
+project_cache -- Provide a class for a persistent cache of parsed Aeon Timeline 3 projects.
 aeon3md_cnv_uno -- Provide a converter class for universal import and export. 
 ui_uno -- Provide a UNO user interface facade class.
 uno_tools -- Provide Python wrappers for UNO widgets.
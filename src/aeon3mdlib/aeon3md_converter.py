@@ -4,6 +4,8 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/aeon3md
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import os
+from pywriter.pywriter_globals import ERROR
 from pywriter.converter.yw_cnv_ff import YwCnvFf
 from aeon3ywlib.csv_timeline3 import CsvTimeline3
 from aeon3ywlib.json_timeline3 import JsonTimeline3
@@ -14,11 +16,19 @@ from aeon3mdlib.md_chapter_overview import MdChapterOverview
 from aeon3mdlib.md_character_sheets import MdCharacterSheets
 from aeon3mdlib.md_location_sheets import MdLocationSheets
 from aeon3mdlib.md_report import MdReport
+from aeon3mdlib.project_cache import ProjectCache
 
 
 class Aeon3mdConverter(YwCnvFf):
     """A converter for universal export from a yWriter 7 project.
 
+    Public methods:
+        run(sourcePath, **kwargs) -- create source and target objects and run conversion.
+        convert(source, target) -- convert source into target and return a message.
+
+    Public instance variables:
+        projectCache -- ProjectCache instance, or None if the cache is not used.
+
     Overrides the superclass constants EXPORT_SOURCE_CLASSES,
     EXPORT_TARGET_CLASSES.
     """
@@ -35,3 +45,76 @@ class Aeon3mdConverter(YwCnvFf):
         MdLocationSheets,
         MdReport,
         ]
+
+    def __init__(self):
+        """Initialize instance variables.
+        
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self.projectCache = None
+
+    def run(self, sourcePath, **kwargs):
+        """Create source and target objects and run conversion.
+
+        Positional arguments: 
+            sourcePath -- str: the source file path.
+        
+        Required keyword arguments: 
+            suffix -- str: target file name suffix.
+
+        Optional keyword arguments:
+            use_cache -- bool: if True, use the project cache.
+            cache_dir -- str: path to the cache directory.
+            cache_size -- str: maximum size of the cache in megabytes.
+
+        Restrict the source's model to the parts needed by the target.
+        Extends the superclass method.
+        """
+        for fileClass in self.EXPORT_TARGET_CLASSES:
+            if fileClass.SUFFIX == kwargs['suffix']:
+                kwargs['model_parts'] = fileClass.MODEL_PARTS
+                break
+
+        if kwargs.get('use_cache', False):
+            self.projectCache = ProjectCache(self.ui, **kwargs)
+        else:
+            self.projectCache = None
+        super().run(sourcePath, **kwargs)
+
+    def convert(self, source, target):
+        """Convert source into target and return a message.
+
+        Positional arguments:
+            source, target -- Novel subclass instances.
+
+        If the source's model is cached, skip reading the source file.
+        Otherwise, read the source file, show the source's message, e.g. a warning, and update the cache.
+        Return a message beginning with the ERROR constant in case of error.
+        Overrides the superclass method.
+        """
+        if source.filePath is None:
+            return f'{ERROR}Source "{os.path.normpath(source.filePath)}" is not of the supported type.'
+
+        if not os.path.isfile(source.filePath):
+            return f'{ERROR}"{os.path.normpath(source.filePath)}" not found.'
+
+        if target.filePath is None:
+            return f'{ERROR}Target "{os.path.normpath(target.filePath)}" is not of the supported type.'
+
+        if os.path.isfile(target.filePath) and not self._confirm_overwrite(target.filePath):
+            return f'{ERROR}Action canceled by user.'
+
+        if self.projectCache is None or not self.projectCache.load(source):
+            message = source.read()
+            if message.startswith(ERROR):
+                return message
+
+            self.ui.set_info_how(message)
+            if self.projectCache is not None:
+                self.projectCache.store(source)
+        message = target.merge(source)
+        if message.startswith(ERROR):
+            return message
+
+        return target.write()
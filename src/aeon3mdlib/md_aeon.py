@@ -9,14 +9,18 @@ from pywriter.file.file_export import FileExport
 
 class MdAeon(FileExport):
     """Markdown Aeon Timeline import file representation.
+
+    Class constants:
+        MODEL_PARTS -- tuple of str: parts of the novel model to be read from the source.
     """
     EXTENSION = '.md'
+    MODEL_PARTS = ('scenes', 'dates', 'relationships', 'narrative', 'characters', 'locations', 'items')
 
     def _get_characterMapping(self, crId):
         """Return a mapping dictionary for a character section. 
         
         Positional arguments:
-            crId -- str: character ID.
+            crId -- int: character ID.
         
         Extends the superclass method.
         """
@@ -33,7 +37,7 @@ class MdAeon(FileExport):
         """Return a mapping dictionary for a location section. 
         
         Positional arguments:
-            lcId -- str: location ID.
+            lcId -- int: location ID.
 
         Extends the superclass method.
         """
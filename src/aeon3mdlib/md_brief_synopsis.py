@@ -14,6 +14,7 @@ class MdBrieflSynopsis(MdAeon):
     """
     DESCRIPTION = 'Brief synopsis'
     SUFFIX = '_brief_synopsis'
+    MODEL_PARTS = ('scenes', 'narrative')
 
     _partTemplate = '''# $Desc
 
@@ -14,6 +14,7 @@ class MdChapterOverview(MdAeon):
     """
     DESCRIPTION = 'Chapter overview'
     SUFFIX = '_chapter_overview'
+    MODEL_PARTS = ('narrative',)
 
     _partTemplate = '''# $Desc
 
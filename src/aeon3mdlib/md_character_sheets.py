@@ -14,6 +14,7 @@ class MdCharacterSheets(MdAeon):
     """
     DESCRIPTION = 'Character sheets'
     SUFFIX = '_character_sheets'
+    MODEL_PARTS = ('characters',)
 
     _characterTemplate = '''## $Title$FullName$AKA
 
@@ -14,6 +14,7 @@ class MdFullSynopsis(MdAeon):
     """
     DESCRIPTION = 'Full synopsis'
     SUFFIX = '_full_synopsis'
+    MODEL_PARTS = ('scenes', 'narrative')
 
     _partTemplate = '''# $Title
     
@@ -14,6 +14,7 @@ class MdLocationSheets(MdAeon):
     """
     DESCRIPTION = 'Location sheets'
     SUFFIX = '_location_sheets'
+    MODEL_PARTS = ('locations',)
 
     _locationTemplate = '''## $Title$AKA
     
@@ -14,6 +14,7 @@ class MdOutline(MdAeon):
     """
     DESCRIPTION = 'Outline'
     SUFFIX = '_outline'
+    MODEL_PARTS = ('scenes', 'narrative')
 
     _partTemplate = '''# $Title
     
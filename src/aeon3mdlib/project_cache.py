@@ -0,0 +1,195 @@
+"""Provide a class for a persistent cache of parsed Aeon Timeline 3 projects.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import pickle
+import hashlib
+import zlib
+from aeon3ywlib.scene_table import SceneTable
+
+
+class ProjectCache:
+    """On-disk cache of novel models built from Aeon Timeline 3 sources.
+
+    Public methods:
+        load(source) -- set the source's model from the cache.
+        store(source) -- save the source's model in the cache.
+
+    Public instance variables:
+        cacheDir -- str: path to the cache directory.
+        maxSize -- int: maximum size of all cache files in bytes.
+        hits -- int: number of successful loads.
+        misses -- int: number of failed loads.
+        evictions -- int: number of cache files removed to keep the size limit.
+
+    Each source file is cached in a separate file, named after a hash of
+    the source file's path, size, modification time and fingerprint,
+    and of the model version and the settings affecting the model.
+    The cache files' modification time is the time of last use;
+    the least recently used files are evicted first.
+    """
+    DEFAULT_DIR = f'{os.path.expanduser("~")}/.pywriter/aeon3md/cache'
+    DEFAULT_SIZE = 100
+    # Megabytes.
+
+    EXTENSION = '.pickle'
+
+    MODEL_VERSION = 2
+    # To be incremented when the model representation changes, e.g. the entity ID type.
+
+    FINGERPRINT_SIZE = 4096
+    # Number of bytes at the beginning and at the end of the source file to be checksummed.
+
+    MODEL_ATTRIBUTES = dict(
+        scenes=(dict, SceneTable),
+        chapters=dict,
+        srtChapters=list,
+        characters=dict,
+        srtCharacters=list,
+        locations=dict,
+        srtLocations=list,
+        items=dict,
+        srtItems=list,
+        )
+    # Cached instance variables of the novel model, and their types.
+
+    def __init__(self, ui, **kwargs):
+        """Initialize instance variables.
+
+        Positional arguments:
+            ui -- Ui instance for reporting hits, misses, and evictions.
+
+        Required keyword arguments:
+            cache_dir -- str: path to the cache directory (if empty, use the default directory).
+            cache_size -- str: maximum size of the cache in megabytes.
+
+        All other keyword arguments, except the suffix, are considered part of the settings.
+        """
+        self._ui = ui
+        self.cacheDir = kwargs['cache_dir']
+        if not self.cacheDir:
+            self.cacheDir = self.DEFAULT_DIR
+        try:
+            self.maxSize = int(kwargs['cache_size']) * 1024 * 1024
+        except ValueError:
+            self.maxSize = self.DEFAULT_SIZE * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        settings = []
+        for setting in sorted(kwargs):
+            if setting == 'suffix' or setting.startswith('cache_') or setting == 'use_cache':
+                continue
+
+            settings.append(f'{setting}={kwargs[setting]!r}')
+        self._settingsHash = hashlib.sha1('\n'.join(settings).encode('utf-8')).hexdigest()
+
+    def load(self, source):
+        """Set the source's model from the cache.
+
+        Positional arguments:
+            source -- Novel subclass instance whose file is cached.
+
+        A cache file that is incomplete or not of the current model representation
+        is a miss, and the source is left unchanged for reading its file.
+        Return True in case of a cache hit, otherwise False.
+        """
+        cacheFile = self._get_cache_file(source)
+        try:
+            with open(cacheFile, 'rb') as f:
+                model = pickle.load(f)
+            for attribute, attributeType in self.MODEL_ATTRIBUTES.items():
+                if not isinstance(model[attribute], attributeType):
+                    raise TypeError
+
+        except:
+            self.misses += 1
+            self._ui.set_info_how(f'Project cache miss for "{os.path.normpath(source.filePath)}".')
+            return False
+
+        for attribute in self.MODEL_ATTRIBUTES:
+            setattr(source, attribute, model[attribute])
+        try:
+            os.utime(cacheFile)
+            # Mark the cache file as recently used.
+        except:
+            pass
+        self.hits += 1
+        self._ui.set_info_how(f'Project cache hit for "{os.path.normpath(source.filePath)}".')
+        return True
+
+    def store(self, source):
+        """Save the source's model in the cache.
+
+        Positional arguments:
+            source -- Novel subclass instance whose file has been read.
+
+        Evict the least recently used cache files, if the size limit is exceeded.
+        The cache is optional, so write errors are ignored.
+        """
+        cacheFile = self._get_cache_file(source)
+        if cacheFile is None:
+            return
+
+        model = {}
+        for attribute in self.MODEL_ATTRIBUTES:
+            model[attribute] = getattr(source, attribute)
+        try:
+            os.makedirs(self.cacheDir, exist_ok=True)
+            with open(f'{cacheFile}.tmp', 'wb') as f:
+                pickle.dump(model, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(f'{cacheFile}.tmp', cacheFile)
+        except:
+            return
+
+        self._evict(cacheFile)
+
+    def _get_cache_file(self, source):
+        """Return the path of the source's cache file, or None if the source file cannot be read."""
+        try:
+            stat = os.stat(source.filePath)
+            with open(source.filePath, 'rb') as f:
+                fingerprint = zlib.crc32(f.read(self.FINGERPRINT_SIZE))
+                f.seek(max(stat.st_size - self.FINGERPRINT_SIZE, 0))
+                fingerprint = zlib.crc32(f.read(), fingerprint)
+        except:
+            return None
+
+        key = (
+            f'{type(source).__name__}\n{os.path.realpath(source.filePath)}\n'
+            f'{stat.st_size}\n{stat.st_mtime_ns}\n{fingerprint}\n{self.MODEL_VERSION}\n{self._settingsHash}'
+            )
+        return f'{self.cacheDir}/{hashlib.sha1(key.encode("utf-8")).hexdigest()}{self.EXTENSION}'
+
+    def _evict(self, keepFile):
+        """Remove the least recently used cache files until the size limit is kept.
+
+        Positional arguments:
+            keepFile -- str: path of the cache file just written, which is not to be removed.
+        """
+        cacheFiles = []
+        totalSize = 0
+        for entry in os.scandir(self.cacheDir):
+            if entry.name.endswith(self.EXTENSION):
+                stat = entry.stat()
+                cacheFiles.append((stat.st_mtime_ns, entry.path, stat.st_size))
+                totalSize += stat.st_size
+        cacheFiles.sort()
+        for __, cacheFile, size in cacheFiles:
+            if totalSize <= self.maxSize:
+                break
+
+            if os.path.samefile(cacheFile, keepFile):
+                continue
+
+            try:
+                os.remove(cacheFile)
+            except:
+                continue
+
+            totalSize -= size
+            self.evictions += 1
+            self._ui.set_info_how(f'Project cache: "{os.path.basename(cacheFile)}" evicted.')
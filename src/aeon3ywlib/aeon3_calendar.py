@@ -0,0 +1,182 @@
+"""Provide functions for Aeon Timeline 3 timestamp and duration calculation.
+
+Aeon Timeline 3 timestamps count the seconds since 0001-01-01 00:00:00
+in the proleptic Gregorian calendar.
+The calculation is done with integers, without creating datetime objects.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from bisect import bisect_right
+from functools import lru_cache
+from datetime import datetime
+from datetime import timedelta
+
+SECONDS_PER_DAY = 86400
+MIN_YEAR = 1
+MAX_YEAR = 9999
+MAX_TIMESTAMP = (MAX_YEAR * 365 + MAX_YEAR // 4 - MAX_YEAR // 100 + MAX_YEAR // 400) * SECONDS_PER_DAY
+# Timestamps from 10000-01-01 on are out of range.
+
+_yearOffsets = []
+# Days before January 1st of each year, starting with year 1; built on first use.
+
+_monthOffsets = {}
+# Days before the first day of each month, by leap year flag; built on first use.
+
+CACHE_SIZE = 65536
+# Maximum number of memoized date and time strings each;
+# the least recently used ones are discarded first.
+
+TWO_DIGITS = tuple(f'{i:02d}' for i in range(100))
+
+
+def is_leap_year(year):
+    """Return True if the year is a leap year."""
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def get_month_offsets(leapYear):
+    """Return a tuple of the days before the first day of each month, plus the days of the year.
+
+    Positional arguments:
+        leapYear -- bool: if True, return the table for leap years.
+    """
+    if not leapYear in _monthOffsets:
+        monthLengths = (31, 29 if leapYear else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+        offsets = [0]
+        for monthLength in monthLengths:
+            offsets.append(offsets[-1] + monthLength)
+        _monthOffsets[leapYear] = tuple(offsets)
+    return _monthOffsets[leapYear]
+
+
+def get_year_offsets():
+    """Return a list of the days before January 1st of each year from MIN_YEAR to MAX_YEAR + 1."""
+    if not _yearOffsets:
+        days = 0
+        for year in range(MIN_YEAR, MAX_YEAR + 2):
+            _yearOffsets.append(days)
+            days += 366 if is_leap_year(year) else 365
+    return _yearOffsets
+
+
+def get_ordinal(year, month, day):
+    """Return the day count since 0001-01-01, which is day 0.
+
+    Positional arguments:
+        year, month, day -- int: date.
+
+    Raise a ValueError if the date is invalid or out of range.
+    """
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise ValueError(f'Year {year} is out of range.')
+
+    if not 1 <= month <= 12:
+        raise ValueError(f'Month {month} is out of range.')
+
+    monthOffsets = get_month_offsets(is_leap_year(year))
+    if not 1 <= day <= monthOffsets[month] - monthOffsets[month - 1]:
+        raise ValueError(f'Day {day} is out of range for month {month}.')
+
+    return get_year_offsets()[year - MIN_YEAR] + monthOffsets[month - 1] + day - 1
+
+
+def get_ymd(ordinal):
+    """Return a tuple (year, month, day) for the day count since 0001-01-01.
+
+    Positional arguments:
+        ordinal -- int: days since 0001-01-01, which is day 0.
+    """
+    yearOffsets = get_year_offsets()
+    yearIndex = bisect_right(yearOffsets, ordinal) - 1
+    dayOfYear = ordinal - yearOffsets[yearIndex]
+    year = yearIndex + MIN_YEAR
+    monthOffsets = get_month_offsets(is_leap_year(year))
+    month = bisect_right(monthOffsets, dayOfYear)
+    return year, month, dayOfYear - monthOffsets[month - 1] + 1
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_date(ordinal):
+    """Return an ISO date string for the day count since 0001-01-01.
+
+    Positional arguments:
+        ordinal -- int: days since 0001-01-01, which is day 0.
+
+    The results are memoized, because timelines repeat dates a lot.
+    """
+    year, month, day = get_ymd(ordinal)
+    return f'{year:04d}-{TWO_DIGITS[month]}-{TWO_DIGITS[day]}'
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_time(seconds):
+    """Return an ISO time string for the seconds since midnight.
+
+    Positional arguments:
+        seconds -- int: seconds since midnight.
+
+    The results are memoized, because timelines repeat times a lot.
+    """
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return f'{TWO_DIGITS[hour]}:{TWO_DIGITS[minute]}:{TWO_DIGITS[second]}'
+
+
+def get_date_time(timestamp):
+    """Return ISO date and time strings for an Aeon timestamp.
+
+    Positional arguments:
+        timestamp -- int: seconds since 0001-01-01 00:00:00.
+
+    The strings are the same as returned by datetime.isoformat().
+    Timestamps that are not integers, or out of range, are handled by datetime.
+    Return a tuple (dateStr, timeStr).
+    """
+    if type(timestamp) is not int or not 0 <= timestamp < MAX_TIMESTAMP:
+        return tuple((datetime.min + timedelta(seconds=timestamp)).isoformat().split('T'))
+
+    ordinal, seconds = divmod(timestamp, SECONDS_PER_DAY)
+    return get_date(ordinal), get_time(seconds)
+
+
+def get_duration(timestamp, years, months, weeks, days, hours, minutes, seconds):
+    """Return the duration of an Aeon event in days, hours, and minutes.
+
+    Positional arguments:
+        timestamp -- int or float: start of the event; seconds since 0001-01-01 00:00:00.
+        years, months, weeks, days, hours, minutes, seconds -- int: duration components.
+
+    Years and months are counted from the start date, ignoring the time of day.
+    The other components are normalized, so that hours < 24 and minutes < 60.
+    Seconds are truncated to minutes.
+    Raise a ValueError if the end date calculated by years and months does not exist.
+    Return a tuple of ints (lastsDays, lastsHours, lastsMinutes).
+    """
+    if years > 0 or months > 0:
+        startOrdinal = int(timestamp // SECONDS_PER_DAY)
+        startYear, startMonth, startDay = get_ymd(startOrdinal)
+        endYear = startYear + years
+        endMonth = startMonth
+        if months > 0:
+            endMonth += months
+            while endMonth > 12:
+                endMonth -= 12
+                endYear += 1
+        lastsDays = get_ordinal(endYear, endMonth, startDay) - startOrdinal
+    else:
+        lastsDays = 0
+    lastsDays += weeks * 7
+    lastsDays += days
+    lastsDays += hours // 24
+    lastsHours = hours % 24
+    lastsHours += minutes // 60
+    lastsMinutes = minutes % 60
+    lastsMinutes += seconds // 60
+    lastsHours += lastsMinutes // 60
+    lastsMinutes %= 60
+    lastsDays += lastsHours // 24
+    lastsHours %= 24
+    return lastsDays, lastsHours, lastsMinutes
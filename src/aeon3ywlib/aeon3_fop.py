@@ -1,52 +1,121 @@
-"""Provide helper functions for Aeon Timeline 3 file operation.
+"""Provide helper functions for opening Aeon Timeline 3 project files.
+
+The JSON part is read by a JsonStream; the sidecar offset index stores its position.
 
 Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/aeon3yw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import os
-import codecs
+import mmap
+import json
+import zlib
 from pywriter.pywriter_globals import ERROR
 
+OPENING = ord('{')
+CLOSING = ord('}')
+
+INDEX_EXTENSION = '.offsets'
+# Appended to the project file name for the sidecar offset index.
+
+FINGERPRINT_SIZE = 4096
+# Number of bytes at the beginning and at the end of the file to be checksummed.
+
+
+def get_fingerprint(data):
+    """Return a checksum over the first and the last bytes of the project data.
+
+    Positional arguments:
+        data -- bytes-like object: content of an Aeon 3 project file.
+    """
+    return zlib.crc32(data[-FINGERPRINT_SIZE:], zlib.crc32(data[:FINGERPRINT_SIZE]))
+
+
+def read_offset_index(filePath, data):
+    """Return the JSON part's position stored in the sidecar index.
 
-def scan_file(filePath):
-    """Read and scan the project file.
-    
     Positional arguments:
         filePath -- str: Path to the Aeon 3 project file.
-    
-    Return a string containing either the JSON part or an error message.
+        data -- bytes-like object: content of the Aeon 3 project file.
+
+    The index is valid if file size, modification time, and fingerprint match,
+    and the stored offsets point to curly brackets.
+    Return a tuple (start, end) of byte offsets, or None if there is no valid index.
     """
     try:
-        with open(filePath, 'rb') as f:
-            binInput = f.read()
-    except(FileNotFoundError):
-        return f'{ERROR}"{os.path.normpath(filePath)}" not found.'
+        with open(f'{filePath}{INDEX_EXTENSION}', 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        start = index['start']
+        end = index['end']
+        if index['size'] != len(data):
+            return None
+
+        if index['mtime'] != os.stat(filePath).st_mtime_ns:
+            return None
+
+        if index['fingerprint'] != get_fingerprint(data):
+            return None
+
+        if data[start] != OPENING or data[end - 1] != CLOSING:
+            return None
 
     except:
-        return f'{ERROR}Cannot read "{os.path.normpath(filePath)}".'
-    
-    # JSON part: all characters between the first and last curly bracket.
-    chrData = []
-    opening = ord('{')
-    closing = ord('}')
-    level = 0
-    for c in binInput:
-        if c == opening:
-            level += 1
-        if level > 0:
-            chrData.append(c)
-            if c == closing:
-                level -= 1
-                if level == 0:
-                    break
-
-    if level != 0:
-        return f'{ERROR}Corrupted data.'
+        return None
+
+    return start, end
+
+
+def write_offset_index(filePath, data, span):
+    """Save the JSON part's position in the sidecar index.
 
+    Positional arguments:
+        filePath -- str: Path to the Aeon 3 project file.
+        data -- bytes-like object: content of the Aeon 3 project file.
+        span -- tuple (start, end) of byte offsets.
+
+    The index is optional, so write errors are ignored.
+    """
+    start, end = span
+    index = dict(
+        size=len(data),
+        mtime=os.stat(filePath).st_mtime_ns,
+        fingerprint=get_fingerprint(data),
+        start=start,
+        end=end,
+    )
     try:
-        jsonStr = codecs.decode(bytes(chrData), encoding='utf-8')
+        with open(f'{filePath}{INDEX_EXTENSION}', 'w', encoding='utf-8') as f:
+            json.dump(index, f)
     except:
-        return f'{ERROR}Cannot decode "{os.path.normpath(filePath)}".'
+        pass
+
+
+def open_file(filePath, useMmap=True):
+    """Return the content of the project file.
+
+    Positional arguments:
+        filePath -- str: Path to the Aeon 3 project file.
+
+    Optional arguments:
+        useMmap -- bool: if True, map the file into memory instead of reading it.
 
-    return jsonStr
+    Return an mmap object, which is to be closed by the caller,
+    or a bytes object, if the file is not mapped.
+    In case of error, return a string containing an error message.
+    """
+    try:
+        with open(filePath, 'rb') as f:
+            if useMmap:
+                try:
+                    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+                except:
+                    # E.g. the file is empty, or the file system does not support mapping.
+                    pass
+            return f.read()
+
+    except(FileNotFoundError):
+        return f'{ERROR}"{os.path.normpath(filePath)}" not found.'
+
+    except:
+        return f'{ERROR}Cannot read "{os.path.normpath(filePath)}".'
@@ -0,0 +1,123 @@
+"""Provide functions for reading the records of Aeon Timeline 3 csv exports.
+
+Large exports can be read in byte ranges by a process pool.
+The ranges are split at record boundaries, i.e. at line breaks
+outside quoted fields.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import csv
+from io import StringIO
+
+
+def iter_records(rows, width, typeColumn, projections):
+    """Generate (kind, fields) tuples for the records of the types given.
+
+    Positional arguments:
+        rows -- iterable of lists of str: csv records without the header.
+        width -- int: number of columns in the header.
+        typeColumn -- int: column index of the entity type.
+        projections -- dict: (kind, get_fields) tuples by entity type.
+
+    Records are padded or truncated to the header's width, and a None column
+    is appended, for the fields not exported. get_fields picks the fields
+    needed from such a record. Records of other types and empty lines are skipped.
+    """
+    for row in rows:
+        if not row:
+            continue
+
+        if len(row) != width:
+            row = row[:width] + [None] * (width - len(row))
+        row.append(None)
+        projection = projections.get(row[typeColumn], None)
+        if projection is not None:
+            kind, get_fields = projection
+            yield kind, get_fields(row)
+
+
+BLOCK_SIZE = 0x100000
+# Size of the blocks in which quotes are counted.
+
+
+def count_quotes(data, start, end):
+    """Return the number of double quotes in data[start:end].
+
+    Positional arguments:
+        data -- bytes or mmap: the csv file's content.
+        start, end -- int: range to search.
+
+    The quotes are counted in blocks, because a memory mapping
+    has no count() method, and a slice is a copy.
+    """
+    quotes = 0
+    for blockStart in range(start, end, BLOCK_SIZE):
+        quotes += data[blockStart:min(blockStart + BLOCK_SIZE, end)].count(b'"')
+    return quotes
+
+
+def find_record_end(data, start, pos):
+    """Return the index behind the first record boundary at or after a position.
+
+    Positional arguments:
+        data -- bytes or mmap: the csv file's content.
+        start -- int: index of a record boundary before pos.
+        pos -- int: index to search from.
+
+    Quotes are counted from start, so that line breaks within
+    quoted fields are skipped. Return len(data) if there is no boundary.
+    """
+    quotes = count_quotes(data, start, pos)
+    while True:
+        lineEnd = data.find(b'\n', pos)
+        if lineEnd < 0:
+            return len(data)
+
+        lineEnd += 1
+        quotes += count_quotes(data, pos, lineEnd)
+        if quotes % 2 == 0:
+            return lineEnd
+
+        pos = lineEnd
+
+
+def get_ranges(data, start, count):
+    """Return a list of up to count (start, end) tuples, splitting data at record boundaries.
+
+    Positional arguments:
+        data -- bytes or mmap: the csv file's content.
+        start -- int: index of the first record.
+        count -- int: number of ranges of about equal size to aim at.
+    """
+    size = (len(data) - start) // count
+    ranges = []
+    rangeStart = start
+    for i in range(1, count):
+        rangeEnd = find_record_end(data, rangeStart, max(start + i * size, rangeStart))
+        if rangeEnd >= len(data):
+            break
+
+        ranges.append((rangeStart, rangeEnd))
+        rangeStart = rangeEnd
+    ranges.append((rangeStart, len(data)))
+    return ranges
+
+
+def read_range(filePath, start, end, delimiter, width, typeColumn, projections):
+    """Return a list of (kind, fields) tuples for the records in a byte range of a csv file.
+
+    Positional arguments:
+        filePath -- str: path to the csv file.
+        start, end -- int: byte range, starting and ending at record boundaries.
+        delimiter -- str: field delimiter.
+        width, typeColumn, projections -- as with iter_records().
+
+    This is run by the processes of a pool, so all arguments are picklable.
+    """
+    with open(filePath, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    rows = csv.reader(StringIO(text, newline=''), delimiter=delimiter)
+    return list(iter_records(rows, width, typeColumn, projections))
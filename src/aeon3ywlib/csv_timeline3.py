@@ -6,14 +6,24 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 import os
 import csv
-from datetime import datetime
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pywriter.pywriter_globals import ERROR
 from pywriter.model.novel import Novel
 from pywriter.model.scene import Scene
 from pywriter.model.chapter import Chapter
 from pywriter.model.world_element import WorldElement
 from pywriter.model.character import Character
-from aeon3ywlib.dt_helper import fix_iso_dt
+from aeon3ywlib.dt_helper import parse_iso_dt
+from aeon3ywlib.aeon3_calendar import SECONDS_PER_DAY
+from aeon3ywlib.tag_table import TagTable
+from aeon3ywlib.scene_table import SceneTable
+from aeon3ywlib.field_memo import FieldMemo
+from aeon3ywlib.csv_records import iter_records
+from aeon3ywlib.csv_records import find_record_end
+from aeon3ywlib.csv_records import get_ranges
+from aeon3ywlib.csv_records import read_range
 
 
 class CsvTimeline3(Novel):
@@ -22,9 +32,19 @@ class CsvTimeline3(Novel):
     Public methods:
         read() -- parse the file and get the instance variables.
 
+    Public instance variables:
+        tagTable -- TagTable: the tags of all entities.
+        fieldMemos -- dict of FieldMemo: resolved multi-value fields by kind (tags/characters/locations/items).
+
     Represents a csv file with a record per scene.
     - Records are separated by line breaks.
     - Data fields are delimited by commas.
+    The header is resolved once into column indexes, so only the fields
+    configured are picked from the records.
+    The records are processed in a single pass. References to characters,
+    locations, and items are bound at the end, because these may come later
+    in the file.
+    Large files can be read in parallel, with the records merged in original order.
     """
     EXTENSION = '.csv'
     DESCRIPTION = 'Aeon Timeline CSV export'
@@ -44,6 +64,16 @@ class CsvTimeline3(Novel):
     _START_DATE_TIME_FIELD = 'Start Date'
     _END_DATE_TIME_FIELD = 'End Date'
 
+    # Record kinds
+    _EVENT_RECORD = 0
+    _CHARACTER_RECORD = 1
+    _LOCATION_RECORD = 2
+    _ITEM_RECORD = 3
+    # Events and narrative folders are of the same kind.
+
+    PARALLEL_RANGE_SIZE = 0x1000000
+    # Minimum size of the byte ranges read in parallel.
+
     # Narrative position markers
     _PART_MARKER = 'Part'
     _CHAPTER_MARKER = 'Chapter'
@@ -79,10 +109,17 @@ class CsvTimeline3(Novel):
             character_bio_label -- str: 
             character_aka_label -- str: label of the "Nickname" property of characters.           
         
+        Optional keyword arguments:
+            parallel_csv -- bool: if True, read large files in byte ranges by a process pool (default: False).
+            csv_workers -- str: number of processes for reading in parallel; "0" for one per CPU (default).
+            scene_table -- bool: if True, hold the scenes read in a columnar SceneTable (default: False).
+
         Extends the superclass constructor.
         """
         super().__init__(filePath, **kwargs)
         self.labels = []
+        self.tagTable = TagTable()
+        self.fieldMemos = {}
         self.partNrPrefix = kwargs['part_number_prefix']
         if self.partNrPrefix:
             self.partNrPrefix += ' '
@@ -108,6 +145,14 @@ class CsvTimeline3(Novel):
         self.characterBioField = kwargs['character_bio_label']
         self.characterAkaField = kwargs['character_aka_label']
         self.locationDescField = kwargs['location_desc_label']
+        self.parallelCsv = kwargs.get('parallel_csv', False)
+        try:
+            self.csvWorkers = max(int(kwargs.get('csv_workers', '0')), 0)
+        except ValueError:
+            self.csvWorkers = 0
+        if self.csvWorkers == 0:
+            self.csvWorkers = os.cpu_count() or 1
+        self._useSceneTable = kwargs.get('scene_table', False)
 
     def read(self):
         """Parse the file and get the instance variables.
@@ -117,43 +162,98 @@ class CsvTimeline3(Novel):
         Overrides the superclass method.
         """
 
-        def get_lcIds(lcTitles):
-            """Return a list of location IDs; Add new location to the project."""
-            lcIds = []
-            for lcTitle in lcTitles:
-                if lcTitle in self.locIdsByTitle:
-                    lcIds.append(self.locIdsByTitle[lcTitle])
-                else:
-                    return None
-            return lcIds
-
-        def get_itIds(itTitles):
-            """Return a list of item IDs; Add new item to the project."""
-            itIds = []
-            for itTitle in itTitles:
-                if itTitle in self.itmIdsByTitle:
-                    itIds.append(self.itmIdsByTitle[itTitle])
-                else:
-                    return None
-            return itIds
-
-        def get_crIds(crTitles):
-            """Return a list of character IDs; Add new characters to the project."""
-            crIds = []
-            for crTitle in crTitles:
-                if crTitle in self.chrIdsByTitle:
-                    crIds.append(self.chrIdsByTitle[crTitle])
-                else:
-                    return None
-            return crIds
+        def get_resolver(idsByTitle):
+            """Return a function that resolves a field text into a tuple of IDs.
+            
+            The function returns None, if any title is unknown.
+            """
+
+            def resolve(text):
+                ids = []
+                for title in text.split(internalDelimiter):
+                    if title in idsByTitle:
+                        ids.append(idsByTitle[title])
+                    else:
+                        return None
+                return tuple(ids)
+
+            return resolve
+
+        def get_list(ids):
+            """Return a list of the IDs given, or None."""
+            if ids is None:
+                return None
+
+            return list(ids)
+
+        def resolve_tags(text):
+            """Return a tuple of the tag labels in a field text."""
+            return tuple(self.tagTable.intern_labels(text.split(internalDelimiter)))
+
         #--- Read the csv file.
         internalDelimiter = ','
         try:
             with open(self.filePath, newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f, delimiter=self._SEPARATOR)
-                for label in reader.fieldnames:
-                    self.labels.append(label)
-                eventsAndFolders = []
+                reader = csv.reader(f, delimiter=self._SEPARATOR)
+                self.labels = next(reader)
+                for label in [self._SCENE_FIELD, self.sceneTitleField, self._START_DATE_TIME_FIELD, self._END_DATE_TIME_FIELD]:
+                    if not label in self.labels:
+                        return f'{ERROR}Label "{label}" is missing.'
+
+                width = len(self.labels)
+                columns = {}
+                # key = field label
+                # value = column index; the last one for duplicate labels
+                for i, label in enumerate(self.labels):
+                    columns[label] = i
+                typeColumn = columns[self._TYPE_FIELD]
+                get_event_fields = self._get_projection(columns, width, [
+                    self._TYPE_FIELD,
+                    self._SCENE_FIELD,
+                    self.sceneTitleField,
+                    self._START_DATE_TIME_FIELD,
+                    self._END_DATE_TIME_FIELD,
+                    self.sceneDescField,
+                    self.notesField,
+                    self.tagField,
+                    self.locationField,
+                    self.characterField,
+                    self.viewpointField,
+                    self.itemField,
+                    self.partDescField,
+                    self.chapterDescField,
+                    ])
+                projections = {}
+                # key = entity type
+                # value = (record kind, projection)
+                # Set in reverse order of precedence, in case types are configured twice.
+                projections[self.typeItem] = (self._ITEM_RECORD, self._get_projection(columns, width, [
+                    self._LABEL_FIELD,
+                    ]))
+                projections[self.typeLocation] = (self._LOCATION_RECORD, self._get_projection(columns, width, [
+                    self._LABEL_FIELD,
+                    self.locationDescField,
+                    self.tagField,
+                    ]))
+                projections[self.typeCharacter] = (self._CHARACTER_RECORD, self._get_projection(columns, width, [
+                    self._LABEL_FIELD,
+                    self.characterDescField1,
+                    self.characterDescField2,
+                    self.characterDescField3,
+                    self.characterBioField,
+                    self.characterAkaField,
+                    self.tagField,
+                    self.notesField,
+                    ]))
+                projections[self._TYPE_NARRATIVE] = (self._EVENT_RECORD, get_event_fields)
+                projections[self._TYPE_EVENT] = (self._EVENT_RECORD, get_event_fields)
+                if self.parallelCsv and self.csvWorkers > 1:
+                    records = self._read_parallel(width, typeColumn, projections)
+                else:
+                    records = None
+                if records is None:
+                    records = iter_records(reader, width, typeColumn, projections)
+                self.fieldMemos['tags'] = FieldMemo(resolve_tags)
                 characterCount = 0
                 self.chrIdsByTitle = {}
                 # key = character title
@@ -166,194 +266,263 @@ class CsvTimeline3(Novel):
                 self.itmIdsByTitle = {}
                 # key = item title
                 # value = item ID
-                for row in reader:
-                    aeonEntity = {}
-                    for label in row:
-                        aeonEntity[label] = row[label]
-                    if self._TYPE_EVENT == aeonEntity[self._TYPE_FIELD]:
-                        eventsAndFolders.append(aeonEntity)
-                    elif self._TYPE_NARRATIVE == aeonEntity[self._TYPE_FIELD]:
-                        eventsAndFolders.append(aeonEntity)
-                    elif self.typeCharacter == aeonEntity[self._TYPE_FIELD]:
+                pendingReferences = []
+                # Tuples (scene ID, locations, characters, viewpoint, items), with the field texts
+                # to be bound when all characters, locations, and items are known.
+                fieldTexts = {}
+                # Field texts of the pending references, held only once.
+                get_text = fieldTexts.setdefault
+                scIdsByStruc = {}
+                chIdsByStruc = {}
+                otherEvents = []
+                eventCount = 0
+                chapterCount = 0
+                for kind, fields in records:
+                    if kind == self._EVENT_RECORD:
+                        (aeonType, position, title, start, end, desc, notes, tags,
+                         locations, characters, viewpoint, items, partDesc, chapterDesc) = fields
+                        if position:
+                            narrativeType, narrativePosition = position.split(' ')
+                            try:
+                                narrativePosition = tuple(map(int, narrativePosition.split('.')))
+                                # Position numbers from the outermost level down, sortable at any width.
+                            except ValueError:
+                                return f'{ERROR}Wrong narrative position "{position}".'
+
+                        else:
+                            narrativeType = ''
+                            narrativePosition = None
+                        if aeonType == self._TYPE_NARRATIVE:
+                            if narrativeType == self._CHAPTER_MARKER:
+                                chapterCount += 1
+                                chId = chapterCount
+                                chIdsByStruc[narrativePosition] = chId
+                                self.chapters[chId] = Chapter()
+                                self.chapters[chId].chLevel = 0
+                                self.chapters[chId].narrativePosition = narrativePosition
+                                if self.chapterDescField:
+                                    self.chapters[chId].desc = chapterDesc
+                            elif narrativeType == self._PART_MARKER:
+                                chapterCount += 1
+                                chId = chapterCount
+                                chIdsByStruc[narrativePosition] = chId
+                                self.chapters[chId] = Chapter()
+                                self.chapters[chId].chLevel = 1
+                                self.chapters[chId].narrativePosition = narrativePosition
+                                if self.partDescField:
+                                    self.chapters[chId].desc = partDesc
+                            continue
+
+                        elif aeonType != self._TYPE_EVENT:
+                            continue
+
+                        eventCount += 1
+                        scId = eventCount
+                        scene = Scene()
+                        if narrativeType == self._SCENE_MARKER:
+                            scene.isNotesScene = False
+                            scene.narrativePosition = narrativePosition
+                            scIdsByStruc[narrativePosition] = scId
+                        else:
+                            scene.isNotesScene = True
+                            otherEvents.append(scId)
+                        scene.title = title
+                        startDateTime = parse_iso_dt(start)
+                        if startDateTime is not None:
+                            scene.date, scene.time, startSeconds = startDateTime
+                            endDateTime = parse_iso_dt(end)
+                            if endDateTime is not None:
+                                # Calculate duration of scenes that begin after 99-12-31.
+                                endSeconds = endDateTime[2]
+                                if startSeconds is None or endSeconds is None:
+                                    raise ValueError
+
+                                lastsDays, sceneSeconds = divmod(endSeconds - startSeconds, SECONDS_PER_DAY)
+                                scene.lastsDays = str(lastsDays)
+                                scene.lastsHours = str(sceneSeconds // 3600)
+                                scene.lastsMinutes = str((sceneSeconds % 3600) // 60)
+                        else:
+                            scene.date = Scene.NULL_DATE
+                            scene.time = Scene.NULL_TIME
+                        if desc is not None:
+                            scene.desc = desc
+                        if notes is not None:
+                            scene.sceneNotes = notes
+                        if tags:
+                            scene.tags = list(self.fieldMemos['tags'].get(tags))
+                        pendingReferences.append((scId, get_text(locations, locations), get_text(characters, characters),
+                                                  get_text(viewpoint, viewpoint), get_text(items, items)))
+                        scene.status = 1
+                        # Set scene status = "Outline".
+                        self.scenes[scId] = scene
+                    elif kind == self._CHARACTER_RECORD:
+                        title, desc1, desc2, desc3, bio, aka, tags, notes = fields
                         characterCount += 1
-                        crId = str(characterCount)
-                        self.chrIdsByTitle[aeonEntity[self._LABEL_FIELD]] = crId
+                        crId = characterCount
+                        self.chrIdsByTitle[title] = crId
                         self.characters[crId] = Character()
-                        self.characters[crId].title = aeonEntity[self._LABEL_FIELD]
+                        self.characters[crId].title = title
                         charDesc = []
-                        if self.characterDescField1 in aeonEntity:
-                            charDesc.append(aeonEntity[self.characterDescField1])
-                        if self.characterDescField2 and self.characterDescField2 in aeonEntity:
-                            charDesc.append(aeonEntity[self.characterDescField2])
-                        if self.characterDescField3 and self.characterDescField3 in aeonEntity:
-                            charDesc.append(aeonEntity[self.characterDescField3])
+                        if desc1 is not None:
+                            charDesc.append(desc1)
+                        if self.characterDescField2 and desc2 is not None:
+                            charDesc.append(desc2)
+                        if self.characterDescField3 and desc3 is not None:
+                            charDesc.append(desc3)
                         self.characters[crId].desc = ('\n').join(charDesc)
-                        if self.characterBioField in aeonEntity:
-                            self.characters[crId].bio = aeonEntity[self.characterBioField]
-                        if self.characterAkaField in aeonEntity:
-                            self.characters[crId].aka = aeonEntity[self.characterAkaField]
-                        if self.tagField in aeonEntity and aeonEntity[self.tagField]:
-                            self.characters[crId].tags = aeonEntity[self.tagField].split(internalDelimiter)
-                        if self.notesField in aeonEntity:
-                            self.characters[crId].notes = aeonEntity[self.notesField]
+                        if bio is not None:
+                            self.characters[crId].bio = bio
+                        if aka is not None:
+                            self.characters[crId].aka = aka
+                        if tags:
+                            self.characters[crId].tags = list(self.fieldMemos['tags'].get(tags))
+                        if notes is not None:
+                            self.characters[crId].notes = notes
                         self.srtCharacters.append(crId)
-                    elif self.typeLocation == aeonEntity[self._TYPE_FIELD]:
+                    elif kind == self._LOCATION_RECORD:
+                        title, desc, tags = fields
                         locationCount += 1
-                        lcId = str(locationCount)
-                        self.locIdsByTitle[aeonEntity[self._LABEL_FIELD]] = lcId
+                        lcId = locationCount
+                        self.locIdsByTitle[title] = lcId
                         self.locations[lcId] = WorldElement()
-                        self.locations[lcId].title = aeonEntity[self._LABEL_FIELD]
+                        self.locations[lcId].title = title
                         self.srtLocations.append(lcId)
-                        if self.locationDescField in aeonEntity:
-                            self.locations[lcId].desc = aeonEntity[self.locationDescField]
-                        if self.tagField in aeonEntity:
-                            self.locations[lcId].tags = aeonEntity[self.tagField].split(internalDelimiter)
-                    elif self.typeItem == aeonEntity[self._TYPE_FIELD]:
+                        if desc is not None:
+                            self.locations[lcId].desc = desc
+                        if tags is not None:
+                            self.locations[lcId].tags = list(self.fieldMemos['tags'].get(tags))
+                    elif kind == self._ITEM_RECORD:
+                        title = fields
+                        # A projection of a single field returns the field itself.
                         itemCount += 1
-                        itId = str(itemCount)
-                        self.itmIdsByTitle[aeonEntity[self._LABEL_FIELD]] = itId
+                        itId = itemCount
+                        self.itmIdsByTitle[title] = itId
                         self.items[itId] = WorldElement()
-                        self.items[itId].title = aeonEntity[self._LABEL_FIELD]
+                        self.items[itId].title = title
                         self.srtItems.append(itId)
-        except(FileNotFoundError):
-            return f'{ERROR}"{os.path.normpath(self.filePath)}" not found.'
-
-        except:
-            return f'{ERROR}Can not parse csv file "{os.path.normpath(self.filePath)}".'
 
-        try:
-            for label in [self._SCENE_FIELD, self.sceneTitleField, self._START_DATE_TIME_FIELD, self._END_DATE_TIME_FIELD]:
-                if not label in self.labels:
-                    return f'{ERROR}Label "{label}" is missing.'
-
-            scIdsByStruc = {}
-            chIdsByStruc = {}
-            otherEvents = []
-            eventCount = 0
-            chapterCount = 0
-            for aeonEntity in eventsAndFolders:
-                if aeonEntity[self._SCENE_FIELD]:
-                    narrativeType, narrativePosition = aeonEntity[self._SCENE_FIELD].split(' ')
-
-                    # Make the narrative position a sortable string.
-                    numbers = narrativePosition.split('.')
-                    for i in range(len(numbers)):
-                        numbers[i] = numbers[i].zfill(4)
-                        narrativePosition = ('.').join(numbers)
-                else:
-                    narrativeType = ''
-                    narrativePosition = ''
-                if aeonEntity[self._TYPE_FIELD] == self._TYPE_NARRATIVE:
-                    if narrativeType == self._CHAPTER_MARKER:
-                        chapterCount += 1
-                        chId = str(chapterCount)
-                        chIdsByStruc[narrativePosition] = chId
-                        self.chapters[chId] = Chapter()
-                        self.chapters[chId].chLevel = 0
-                        if self.chapterDescField:
-                            self.chapters[chId].desc = aeonEntity[self.chapterDescField]
-                    elif narrativeType == self._PART_MARKER:
-                        chapterCount += 1
-                        chId = str(chapterCount)
-                        chIdsByStruc[narrativePosition] = chId
-                        self.chapters[chId] = Chapter()
-                        self.chapters[chId].chLevel = 1
-                        narrativePosition += '.0000'
-                        if self.partDescField:
-                            self.chapters[chId].desc = aeonEntity[self.partDescField]
-                    continue
-
-                elif aeonEntity[self._TYPE_FIELD] != self._TYPE_EVENT:
-                    continue
-
-                eventCount += 1
-                scId = str(eventCount)
-                self.scenes[scId] = Scene()
-                if narrativeType == self._SCENE_MARKER:
-                    self.scenes[scId].isNotesScene = False
-                    scIdsByStruc[narrativePosition] = scId
-                else:
-                    self.scenes[scId].isNotesScene = True
-                    otherEvents.append(scId)
-                self.scenes[scId].title = aeonEntity[self.sceneTitleField]
-                startDateTimeStr = fix_iso_dt(aeonEntity[self._START_DATE_TIME_FIELD])
-                if startDateTimeStr is not None:
-                    startDateTime = startDateTimeStr.split(' ')
-                    self.scenes[scId].date = startDateTime[0]
-                    self.scenes[scId].time = startDateTime[1]
-                    endDateTimeStr = fix_iso_dt(aeonEntity[self._END_DATE_TIME_FIELD])
-                    if endDateTimeStr is not None:
-                        # Calculate duration of scenes that begin after 99-12-31.
-                        sceneStart = datetime.fromisoformat(startDateTimeStr)
-                        sceneEnd = datetime.fromisoformat(endDateTimeStr)
-                        sceneDuration = sceneEnd - sceneStart
-                        lastsHours = sceneDuration.seconds // 3600
-                        lastsMinutes = (sceneDuration.seconds % 3600) // 60
-                        self.scenes[scId].lastsDays = str(sceneDuration.days)
-                        self.scenes[scId].lastsHours = str(lastsHours)
-                        self.scenes[scId].lastsMinutes = str(lastsMinutes)
-                else:
-                    self.scenes[scId].date = Scene.NULL_DATE
-                    self.scenes[scId].time = Scene.NULL_TIME
-                if self.sceneDescField in aeonEntity:
-                    self.scenes[scId].desc = aeonEntity[self.sceneDescField]
-                if self.notesField in aeonEntity:
-                    self.scenes[scId].sceneNotes = aeonEntity[self.notesField]
-                if self.tagField in aeonEntity and aeonEntity[self.tagField]:
-                    self.scenes[scId].tags = aeonEntity[self.tagField].split(internalDelimiter)
-                if self.locationField in aeonEntity:
-                    self.scenes[scId].locations = get_lcIds(aeonEntity[self.locationField].split(internalDelimiter))
-                if self.characterField in aeonEntity:
-                    self.scenes[scId].characters = get_crIds(aeonEntity[self.characterField].split(internalDelimiter))
-                if self.viewpointField in aeonEntity:
-                    vpIds = get_crIds([aeonEntity[self.viewpointField]])
-                    if vpIds is not None:
-                        vpId = vpIds[0]
-                        if self.scenes[scId].characters is None:
-                            self.scenes[scId].characters = []
-                        elif vpId in self.scenes[scId].characters:
-                            self.scenes[scId].characters.remove[vpId]
-                        self.scenes[scId].characters.insert(0, vpId)
-                if self.itemField in aeonEntity:
-                    self.scenes[scId].items = get_itIds(aeonEntity[self.itemField].split(internalDelimiter))
-
-                self.scenes[scId].status = 1
-                # Set scene status = "Outline".
+            #--- Bind the references.
+            self.fieldMemos['characters'] = FieldMemo(get_resolver(self.chrIdsByTitle))
+            self.fieldMemos['locations'] = FieldMemo(get_resolver(self.locIdsByTitle))
+            self.fieldMemos['items'] = FieldMemo(get_resolver(self.itmIdsByTitle))
+            locationMemo = self.fieldMemos['locations']
+            characterMemo = self.fieldMemos['characters']
+            itemMemo = self.fieldMemos['items']
+            for scId, locations, characters, viewpoint, items in pendingReferences:
+                scene = self.scenes[scId]
+                if locations is not None:
+                    scene.locations = get_list(locationMemo.get(locations))
+                if characters is not None:
+                    scene.characters = get_list(characterMemo.get(characters))
+                if viewpoint is not None:
+                    vpId = self.chrIdsByTitle.get(viewpoint, None)
+                    if vpId is not None:
+                        if scene.characters is None:
+                            scene.characters = []
+                        elif vpId in scene.characters:
+                            scene.characters.remove(vpId)
+                        scene.characters.insert(0, vpId)
+                if items is not None:
+                    scene.items = get_list(itemMemo.get(items))
+            pendingReferences = None
+            fieldTexts = None
         except(FileNotFoundError):
             return f'{ERROR}"{os.path.normpath(self.filePath)}" not found.'
 
         except(KeyError):
             return f'{ERROR}Wrong csv structure.'
 
+        except(UnicodeDecodeError):
+            # A subclass of ValueError, so it must be caught first.
+            return f'{ERROR}Can not parse csv file "{os.path.normpath(self.filePath)}".'
+
         except(ValueError):
             return f'{ERROR}Wrong date/time format.'
 
         except:
-            return f'{ERROR}Can not parse "{os.path.normpath(self.filePath)}".'
+            return f'{ERROR}Can not parse csv file "{os.path.normpath(self.filePath)}".'
+
 
         # Build the chapter structure as defined with Aeon v3.
-        srtChpDict = sorted(chIdsByStruc.items())
-        srtScnDict = sorted(scIdsByStruc.items())
+        # Each scene is assigned to the chapter at its parent position.
+        for scPosition, scId in sorted(scIdsByStruc.items()):
+            chId = chIdsByStruc.get(scPosition[:-1], None)
+            if chId is not None and self.chapters[chId].chLevel == 0:
+                self.chapters[chId].srtScenes.append(scId)
         partNr = 0
         chapterNr = 0
-        for ch in srtChpDict:
+        for ch in sorted(chIdsByStruc.items()):
             self.srtChapters.append(ch[1])
             if self.chapters[ch[1]].chLevel == 0:
                 chapterNr += 1
                 self.chapters[ch[1]].title = self.chapterNrPrefix + str(chapterNr)
-                for sc in srtScnDict:
-                    if sc[0].startswith(ch[0]):
-                        self.chapters[ch[1]].srtScenes.append(sc[1])
             else:
                 partNr += 1
                 self.chapters[ch[1]].title = self.partNrPrefix + str(partNr)
         # Create a chapter for the non-narrative events.
         chapterNr += 1
-        chId = str(chapterCount + 1)
+        chId = chapterCount + 1
         self.chapters[chId] = Chapter()
         self.chapters[chId].title = 'Other events'
         self.chapters[chId].desc = 'Scenes generated from events that ar not assigned to the narrative structure.'
         self.chapters[chId].chType = 1
         self.chapters[chId].srtScenes = otherEvents
         self.srtChapters.append(chId)
+        if self._useSceneTable:
+            self.scenes = SceneTable(self.scenes)
+            # The scenes are built as Scene instances, and copied into the table a column at a time.
         return 'Timeline data converted to novel structure.'
+
+    def _get_projection(self, columns, width, labels):
+        """Return a function that picks the fields given from a csv record.
+
+        Positional arguments:
+            columns -- dict: column indexes by field label.
+            width -- int: number of columns in the header.
+            labels -- list of str: labels of the fields to pick.
+
+        The function returns a tuple of the field values in the order of labels,
+        or the field value itself, if there is only one label.
+        Fields not exported are picked from the column behind the header,
+        that is expected to hold None.
+        """
+        return itemgetter(*[columns.get(label, width) for label in labels])
+
+    def _read_parallel(self, width, typeColumn, projections):
+        """Return an iterator over (kind, fields) tuples for the file's records, read by a process pool.
+
+        Positional arguments:
+            width, typeColumn, projections -- as with csv_records.iter_records().
+
+        The file is split into byte ranges at record boundaries, one per process.
+        Return None, if the file is too small to be split.
+        """
+        with open(self.filePath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            rangeCount = min(self.csvWorkers, size // self.PARALLEL_RANGE_SIZE)
+            if rangeCount < 2:
+                return None
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                headerEnd = find_record_end(data, 0, 0)
+                ranges = get_ranges(data, headerEnd, rangeCount)
+        return self._iter_ranges(ranges, width, typeColumn, projections)
+
+    def _iter_ranges(self, ranges, width, typeColumn, projections):
+        """Generate (kind, fields) tuples for the records of the byte ranges given, in original order.
+
+        Positional arguments:
+            ranges -- list of (start, end) tuples: byte ranges of the file.
+            width, typeColumn, projections -- as with csv_records.iter_records().
+
+        The ranges are read in parallel. The records of each range
+        are released as soon as they are processed.
+        """
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [executor.submit(read_range, self.filePath, start, end, self._SEPARATOR, width, typeColumn, projections)
+                       for start, end in ranges]
+            futures.reverse()
+            while futures:
+                records = futures.pop().result()
+                yield from records
+                records = None
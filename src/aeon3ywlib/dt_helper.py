@@ -4,6 +4,20 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/aeon3yw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import re
+from functools import lru_cache
+from datetime import datetime
+from datetime import timedelta
+from fractions import Fraction
+from aeon3ywlib.aeon3_calendar import get_ordinal
+from aeon3ywlib.aeon3_calendar import SECONDS_PER_DAY
+
+ISO_DATE_TIME = re.compile(r'(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)', re.ASCII)
+# Date/time format as exported by Aeon 3.
+
+CACHE_SIZE = 65536
+# Maximum number of memoized date/time strings;
+# the least recently used ones are discarded first.
 
 
 def fix_iso_dt(dateTimeStr):
@@ -42,3 +56,42 @@ def fix_iso_dt(dateTimeStr):
     dt[0] = ('-').join(date)
     dateTimeStr = (' ').join(dt)
     return dateTimeStr
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_iso_dt(dateTimeStr):
+    """Return the date, the time, and the seconds of a date/time string.
+
+    Positional arguments:
+        dateTimeStr -- str: date/time as read in from Aeon3 csv export.
+
+    The date and time strings are the ones fixed by fix_iso_dt().
+    The seconds are counted since 0001-01-01 00:00:00, so durations can be
+    calculated by subtraction. They are an int, or a Fraction for the rare
+    strings with fractions of a second. They are None, if datetime.fromisoformat()
+    would not accept the fixed string.
+    The results are memoized, because timelines repeat dates a lot.
+    Raise a ValueError, if fix_iso_dt() does.
+    Return a tuple (dateStr, timeStr, seconds), or None if fix_iso_dt() returns None.
+    """
+    fixedStr = fix_iso_dt(dateTimeStr)
+    if fixedStr is None:
+        return None
+
+    dateStr, timeStr = fixedStr.split(' ')[:2]
+    match = ISO_DATE_TIME.fullmatch(fixedStr)
+    try:
+        if match is not None:
+            year, month, day, hour, minute, second = map(int, match.groups())
+            if hour > 23 or minute > 59 or second > 59:
+                raise ValueError
+
+            seconds = get_ordinal(year, month, day) * SECONDS_PER_DAY + hour * 3600 + minute * 60 + second
+        else:
+            microseconds = (datetime.fromisoformat(fixedStr) - datetime.min) // timedelta(microseconds=1)
+            seconds = Fraction(microseconds, 1000000)
+            if seconds.denominator == 1:
+                seconds = seconds.numerator
+    except (ValueError, TypeError):
+        seconds = None
+    return dateStr, timeStr, seconds
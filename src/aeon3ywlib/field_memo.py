@@ -0,0 +1,70 @@
+"""Provide a class for memoizing the resolution of multi-value fields.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from collections import OrderedDict
+
+
+class FieldMemo:
+    """Bounded memo of resolved field values by field text.
+
+    Public methods:
+        get(text) -- return the resolved value of a field text.
+        get_hit_rate() -- return the share of lookups answered by the memo.
+
+    Public instance variables:
+        hits -- int: number of lookups answered by the memo.
+        misses -- int: number of lookups that needed resolving.
+
+    Exports repeat the same combinations of references and tags across many
+    records, so each combination is resolved once. The resolved values are
+    meant to be immutable, e.g. tuples, because they are shared.
+    When the memo is full, the least recently used field text is discarded.
+    """
+    SIZE = 4096
+
+    def __init__(self, resolve, size=SIZE):
+        """Initialize instance variables.
+
+        Positional arguments:
+            resolve -- function: return the resolved value of a field text.
+
+        Optional arguments:
+            size -- int: maximum number of field texts held.
+        """
+        self._resolve = resolve
+        self._size = size
+        self._values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text):
+        """Return the resolved value of a field text.
+
+        Positional arguments:
+            text -- str: the field text as read from the file.
+        """
+        try:
+            value = self._values[text]
+            self._values.move_to_end(text)
+            self.hits += 1
+            return value
+
+        except KeyError:
+            pass
+        value = self._resolve(text)
+        if len(self._values) >= self._size:
+            self._values.popitem(last=False)
+        self._values[text] = value
+        self.misses += 1
+        return value
+
+    def get_hit_rate(self):
+        """Return the share of lookups answered by the memo, or None if there were no lookups."""
+        lookups = self.hits + self.misses
+        if not lookups:
+            return None
+
+        return self.hits / lookups
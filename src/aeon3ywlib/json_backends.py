@@ -0,0 +1,131 @@
+"""Provide JSON decoder backends for reading Aeon Timeline 3 projects.
+
+The json module of the standard library is always available.
+Faster third-party decoders are used if installed.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import json
+
+
+class JsonBackend:
+    """JSON decoder backend using the standard library.
+
+    Public methods:
+        loads(text) -- return the value decoded from a JSON text.
+        raw_decode(text, pos) -- return a value decoded from a longer text, and its end.
+
+    Class constants:
+        NAME -- str: name of the backend, as set in the configuration.
+        RAW_DECODING -- bool: True, if raw_decode() uses the backend's own decoder.
+
+    Subclasses wrap third-party decoders. Their constructors raise an
+    ImportError, if the decoder is not installed. Decoders that cannot
+    decode a value within a longer text leave raw_decode() to the standard library.
+    The decoders' exceptions for invalid JSON data are mapped to ValueError.
+    """
+    NAME = 'json'
+    RAW_DECODING = True
+
+    def __init__(self):
+        """Initialize instance variables."""
+        decoder = json.JSONDecoder()
+        self._loads = decoder.decode
+        self._rawDecode = decoder.raw_decode
+        self._errors = (ValueError,)
+        # Exceptions raised by the decoder in case of invalid JSON data.
+
+    def loads(self, text):
+        """Return the value decoded from a JSON text.
+
+        Positional arguments:
+            text -- str: JSON text of a single value.
+
+        Raise a ValueError in case of invalid JSON data.
+        """
+        try:
+            return self._loads(text)
+
+        except self._errors as ex:
+            raise ValueError(f'{self.NAME}: {ex}')
+
+    def raw_decode(self, text, pos):
+        """Return a tuple (value, end), decoded from a longer text.
+
+        Positional arguments:
+            text -- str: JSON text containing the value.
+            pos -- int: index of the value's first character.
+
+        Raise a ValueError in case of invalid JSON data.
+        """
+        return self._rawDecode(text, pos)
+
+
+class OrjsonBackend(JsonBackend):
+    """JSON decoder backend using the orjson package.
+
+    Extends the superclass.
+    """
+    NAME = 'orjson'
+    RAW_DECODING = False
+
+    def __init__(self):
+        """Import the decoder.
+
+        Extends the superclass constructor.
+        """
+        import orjson
+        super().__init__()
+        self._loads = orjson.loads
+        self._errors = (orjson.JSONDecodeError,)
+
+
+class UjsonBackend(JsonBackend):
+    """JSON decoder backend using the ujson package.
+
+    Extends the superclass.
+    """
+    NAME = 'ujson'
+    RAW_DECODING = False
+
+    def __init__(self):
+        """Import the decoder.
+
+        Extends the superclass constructor.
+        """
+        import ujson
+        super().__init__()
+        self._loads = ujson.loads
+        self._errors = (ValueError,)
+
+
+BACKENDS = (OrjsonBackend, UjsonBackend, JsonBackend)
+# Backend classes in order of preference for decoding whole JSON texts,
+# as measured by tools/benchmark_json.py.
+
+
+def get_backend(name='auto', streaming=False):
+    """Return a JSON decoder backend instance, or None if not available.
+
+    Optional arguments:
+        name -- str: name of the backend, or "auto" for the fastest one installed.
+        streaming -- bool: if True, the backend is to decode values within a longer text.
+
+    For streaming, "auto" prefers backends with raw decoding, because the others
+    need the text of each value to be scanned before decoding.
+    """
+    backendClasses = BACKENDS
+    if name == 'auto':
+        if streaming:
+            backendClasses = [backend for backend in BACKENDS if backend.RAW_DECODING]
+    else:
+        backendClasses = [backend for backend in BACKENDS if backend.NAME == name]
+    for backendClass in backendClasses:
+        try:
+            return backendClass()
+
+        except ImportError:
+            pass
+    return None
@@ -0,0 +1,285 @@
+"""Provide a class for incremental reading of JSON text.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import re
+import codecs
+from aeon3ywlib.json_backends import JsonBackend
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+BRACKET_SEARCH = re.compile(r'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*([{}\[\]"])', re.DOTALL)
+# Match everything up to the next bracket, skipping complete JSON strings.
+# A quotation mark instead of a bracket indicates a string not read completely.
+NUMBER_CHARACTERS = frozenset('0123456789.eE+-')
+# Characters that may continue a number.
+
+
+class JsonStream:
+    """Incremental reader for JSON text within a bytes-like object.
+
+    Public methods:
+        peek() -- return the first character of the next token.
+        read_value() -- return the next value, decoded.
+        read_text() -- return the JSON text of the next value, without decoding it.
+        skip_value() -- skip the next value.
+        iter_object() -- iterate over the member names of the next object.
+        iter_array() -- iterate over the elements of the next array.
+        iter_events(targets) -- iterate over selected values of the next object.
+        tell() -- return the byte offset of the next token.
+
+    The text is decoded chunk by chunk, so only the unread part of the
+    current chunk is held as a string. Objects and arrays can be traversed
+    member by member, decoding each member value on its own.
+    Invalid JSON data raises a ValueError; skipped objects and arrays
+    are not validated, though.
+    """
+    CHUNK_SIZE = 1024 * 1024
+    # Number of bytes to be decoded at once.
+
+    def __init__(self, data, start=0, end=None, backend=None):
+        """Set the data to read.
+
+        Positional arguments:
+            data -- bytes-like object containing UTF-8 encoded JSON text.
+
+        Optional arguments:
+            start -- int: byte offset of the JSON text.
+            end -- int: byte offset of the JSON text's end (default: end of data).
+            backend -- JsonBackend instance decoding the values (default: standard library).
+
+        If the backend cannot decode values within a longer text,
+        the text of objects and arrays is scanned and decoded as a whole.
+
+        Bytes following the JSON text, e.g. binary attachments, are only
+        decoded as far as they are part of the last chunk read.
+        Invalid UTF-8 sequences are replaced, so they do not stop reading.
+        """
+        self._data = data
+        if end is None:
+            end = len(data)
+        self._end = end
+        self._next = start
+        # Byte offset of the data not decoded yet.
+        self._base = start
+        # Byte offset of the buffer's beginning.
+        self._buffer = ''
+        self._pos = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        if backend is None:
+            backend = JsonBackend()
+        self._decode = backend.raw_decode
+        self._loads = None
+        if not backend.RAW_DECODING:
+            self._loads = backend.loads
+
+    def peek(self):
+        """Return the first character of the next token.
+
+        Skip whitespace. Raise a ValueError at the end of the data.
+        """
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+
+            if not self._fill(self.CHUNK_SIZE):
+                raise ValueError('Unexpected end of JSON data')
+
+    def read_value(self):
+        """Return the next value, decoded."""
+        if self.peek() in '{[' and self._loads is not None:
+            return self._loads(self.read_text())
+
+        size = self.CHUNK_SIZE
+        while True:
+            try:
+                value, end = self._decode(self._buffer, self._pos)
+                if self._next >= self._end or (end < len(self._buffer) and not self._buffer[end] in NUMBER_CHARACTERS):
+                    # A value at the end of the buffer, or followed by a number character,
+                    # might be a truncated number.
+                    self._pos = end
+                    return value
+
+            except ValueError:
+                if self._next >= self._end:
+                    raise
+
+            self._fill(size)
+            size *= 2
+
+    def read_text(self):
+        """Return the JSON text of the next value, without decoding it.
+
+        The brackets of objects and arrays are matched, but the text is not validated.
+        """
+        return self._scan_value(True)
+
+    def skip_value(self):
+        """Skip the next value.
+
+        Objects and arrays are scanned without decoding,
+        and without keeping more than a chunk in the buffer.
+        """
+        self._scan_value(False)
+
+    def iter_object(self):
+        """Iterate over the member names of the next object.
+
+        Before iterating on, the member value must be read or skipped.
+        """
+        self._expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            if self.peek() != '"':
+                raise ValueError(f'Expecting property name at byte {self.tell()}')
+
+            key = self.read_value()
+            self._expect(':')
+            yield key
+
+            if self.peek() == '}':
+                self._pos += 1
+                return
+
+            self._expect(',')
+
+    def iter_array(self):
+        """Iterate over the elements of the next array, yielding their indexes.
+
+        Before iterating on, the element must be read or skipped.
+        """
+        self._expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+
+        i = 0
+        while True:
+            yield i
+
+            if self.peek() == ']':
+                self._pos += 1
+                return
+
+            self._expect(',')
+            i += 1
+
+    def iter_events(self, targets, path=()):
+        """Iterate over selected values of the next object.
+
+        Positional arguments:
+            targets -- dict: for each path (tuple of member names) to a value to be read,
+                       True, if each member of the value is to be yielded separately,
+                       False, if the value is to be yielded as a whole,
+                       None, if the value's JSON text is to be yielded undecoded.
+
+        Optional arguments:
+            path -- tuple of member names leading to the next object.
+
+        Yield tuples (path, name, value), where name is the member name, if yielded
+        separately, or None. The values are yielded in the order of reading.
+        All values not leading to a target are skipped.
+        """
+        prefixes = set()
+        for target in targets:
+            for i in range(len(path) + 1, len(target)):
+                prefixes.add(target[:i])
+        for name in self.iter_object():
+            memberPath = path + (name,)
+            if memberPath in targets:
+                if targets[memberPath]:
+                    for memberName in self.iter_object():
+                        yield memberPath, memberName, self.read_value()
+                elif targets[memberPath] is None:
+                    yield memberPath, None, self.read_text()
+                else:
+                    yield memberPath, None, self.read_value()
+            elif memberPath in prefixes:
+                yield from self.iter_events(targets, memberPath)
+            else:
+                self.skip_value()
+
+    def tell(self):
+        """Return the byte offset of the next character to read."""
+        return self._base + len(self._buffer[:self._pos].encode('utf-8'))
+
+    def _scan_value(self, keep):
+        """Move on to the end of the next value, matching brackets.
+
+        Positional arguments:
+            keep -- bool: if True, keep the value's text in the buffer and return it.
+
+        Scalar values are decoded.
+        """
+        if self.peek() not in '{[':
+            start = self._pos
+            base = self._base
+            self.read_value()
+            if not keep:
+                return None
+
+            if self._base != base:
+                # The buffer was refilled, beginning with the value.
+                start = 0
+            return self._buffer[start:self._pos]
+
+        i = self._pos
+        depth = 0
+        while True:
+            match = BRACKET_SEARCH.match(self._buffer, i)
+            if match is None or match.group(1) == '"':
+                # Read on from the last complete token.
+                if match is None:
+                    i = len(self._buffer)
+                else:
+                    i = match.start(1)
+                if not keep:
+                    self._pos = i
+                i -= self._pos
+                if not self._fill(self.CHUNK_SIZE):
+                    raise ValueError('Unexpected end of JSON data')
+
+                continue
+
+            if match.group(1) in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    text = None
+                    if keep:
+                        text = self._buffer[self._pos:match.end()]
+                    self._pos = match.end()
+                    return text
+
+            i = match.end()
+
+    def _expect(self, character):
+        """Consume the next token, which must be the character given."""
+        if self.peek() != character:
+            raise ValueError(f'Expecting "{character}" at byte {self.tell()}')
+
+        self._pos += 1
+
+    def _fill(self, size):
+        """Append the next bytes to the buffer, dropping the part already read.
+
+        Positional arguments:
+            size -- int: maximum number of bytes to decode.
+
+        Return False at the end of the data.
+        """
+        if self._next >= self._end:
+            return False
+
+        chunk = self._data[self._next:min(self._next + size, self._end)]
+        self._next += len(chunk)
+        self._base = self.tell()
+        self._buffer = self._buffer[self._pos:] + self._decoder.decode(chunk, self._next >= self._end)
+        self._pos = 0
+        return True
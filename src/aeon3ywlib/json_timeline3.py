@@ -4,16 +4,26 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/aeon3yw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
-import json
-from datetime import datetime
-from datetime import timedelta
+import mmap
+import hashlib
+from collections import OrderedDict
 from pywriter.pywriter_globals import ERROR
 from pywriter.model.novel import Novel
 from pywriter.model.scene import Scene
 from pywriter.model.chapter import Chapter
 from pywriter.model.world_element import WorldElement
 from pywriter.model.character import Character
-from aeon3ywlib.aeon3_fop import scan_file
+from aeon3ywlib.aeon3_fop import open_file
+from aeon3ywlib.aeon3_fop import read_offset_index
+from aeon3ywlib.aeon3_fop import write_offset_index
+from aeon3ywlib.json_stream import JsonStream
+from aeon3ywlib.json_backends import get_backend
+from aeon3ywlib.tag_table import TagTable
+from aeon3ywlib.scene_table import SceneTable
+from aeon3ywlib.aeon3_calendar import get_date_time
+from aeon3ywlib.aeon3_calendar import get_duration
+from aeon3ywlib.aeon3_calendar import get_ordinal
+from aeon3ywlib.aeon3_calendar import SECONDS_PER_DAY
 
 
 class JsonTimeline3(Novel):
@@ -21,15 +31,38 @@ class JsonTimeline3(Novel):
 
     Public methods:
         read() -- parse the file and get the instance variables.
+        check_labels() -- check whether the project defines all labels configured.
+        add_item_handler(typeLabel, handler) -- register a function for converting items of a type.
+
+    Public instance variables:
+        tagTable -- TagTable: the tags of all entities.
 
     Represents the JSON part of the project file.
+    Items are converted by handlers that are looked up by the item's type.
+    Subclasses and plugins can convert further item types by adding handlers.
     """
     EXTENSION = '.aeon'
     DESCRIPTION = 'Aeon Timeline 3 project'
     SUFFIX = ''
-    DATE_LIMIT = (datetime(100, 1, 1) - datetime.min).total_seconds()
+
+    MODEL_PARTS = ('scenes', 'dates', 'relationships', 'narrative', 'characters', 'locations', 'items')
+    # Parts of the novel model that can be read:
+    # scenes -- events with title, description, tags, and notes.
+    # dates -- scene date, time, and duration.
+    # relationships -- characters and locations assigned to the scenes.
+    # narrative -- parts and chapters with their scenes.
+    # characters, locations, items -- story world elements.
+    DATE_LIMIT = get_ordinal(100, 1, 1) * SECONDS_PER_DAY
     # Dates before 100-01-01 can not be displayed properly in yWriter
 
+    SCHEMA_CACHE_SIZE = 16
+    # Maximum number of resolved schemas kept in the cache.
+
+    _schemaCache = OrderedDict()
+    # Resolved schemas, shared by all instances; the least recently used one is discarded first.
+    # key = (hash of the definitions, label settings)
+    # value = dict: type, property, and reference GUIDs
+
     def __init__(self, filePath, **kwargs):
         """Initialize instance variables.
 
@@ -52,6 +85,14 @@ class JsonTimeline3(Novel):
             item_label -- str: label of the "Item" role type.
             part_number_prefix -- str: prefix to the part number in the part's heading.
             chapter_number_prefix -- str: prefix to the chapter number in the chapter's heading.
+
+        Optional keyword arguments:
+            use_mmap -- bool: if True, read the JSON part from a memory-mapped file (default: True).
+            use_offset_index -- bool: if True, keep the JSON part's position in a sidecar file (default: False).
+            preflight -- bool: if True, check the labels before reading the data (default: False).
+            json_backend -- str: name of the JSON decoder to use, or "auto" (default).
+            model_parts -- iterable of str: parts of the novel model to read (default: MODEL_PARTS).
+            scene_table -- bool: if True, hold the scenes read in a columnar SceneTable (default: False).
         
         Extends the superclass constructor.
         """
@@ -79,290 +120,342 @@ class JsonTimeline3(Novel):
         # Misc.
         self._partHdPrefix = kwargs['part_number_prefix']
         self._chapterHdPrefix = kwargs['chapter_number_prefix']
+        self._useMmap = kwargs.get('use_mmap', True)
+        self._useOffsetIndex = kwargs.get('use_offset_index', False)
+        self._preflight = kwargs.get('preflight', False)
+        self._jsonBackendName = kwargs.get('json_backend', 'auto')
+        self._jsonBackend = get_backend(self._jsonBackendName)
+        # Decoder for whole JSON texts.
+        self._streamBackend = get_backend(self._jsonBackendName, streaming=True)
+        # Decoder for the values read one by one.
+        self._modelParts = set(kwargs.get('model_parts', self.MODEL_PARTS))
+        self._readDates = 'dates' in self._modelParts
+        self._useSceneTable = kwargs.get('scene_table', False)
+        self.tagTable = TagTable()
+
+        # Item handlers by type label.
+        self._itemHandlersByLabel = {}
+        if 'scenes' in self._modelParts:
+            self.add_item_handler(self._labelEventType, self._read_event)
+        if 'characters' in self._modelParts:
+            self.add_item_handler(self._labelCharacterType, self._read_character)
+        if 'locations' in self._modelParts:
+            self.add_item_handler(self._labelLocationType, self._read_location)
+        if 'items' in self._modelParts:
+            self.add_item_handler(self._labelItemType, self._read_item)
+
+    def add_item_handler(self, typeLabel, handler):
+        """Register a function for converting items of a type.
+
+        Positional arguments:
+            typeLabel -- str: label of the Aeon item type.
+            handler -- function(uid, dataItem) to be called with each item's GUID and decoded data.
+
+        A handler registered before for the same type label is replaced.
+        When reading the definitions, the type labels are resolved to type GUIDs,
+        so the handlers can be looked up by the items' type.
+        Narrative folder types are always converted to chapters.
+        """
+        self._itemHandlersByLabel[typeLabel] = handler
 
     def read(self):
         """Parse the file and get the instance variables.
         
         Extract the JSON part of the Aeon Timeline 3 file located at filePath
         and build a yWriter novel structure.
+        Items and relationships not needed for the model parts to read are skipped.
+        In preflight mode, stop before reading the data if a required label is not defined,
+        and append the warning about undefined optional labels, if any, to the success message.
         Return a message beginning with the ERROR constant in case of error.
         Overrides the superclass method.
         """
-        jsonPart = scan_file(self.filePath)
-        if not jsonPart:
-            return f'{ERROR}No JSON part found.'
-        elif jsonPart.startswith(ERROR):
-            return jsonPart
-        try:
-            jsonData = json.loads(jsonPart)
-        except('JSONDecodeError'):
-            return f'{ERROR}Invalid JSON data.'
+        if self._jsonBackend is None or self._streamBackend is None:
+            return f'{ERROR}JSON decoder "{self._jsonBackendName}" is not available.'
 
-        #--- Find types.
-        typeEventUid = None
-        typeCharacterUid = None
-        typeLocationUid = None
-        typeItemUid = None
-        NarrativeFolderTypes = []
-        for uid in jsonData['definitions']['types']['byId']:
+        data = open_file(self.filePath, self._useMmap)
+        if isinstance(data, str):
+            return data
 
-            if jsonData['definitions']['types']['byId'][uid]['isNarrativeFolder']:
-                NarrativeFolderTypes.append(uid)
+        try:
+            warning = ''
+            if self._preflight:
+                warning = self._check_labels(data)
+                if warning.startswith(ERROR):
+                    return warning
+
+            message = self._read_json(data)
+            if warning and not message.startswith(ERROR):
+                message = f'{message} {warning}'
+            return message
+
+        except ValueError:
+            return f'{ERROR}Invalid JSON data.'
 
-            elif jsonData['definitions']['types']['byId'][uid]['label'] == self._labelEventType:
-                typeEventUid = uid
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
 
-            elif jsonData['definitions']['types']['byId'][uid]['label'] == self._labelCharacterType:
-                typeCharacterUid = uid
+    def check_labels(self):
+        """Check whether the project defines all labels configured.
 
-            elif jsonData['definitions']['types']['byId'][uid]['label'] == self._labelLocationType:
-                typeLocationUid = uid
+        Decode only the definitions section of the JSON part.
+        Return a message beginning with the ERROR constant
+        and listing the settings with undefined required labels, if any.
+        Undefined optional labels are listed in a warning without the ERROR constant.
+        """
+        if self._jsonBackend is None or self._streamBackend is None:
+            return f'{ERROR}JSON decoder "{self._jsonBackendName}" is not available.'
 
-            elif jsonData['definitions']['types']['byId'][uid]['label'] == self._labelItemType:
-                typeItemUid = uid
+        data = open_file(self.filePath, self._useMmap)
+        if isinstance(data, str):
+            return data
 
-        #--- Find properties.
-        propNotesUid = None
-        propChrDesc1Uid = None
-        propChrDesc2Uid = None
-        propChrDesc3Uid = None
-        propAkaUid = None
-        propViewpointUid = None
-        for uid in jsonData['definitions']['properties']['byId']:
+        try:
+            return self._check_labels(data) or 'All labels are defined.'
 
-            if jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelNotesProperty:
-                typeNotesUid = uid
+        except ValueError:
+            return f'{ERROR}Invalid JSON data.'
 
-            elif jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelChrDesc1Property:
-                propChrDesc1Uid = uid
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
 
-            elif jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelChrDesc2Property:
-                propChrDesc2Uid = uid
+    def _check_labels(self, data):
+        """Check whether the project defines all labels configured.
 
-            elif jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelChrDesc3Property:
-                propChrDesc3Uid = uid
+        Positional arguments:
+            data -- bytes-like object: content of the Aeon 3 project file.
+
+        Stop reading after the definitions, which normally precede the data.
+        Empty labels are not checked.
+        The event, character, and location types and references are required;
+        the other labels are optional, because the reader just skips their data if undefined.
+        Return a message beginning with the ERROR constant if a required label is not defined,
+        a warning listing the undefined optional labels, if any, or an empty string.
+        Raise a ValueError in case of invalid JSON data.
+        """
+        start = data.find(b'{')
+        if start < 0:
+            return f'{ERROR}No JSON part found.'
 
-            elif jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelAkaProperty:
-                propAkaUid = uid
+        for __, __, definitionsText in JsonStream(data, start, backend=self._streamBackend).iter_events({('definitions',): None}):
+            break
+
+        else:
+            return f'{ERROR}No type definitions found.'
+
+        self._resolve_schema(definitionsText)
+        typesByLabel = self._schema['typesByLabel']
+        missing = []
+        for setting, label, uid in (
+                ('type_event', self._labelEventType, typesByLabel.get(self._labelEventType, None)),
+                ('type_character', self._labelCharacterType, typesByLabel.get(self._labelCharacterType, None)),
+                ('type_location', self._labelLocationType, typesByLabel.get(self._labelLocationType, None)),
+                ('character_label', self._labelParticipantRef, self._refParticipant),
+                ('location_label', self._labelLocationRef, self._refLocation),
+                ):
+            if label and uid is None:
+                missing.append(f'{setting} = {label}')
+        if missing:
+            return f'{ERROR}Labels not defined in the project: {"; ".join(missing)}.'
+
+        for setting, label, uid in (
+                ('type_item', self._labelItemType, typesByLabel.get(self._labelItemType, None)),
+                ('notes_label', self._labelNotesProperty, self._propNotesUid),
+                ('character_desc_label1', self._labelChrDesc1Property, self._propChrDesc1Uid),
+                ('character_desc_label2', self._labelChrDesc2Property, self._propChrDesc2Uid),
+                ('character_desc_label3', self._labelChrDesc3Property, self._propChrDesc3Uid),
+                ('character_aka_label', self._labelAkaProperty, self._propAkaUid),
+                ('viewpoint_label', self._labelViewpointProperty, self._propViewpointUid),
+                ('item_label', self._labelItemRef, self._refItem),
+                ):
+            if label and uid is None:
+                missing.append(f'{setting} = {label}')
+        if missing:
+            return f'Optional labels not defined in the project: {"; ".join(missing)}.'
+
+        return ''
+
+    def _read_json(self, data):
+        """Build the novel structure while reading the JSON part.
 
-            elif jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelViewpointProperty:
-                propViewpointUid = uid
+        Positional arguments:
+            data -- bytes-like object: content of the Aeon 3 project file.
 
-        #--- Find references.
-        refParticipant = None
-        refLocation = None
-        for uid in jsonData['definitions']['references']['byId']:
-
-            if jsonData['definitions']['references']['byId'][uid]['label'] == self._labelParticipantRef:
-                refParticipant = uid
-
-            elif jsonData['definitions']['references']['byId'][uid]['label'] == self._labelLocationRef:
-                refLocation = uid
-
-        #--- Read items.
-        crIdsByGuid = {}
-        lcIdsByGuid = {}
-        itIdsByGuid = {}
-        scIdsByGuid = {}
-        chIdsByGuid = {}
-        characterCount = 0
-        locationCount = 0
-        itemCount = 0
-        eventCount = 0
-        chapterCount = 0
-        vpGuidByScId = {}
-        for uid in jsonData['data']['items']['byId']:
-            dataItem = jsonData['data']['items']['byId'][uid]
-            if dataItem['type'] == typeEventUid:
-
-                #--- Create scenes.
-                eventCount += 1
-                scId = str(eventCount)
-                scIdsByGuid[uid] = scId
-                self.scenes[scId] = Scene()
-                self.scenes[scId].status = 1
-                # Set scene status = "Outline"
-                self.scenes[scId].isNotesScene = True
-                # Will be set to False later if it is part of the narrative.
-                self.scenes[scId].title = dataItem['label']
-                self.scenes[scId].desc = dataItem['summary']
-                timestamp = dataItem['startDate']['timestamp']
-
-                #--- Get scene tags.
-                for tagId in dataItem['tags']:
-                    if self.scenes[scId].tags is None:
-                        self.scenes[scId].tags = []
-                    self.scenes[scId].tags.append(jsonData['data']['tags'][tagId])
-
-                #--- Get scene properties.
-                for propId in dataItem['propertyValues']:
-                    if propId == propNotesUid:
-                        self.scenes[scId].sceneNotes = dataItem['propertyValues'][propId]
-                    elif propId == propViewpointUid:
-                        vpGuidByScId[scId] = dataItem['propertyValues'][propId]
-
-                #--- Get scene date, time, and duration.
-                if timestamp is not None and timestamp >= self.DATE_LIMIT:
-                    # Restrict date/time calculation to dates within yWriter's range
-                    sceneStart = datetime.min + timedelta(seconds=timestamp)
-                    startDateTime = sceneStart.isoformat().split('T')
-                    self.scenes[scId].date = startDateTime[0]
-                    self.scenes[scId].time = startDateTime[1]
-
-                    # Calculate duration.
-                    if dataItem['duration']['years'] > 0 or dataItem['duration']['months'] > 0:
-                        endYear = sceneStart.year + dataItem['duration']['years']
-                        endMonth = sceneStart.month
-                        if dataItem['duration']['months'] > 0:
-                            endMonth += dataItem['duration']['months']
-                            while endMonth > 12:
-                                endMonth -= 12
-                                endYear += 1
-                        sceneDuration = datetime(endYear, endMonth, sceneStart.day) - \
-                                datetime(sceneStart.year, sceneStart.month, sceneStart.day)
-                        lastsDays = sceneDuration.days
-                        lastsHours = sceneDuration.seconds // 3600
-                        lastsMinutes = (sceneDuration.seconds % 3600) // 60
+        The JSON document is never held as a whole: The definitions,
+        each item, each relationship, the narrative, and the tags
+        are decoded one at a time and processed right away.
+        Items are converted as soon as they are read, so the schema must be resolved before.
+        If the definitions follow the data, the JSON part is read a second time.
+        Return a message beginning with the ERROR constant in case of error.
+        Raise a ValueError in case of invalid JSON data.
+        """
+        span = None
+        if self._useOffsetIndex:
+            span = read_offset_index(self.filePath, data)
+        if span is None:
+            start = data.find(b'{')
+            end = None
+            if start < 0:
+                return f'{ERROR}No JSON part found.'
+
+        else:
+            start, end = span
+
+        #--- Reset the conversion state.
+        self._schemaResolved = False
+        self._itemHandlers = {}
+        self._crIdsByGuid = {}
+        self._lcIdsByGuid = {}
+        self._itIdsByGuid = {}
+        self._scIdsByGuid = {}
+        self._chIdsByGuid = {}
+        self._characterCount = 0
+        self._locationCount = 0
+        self._itemCount = 0
+        self._eventCount = 0
+        self._chapterCount = 0
+        self._vpGuidByScId = {}
+        elemIdsByScIdByRef = {}
+        # Insertion-ordered sets of related element IDs by scene ID by reference GUID.
+        pendingRelationships = []
+        # Relationships read before the items, as tuples of GUIDs (reference, subject, object).
+        narrative = {'children': []}
+        self.tagTable = TagTable()
+
+        #--- Select the JSON values to read.
+        targets = {
+            ('definitions',): None,
+            ('data', 'items', 'byId'): True,
+            ('data', 'tags'): False,
+            }
+        if 'relationships' in self._modelParts:
+            targets[('data', 'relationships', 'byId')] = True
+        if 'narrative' in self._modelParts:
+            targets[('data', 'narrative')] = False
+
+        #--- Process the JSON values in the order of reading.
+        for __ in range(2):
+            dataSkipped = False
+            stream = JsonStream(data, start, end, self._streamBackend)
+            phase = None
+            itemsRead = False
+            for path, uid, value in stream.iter_events(targets):
+                section = path[1] if path[0] == 'data' else path[0]
+                if section != phase:
+                    if phase is not None:
+                        self._end_phase(phase)
+                    if phase == 'items':
+                        itemsRead = True
+                    phase = section
+                if path == ('data', 'items', 'byId') and self._schemaResolved:
+                    handler = self._itemHandlers.get(value['type'], None)
+                    if handler is not None:
+                        handler(uid, value)
+                elif path == ('definitions',):
+                    if not self._schemaResolved:
+                        self._resolve_schema(value)
+                        for refUid in (self._refParticipant, self._refLocation):
+                            if refUid is not None:
+                                elemIdsByScIdByRef[refUid] = {}
+                elif not self._schemaResolved:
+                    # The data is to be processed in a second pass.
+                    dataSkipped = True
+                elif path == ('data', 'relationships', 'byId'):
+                    if itemsRead:
+                        # Keep the element IDs rather than the decoded GUIDs.
+                        self._add_relationship(elemIdsByScIdByRef, value['reference'], value['subject'], value['object'])
+                    elif value['reference'] in elemIdsByScIdByRef:
+                        pendingRelationships.append((value['reference'], value['subject'], value['object']))
+                elif path == ('data', 'narrative'):
+                    narrative = value
+                elif path == ('data', 'tags'):
+                    for tagGuid, tagLabel in value.items():
+                        self.tagTable.set_label(tagGuid, tagLabel)
+            if phase is not None:
+                self._end_phase(phase)
+            if not dataSkipped:
+                break
+
+        if not self._schemaResolved:
+            return f'{ERROR}No type definitions found.'
+
+        if span is None and self._useOffsetIndex:
+            write_offset_index(self.filePath, data, (start, stream.tell()))
+        stream = None
+        value = None
+        # Release the decoding buffer and the last value read.
+
+        #--- Resolve tags.
+        for elements in (self.scenes, self.characters, self.locations, self.items):
+            for elemId in elements:
+                if elements[elemId].tags is not None:
+                    elements[elemId].tags = self.tagTable.get_labels(elements[elemId].tags)
+        self._end_phase('tag resolution')
+
+        #--- Assign characters and locations to the scenes.
+        if 'relationships' in self._modelParts:
+            vpIdsByScId = {}
+            for scId, vpGuid in self._vpGuidByScId.items():
+                vpId = self._crIdsByGuid.get(vpGuid, None)
+                if vpId is not None:
+                    vpIdsByScId[scId] = vpId
+            for relationship in pendingRelationships:
+                self._add_relationship(elemIdsByScIdByRef, *relationship)
+            pendingRelationships = None
+            for refUid, elemIdsByScId in elemIdsByScIdByRef.items():
+                for scId, elemIds in elemIdsByScId.items():
+                    if refUid == self._refParticipant:
+                        #--- Put the viewpoint character first.
+                        vpId = vpIdsByScId.pop(scId, None)
+                        if vpId is not None:
+                            elemIds.pop(vpId, None)
+                            self.scenes[scId].characters = [vpId, *elemIds]
+                        else:
+                            self.scenes[scId].characters = list(elemIds)
                     else:
-                        lastsDays = 0
-                        lastsHours = 0
-                        lastsMinutes = 0
-                    lastsDays += dataItem['duration']['weeks'] * 7
-                    lastsDays += dataItem['duration']['days']
-                    lastsDays += dataItem['duration']['hours'] // 24
-                    lastsHours += dataItem['duration']['hours'] % 24
-                    lastsHours += dataItem['duration']['minutes'] // 60
-                    lastsMinutes += dataItem['duration']['minutes'] % 60
-                    lastsMinutes += dataItem['duration']['seconds'] // 60
-                    lastsHours += lastsMinutes // 60
-                    lastsMinutes %= 60
-                    lastsDays += lastsHours // 24
-                    lastsHours %= 24
-                    self.scenes[scId].lastsDays = str(lastsDays)
-                    self.scenes[scId].lastsHours = str(lastsHours)
-                    self.scenes[scId].lastsMinutes = str(lastsMinutes)
-            elif dataItem['type'] in NarrativeFolderTypes:
-                #--- Create chapters.
-                chapterCount += 1
-                chId = str(chapterCount)
-                chIdsByGuid[uid] = chId
-                self.chapters[chId] = Chapter()
-                self.chapters[chId].desc = dataItem['label']
-            elif dataItem['type'] == typeCharacterUid:
-                #--- Create characters.
-                characterCount += 1
-                crId = str(characterCount)
-                crIdsByGuid[uid] = crId
-                self.characters[crId] = Character()
-                if dataItem['shortLabel']:
-                    self.characters[crId].title = dataItem['shortLabel']
-                else:
-                    self.characters[crId].title = dataItem['label']
-                self.characters[crId].fullName = dataItem['label']
-                self.characters[crId].bio = dataItem['summary']
-                self.srtCharacters.append(crId)
-
-                #--- Get character tags.
-                for tagId in dataItem['tags']:
-                    if self.characters[crId].tags is None:
-                        self.characters[crId].tags = []
-                    self.characters[crId].tags.append(jsonData['data']['tags'][tagId])
-
-                #--- Get character properties.
-                charDesc = []
-                for propId in dataItem['propertyValues']:
-                    if propId == propNotesUid:
-                        self.characters[crId].notes = dataItem['propertyValues'][propId]
-                    elif propId == propAkaUid:
-                        self.characters[crId].aka = dataItem['propertyValues'][propId]
-                    elif propId == propChrDesc1Uid:
-                        charDesc.append(dataItem['propertyValues'][propId])
-                    elif propId == propChrDesc2Uid:
-                        charDesc.append(dataItem['propertyValues'][propId])
-                    elif propId == propChrDesc3Uid:
-                        charDesc.append(dataItem['propertyValues'][propId])
-                self.characters[crId].desc = ('\n').join(charDesc)
-            elif dataItem['type'] == typeLocationUid:
-                #--- Create locations.
-                locationCount += 1
-                lcId = str(locationCount)
-                lcIdsByGuid[uid] = lcId
-                self.locations[lcId] = WorldElement()
-                self.locations[lcId].title = dataItem['label']
-                self.locations[lcId].desc = dataItem['summary']
-                self.srtLocations.append(lcId)
-
-                #--- Get location tags.
-                for tagId in dataItem['tags']:
-                    if self.locations[lcId].tags is None:
-                        self.locations[lcId].tags = []
-                    self.locations[lcId].tags.append(jsonData['data']['tags'][tagId])
-            elif dataItem['type'] == typeItemUid:
-                #--- Create items.
-                itemCount += 1
-                itId = str(itemCount)
-                itIdsByGuid[uid] = itId
-                self.items[itId] = WorldElement()
-                self.items[itId].title = dataItem['label']
-                self.items[itId].desc = dataItem['summary']
-                self.srtItems.append(itId)
-
-                #--- Get item tags.
-                for tagId in dataItem['tags']:
-                    if self.items[itId].tags is None:
-                        self.items[itId].tags = []
-                    self.items[itId].tags.append(jsonData['data']['tags'][tagId])
-        #--- Read relationships.
-        for uid in jsonData['data']['relationships']['byId']:
-            if jsonData['data']['relationships']['byId'][uid]['reference'] == refParticipant:
-                #--- Assign characters.
-                try:
-                    scId = scIdsByGuid[jsonData['data']['relationships']['byId'][uid]['subject']]
-                    crId = crIdsByGuid[jsonData['data']['relationships']['byId'][uid]['object']]
-                    if self.scenes[scId].characters is None:
-                        self.scenes[scId].characters = []
-                    if not crId in self.scenes[scId].characters:
-                        self.scenes[scId].characters.append(crId)
-                except:
-                    pass
-            elif jsonData['data']['relationships']['byId'][uid]['reference'] == refLocation:
-                #--- Assign locations.
-                try:
-                    scId = scIdsByGuid[jsonData['data']['relationships']['byId'][uid]['subject']]
-                    lcId = lcIdsByGuid[jsonData['data']['relationships']['byId'][uid]['object']]
-                    if self.scenes[scId].locations is None:
-                        self.scenes[scId].locations = []
-                    if not lcId in self.scenes[scId].locations:
-                        self.scenes[scId].locations.append(lcId)
-                except:
-                    pass
-        #--- Set scene viewpoints.
-        for scId in vpGuidByScId:
-            if vpGuidByScId[scId] in crIdsByGuid:
-                vpId = crIdsByGuid[vpGuidByScId[scId]]
-                if self.scenes[scId].characters is None:
-                    self.scenes[scId].characters = []
-                elif vpId in self.scenes[scId].characters:
-                    self.scenes[scId].characters.remove[vpId]
-                self.scenes[scId].characters.insert(0, vpId)
-        #--- Build a narrative structure with 2 or 3 levels.
-        for narrative0 in jsonData['data']['narrative']['children']:
-            if narrative0['id'] in chIdsByGuid:
-                self.srtChapters.append(chIdsByGuid[narrative0['id']])
-            for narrative1 in narrative0['children']:
-                if narrative1['id'] in chIdsByGuid:
-                    self.srtChapters.append(chIdsByGuid[narrative1['id']])
-                    self.chapters[chIdsByGuid[narrative0['id']]].chLevel = 1
-                    for narrative2 in narrative1['children']:
-                        if narrative2['id'] in scIdsByGuid:
-                            self.chapters[chIdsByGuid[narrative1['id']]].srtScenes.append(
-                                scIdsByGuid[narrative2['id']])
-                            self.scenes[scIdsByGuid[narrative2['id']]].isNotesScene = False
-                            self.chapters[chIdsByGuid[narrative1['id']]].chLevel = 0
-                elif narrative1['id'] in scIdsByGuid:
-                    self.chapters[chIdsByGuid[narrative0['id']]].srtScenes.append(scIdsByGuid[narrative1['id']])
-                    self.scenes[scIdsByGuid[narrative1['id']]].isNotesScene = False
-                    self.chapters[chIdsByGuid[narrative0['id']]].chLevel = 0
+                        self.scenes[scId].locations = list(elemIds)
+
+            #--- Set the viewpoints of scenes without participants.
+            for scId, vpId in vpIdsByScId.items():
+                self.scenes[scId].characters = [vpId]
+        elemIdsByScIdByRef = None
+        self._vpGuidByScId = {}
+        self._crIdsByGuid = {}
+        self._lcIdsByGuid = {}
+        self._itIdsByGuid = {}
+        self._end_phase('relationship assignment')
+
+        #--- Build a narrative structure of any depth.
+        # Narrative folders become chapters in the order of appearance;
+        # folders containing folders become parts.
+        # Scenes are assigned to the innermost folder; scenes outside any folder remain notes scenes.
+        stack = [(node, None, (i,)) for i, node in reversed(list(enumerate(narrative['children'], 1)))]
+        # Narrative nodes to be processed, with the ID of the chapter made of their parent folder,
+        # and their narrative position.
+        while stack:
+            node, parentId, position = stack.pop()
+            chId = self._chIdsByGuid.get(node['id'], None)
+            if chId is not None:
+                self.srtChapters.append(chId)
+                self.chapters[chId].narrativePosition = position
+                if parentId is not None:
+                    self.chapters[parentId].chLevel = 1
+                for i, child in reversed(list(enumerate(node['children'], 1))):
+                    stack.append((child, chId, position + (i,)))
+            elif parentId is not None:
+                scId = self._scIdsByGuid.get(node['id'], None)
+                if scId is not None:
+                    self.chapters[parentId].srtScenes.append(scId)
+                    self.scenes[scId].isNotesScene = False
+                    self.scenes[scId].narrativePosition = position
+                    if self.chapters[parentId].chLevel is None:
+                        self.chapters[parentId].chLevel = 0
+        narrative = None
+        self._scIdsByGuid = {}
+        self._chIdsByGuid = {}
+        self._end_phase('narrative structure')
+
         #--- Auto-number untitled chapters.
         partCount = 0
         chapterCount = 0
@@ -376,7 +469,7 @@ class JsonTimeline3(Novel):
                 if not self.chapters[chId].title:
                     self.chapters[chId].title = f'{self._chapterHdPrefix} {chapterCount}'
         #--- Create a "Notes" chapter for non-narrative scenes.
-        chId = str(partCount + chapterCount + 1)
+        chId = partCount + chapterCount + 1
         self.chapters[chId] = Chapter()
         self.chapters[chId].title = 'Other events'
         self.chapters[chId].desc = 'Scenes generated from events that ar not assigned to the narrative structure.'
@@ -385,4 +478,318 @@ class JsonTimeline3(Novel):
         for scId in self.scenes:
             if self.scenes[scId].isNotesScene:
                 self.chapters[chId].srtScenes.append(scId)
+        self._end_phase('chapter numbering')
+        if self._useSceneTable:
+            self.scenes = SceneTable(self.scenes)
+            # The scenes are built as Scene instances, and copied into the table a column at a time.
         return 'Timeline data converted to novel structure.'
+
+    def _add_relationship(self, elemIdsByScIdByRef, refUid, subject, obj):
+        """Add the element related to a scene, if both are part of the model.
+
+        Positional arguments:
+            elemIdsByScIdByRef -- dict: insertion-ordered sets of element IDs by scene ID by reference GUID.
+            refUid -- str: GUID of the relationship's reference.
+            subject -- str: GUID of the event.
+            obj -- str: GUID of the related item.
+        """
+        elemIdsByScId = elemIdsByScIdByRef.get(refUid, None)
+        if elemIdsByScId is None:
+            return
+
+        scId = self._scIdsByGuid.get(subject, None)
+        if scId is None:
+            return
+
+        if refUid == self._refParticipant:
+            elemId = self._crIdsByGuid.get(obj, None)
+        else:
+            elemId = self._lcIdsByGuid.get(obj, None)
+        if elemId is not None:
+            elemIdsByScId.setdefault(scId, {})[elemId] = None
+
+    def _end_phase(self, phase):
+        """Hook called at the end of each phase of reading.
+
+        Positional arguments:
+            phase -- str: name of the phase, e.g. the section of the JSON part just read.
+
+        This is a stub to be overridden for monitoring, e.g. the memory usage.
+        Decoded data is released as soon as it has been processed.
+        """
+        pass
+
+    def _resolve_schema(self, definitionsText):
+        """Find the types, properties, and references by their labels, and build the item handler table.
+
+        Positional arguments:
+            definitionsText -- str: JSON text of the "definitions" section.
+
+        The resolved schema is cached, so the definitions are decoded
+        and searched only once for each version and label settings.
+        Raise a ValueError in case of invalid JSON data.
+        """
+        key = (
+            hashlib.sha1(definitionsText.encode('utf-8')).hexdigest(),
+            self._labelNotesProperty,
+            self._labelChrDesc1Property,
+            self._labelChrDesc2Property,
+            self._labelChrDesc3Property,
+            self._labelAkaProperty,
+            self._labelViewpointProperty,
+            self._labelParticipantRef,
+            self._labelLocationRef,
+            self._labelItemRef,
+            )
+        schema = self._schemaCache.get(key, None)
+        if schema is None:
+            schema = self._get_schema(self._jsonBackend.loads(definitionsText))
+            if len(self._schemaCache) >= self.SCHEMA_CACHE_SIZE:
+                self._schemaCache.popitem(last=False)
+            self._schemaCache[key] = schema
+        else:
+            self._schemaCache.move_to_end(key)
+
+        #--- Assign the item handlers to the types.
+        self._itemHandlers = {}
+        if 'narrative' in self._modelParts:
+            for uid in schema['narrativeFolderTypes']:
+                self._itemHandlers[uid] = self._read_narrative_folder
+        for typeLabel, handler in self._itemHandlersByLabel.items():
+            for uid in schema['typesByLabel'].get(typeLabel, []):
+                self._itemHandlers[uid] = handler
+
+        #--- Get properties and references.
+        self._propNotesUid = schema['propNotesUid']
+        self._propChrDesc1Uid = schema['propChrDesc1Uid']
+        self._propChrDesc2Uid = schema['propChrDesc2Uid']
+        self._propChrDesc3Uid = schema['propChrDesc3Uid']
+        self._propAkaUid = schema['propAkaUid']
+        self._propViewpointUid = schema['propViewpointUid']
+        self._refParticipant = schema['refParticipant']
+        self._refLocation = schema['refLocation']
+        self._refItem = schema['refItem']
+        self._schema = schema
+        self._schemaResolved = True
+
+    def _get_schema(self, definitions):
+        """Return a dictionary with the GUIDs of the types, properties, and references.
+
+        Positional arguments:
+            definitions -- dict: decoded "definitions" section of the JSON part.
+        """
+        schema = {}
+
+        #--- Find types.
+        narrativeFolderTypes = []
+        typesByLabel = {}
+        for uid, itemType in definitions['types']['byId'].items():
+            if itemType['isNarrativeFolder']:
+                narrativeFolderTypes.append(uid)
+            else:
+                typesByLabel.setdefault(itemType['label'], []).append(uid)
+        schema['narrativeFolderTypes'] = narrativeFolderTypes
+        schema['typesByLabel'] = typesByLabel
+
+        #--- Find properties.
+        schema['propNotesUid'] = None
+        schema['propChrDesc1Uid'] = None
+        schema['propChrDesc2Uid'] = None
+        schema['propChrDesc3Uid'] = None
+        schema['propAkaUid'] = None
+        schema['propViewpointUid'] = None
+        for uid, itemProperty in definitions['properties']['byId'].items():
+
+            if itemProperty['label'] == self._labelNotesProperty:
+                schema['propNotesUid'] = uid
+
+            elif itemProperty['label'] == self._labelChrDesc1Property:
+                schema['propChrDesc1Uid'] = uid
+
+            elif itemProperty['label'] == self._labelChrDesc2Property:
+                schema['propChrDesc2Uid'] = uid
+
+            elif itemProperty['label'] == self._labelChrDesc3Property:
+                schema['propChrDesc3Uid'] = uid
+
+            elif itemProperty['label'] == self._labelAkaProperty:
+                schema['propAkaUid'] = uid
+
+            elif itemProperty['label'] == self._labelViewpointProperty:
+                schema['propViewpointUid'] = uid
+
+        #--- Find references.
+        schema['refParticipant'] = None
+        schema['refLocation'] = None
+        schema['refItem'] = None
+        for uid, reference in definitions['references']['byId'].items():
+
+            if reference['label'] == self._labelParticipantRef:
+                schema['refParticipant'] = uid
+
+            elif reference['label'] == self._labelLocationRef:
+                schema['refLocation'] = uid
+
+            elif reference['label'] == self._labelItemRef:
+                schema['refItem'] = uid
+
+        return schema
+
+    def _read_event(self, uid, dataItem):
+        """Create a scene from an event item.
+
+        Positional arguments:
+            uid -- str: the item's GUID.
+            dataItem -- dict: decoded item.
+
+        Tags are stored as tag table IDs, to be resolved when all data is read.
+        """
+        self._eventCount += 1
+        scId = self._eventCount
+        self._scIdsByGuid[uid] = scId
+        scene = Scene()
+        scene.status = 1
+        # Set scene status = "Outline"
+        scene.isNotesScene = True
+        # Will be set to False later if it is part of the narrative.
+        scene.title = dataItem['label']
+        scene.desc = dataItem['summary']
+        timestamp = dataItem['startDate']['timestamp']
+
+        #--- Get scene tags.
+        if dataItem['tags']:
+            scene.tags = [self.tagTable.get_id(tagGuid) for tagGuid in dataItem['tags']]
+
+        #--- Get scene properties.
+        for propId, value in dataItem['propertyValues'].items():
+            if propId == self._propNotesUid:
+                scene.sceneNotes = value
+            elif propId == self._propViewpointUid:
+                self._vpGuidByScId[scId] = value
+
+        #--- Get scene date, time, and duration.
+        if self._readDates and timestamp is not None and timestamp >= self.DATE_LIMIT:
+            # Restrict date/time calculation to dates within yWriter's range
+            scene.date, scene.time = get_date_time(timestamp)
+
+            # Calculate duration.
+            duration = dataItem['duration']
+            try:
+                lastsDays, lastsHours, lastsMinutes = get_duration(
+                    timestamp,
+                    duration['years'],
+                    duration['months'],
+                    duration['weeks'],
+                    duration['days'],
+                    duration['hours'],
+                    duration['minutes'],
+                    duration['seconds'],
+                    )
+            except ValueError:
+                # The end date does not exist, e.g. one month after January 31st.
+                # Leave the duration empty rather than rejecting the whole project.
+                pass
+            else:
+                scene.lastsDays = str(lastsDays)
+                scene.lastsHours = str(lastsHours)
+                scene.lastsMinutes = str(lastsMinutes)
+        self.scenes[scId] = scene
+
+    def _read_narrative_folder(self, uid, dataItem):
+        """Create a chapter from a narrative folder item.
+
+        Positional arguments:
+            uid -- str: the item's GUID.
+            dataItem -- dict: decoded item.
+        """
+        self._chapterCount += 1
+        chId = self._chapterCount
+        self._chIdsByGuid[uid] = chId
+        chapter = Chapter()
+        self.chapters[chId] = chapter
+        chapter.desc = dataItem['label']
+
+    def _read_character(self, uid, dataItem):
+        """Create a character from a character item.
+
+        Positional arguments:
+            uid -- str: the item's GUID.
+            dataItem -- dict: decoded item.
+
+        Tags are stored as tag table IDs, to be resolved when all data is read.
+        """
+        self._characterCount += 1
+        crId = self._characterCount
+        self._crIdsByGuid[uid] = crId
+        character = Character()
+        self.characters[crId] = character
+        if dataItem['shortLabel']:
+            character.title = dataItem['shortLabel']
+        else:
+            character.title = dataItem['label']
+        character.fullName = dataItem['label']
+        character.bio = dataItem['summary']
+        self.srtCharacters.append(crId)
+
+        #--- Get character tags.
+        if dataItem['tags']:
+            character.tags = [self.tagTable.get_id(tagGuid) for tagGuid in dataItem['tags']]
+
+        #--- Get character properties.
+        charDesc = []
+        for propId, value in dataItem['propertyValues'].items():
+            if propId == self._propNotesUid:
+                character.notes = value
+            elif propId == self._propAkaUid:
+                character.aka = value
+            elif propId == self._propChrDesc1Uid:
+                charDesc.append(value)
+            elif propId == self._propChrDesc2Uid:
+                charDesc.append(value)
+            elif propId == self._propChrDesc3Uid:
+                charDesc.append(value)
+        character.desc = ('\n').join(charDesc)
+
+    def _read_location(self, uid, dataItem):
+        """Create a location from a location item.
+
+        Positional arguments:
+            uid -- str: the item's GUID.
+            dataItem -- dict: decoded item.
+
+        Tags are stored as tag table IDs, to be resolved when all data is read.
+        """
+        self._locationCount += 1
+        lcId = self._locationCount
+        self._lcIdsByGuid[uid] = lcId
+        location = WorldElement()
+        self.locations[lcId] = location
+        location.title = dataItem['label']
+        location.desc = dataItem['summary']
+        self.srtLocations.append(lcId)
+
+        #--- Get location tags.
+        if dataItem['tags']:
+            location.tags = [self.tagTable.get_id(tagGuid) for tagGuid in dataItem['tags']]
+
+    def _read_item(self, uid, dataItem):
+        """Create an item from an item of the "Item" type.
+
+        Positional arguments:
+            uid -- str: the item's GUID.
+            dataItem -- dict: decoded item.
+
+        Tags are stored as tag table IDs, to be resolved when all data is read.
+        """
+        self._itemCount += 1
+        itId = self._itemCount
+        self._itIdsByGuid[uid] = itId
+        item = WorldElement()
+        self.items[itId] = item
+        item.title = dataItem['label']
+        item.desc = dataItem['summary']
+        self.srtItems.append(itId)
+
+        #--- Get item tags.
+        if dataItem['tags']:
+            item.tags = [self.tagTable.get_id(tagGuid) for tagGuid in dataItem['tags']]
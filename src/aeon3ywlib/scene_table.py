@@ -0,0 +1,644 @@
+"""Provide classes for holding a novel's scenes in columns.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+from collections.abc import MutableMapping
+from itertools import accumulate
+from itertools import chain
+from operator import attrgetter
+from datetime import date
+from sys import intern
+from pywriter.model.scene import Scene
+
+
+def _encode_date(value):
+    """Return the day number of a date string in ISO format (yyyy-mm-dd)."""
+    return date.fromisoformat(value).toordinal()
+
+
+def _decode_date(code):
+    """Return the date string in ISO format (yyyy-mm-dd) of a day number."""
+    return date.fromordinal(code).isoformat()
+
+
+def _encode_time(value):
+    """Return the seconds of the day of a time string in ISO format (hh:mm:ss)."""
+    hours, minutes, seconds = value.split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def _decode_time(code):
+    """Return the time string in ISO format (hh:mm:ss) of the seconds of the day."""
+    minutes, seconds = divmod(code, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours:02}:{minutes:02}:{seconds:02}'
+
+
+def _encode_flag(value):
+    """Return the number of a bool value."""
+    if value is True:
+        return 1
+
+    if value is False:
+        return 0
+
+    raise ValueError
+
+
+def _decode_flag(code):
+    """Return the bool value of a number."""
+    return code == 1
+
+
+def _encode_number(value):
+    """Return the int of a decimal number string."""
+    if type(value) is not str:
+        raise ValueError
+
+    return int(value)
+
+
+def _decode_number(code):
+    """Return the decimal number string of an int."""
+    return str(code)
+
+
+def _encode_int(value):
+    """Return an int value as it is."""
+    if type(value) is not int:
+        raise ValueError
+
+    return value
+
+
+def _decode_int(code):
+    """Return a number as it is."""
+    return code
+
+
+class _Column:
+    """Descriptor of a scene attribute that is rarely set, held in a dictionary by row.
+
+    Public methods:
+        new_column() -- return an empty column.
+        extend(table, values, firstRow) -- add rows to the table's column.
+
+    Only the rows with a value other than the default take up memory.
+    """
+
+    def __init__(self, default=None):
+        self._default = default
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def new_column(self):
+        """Return an empty column."""
+        return {}
+
+    def extend(self, table, values, firstRow):
+        """Add rows to the table's column.
+
+        Positional arguments:
+            table -- SceneTable: the table to add to.
+            values -- list: the values of the rows.
+            firstRow -- int: index of the first row added.
+        """
+        if self._default is None and values.count(None) == len(values):
+            return
+
+        column = table._columns[self.name]
+        for row, value in enumerate(values, firstRow):
+            if value is not self._default:
+                column[row] = value
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+
+        return view._table._columns[self.name].get(view._row, self._default)
+
+    def __set__(self, view, value):
+        column = view._table._columns[self.name]
+        if value is self._default:
+            column.pop(view._row, None)
+        else:
+            column[view._row] = value
+
+
+class _StringColumn(_Column):
+    """Descriptor of a scene attribute held in a column of interned strings.
+
+    Repeated values, e.g. titles of recurring events, are held only once.
+    """
+
+    def new_column(self):
+        """Return an empty column.
+
+        Overrides the superclass method.
+        """
+        return []
+
+    def extend(self, table, values, firstRow):
+        """Add rows to the table's column, interning the strings.
+
+        Overrides the superclass method.
+        """
+        table._columns[self.name].extend([intern(value) if type(value) is str else value for value in values])
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+
+        return view._table._columns[self.name][view._row]
+
+    def __set__(self, view, value):
+        if type(value) is str:
+            value = intern(value)
+        view._table._columns[self.name][view._row] = value
+
+
+class _CodedColumn(_Column):
+    """Descriptor of a scene attribute held in an array of numbers.
+
+    Public methods:
+        encode(value) -- return the number for a value, or the overflow marker.
+
+    Public instance variables:
+        noneCode -- int: marker of None.
+        overflowCode -- int: marker of a value held in the overflow dictionary.
+
+    Values are encoded as numbers, so they take up only the array's item size.
+    Values that cannot be encoded and decoded to the same value are held
+    in the table's overflow dictionary instead, with a marker in the array.
+    The two smallest numbers of the array's type mark None and overflow.
+    """
+
+    def __init__(self, typecode, valueType, encode, decode):
+        """Initialize instance variables.
+
+        Positional arguments:
+            typecode -- str: type code of the array.
+            valueType -- type: type of the values to be encoded.
+            encode -- function returning the number of a value.
+            decode -- function returning the value of a number.
+        """
+        self._typecode = typecode
+        self._valueTypes = {valueType, type(None)}
+        self._encode = encode
+        self._decode = decode
+        bits = array(typecode).itemsize * 8
+        self.noneCode = -(1 << (bits - 1))
+        self.overflowCode = self.noneCode + 1
+        self._maxCode = (1 << (bits - 1)) - 1
+
+    def new_column(self):
+        """Return an empty column.
+
+        Overrides the superclass method.
+        """
+        return array(self._typecode)
+
+    def encode(self, value):
+        """Return the number for a value, or the overflow marker if it cannot be encoded."""
+        if value is None:
+            return self.noneCode
+
+        try:
+            code = self._encode(value)
+            if self.overflowCode < code <= self._maxCode and self._decode(code) == value:
+                return code
+
+        except (ValueError, TypeError, AttributeError):
+            pass
+        return self.overflowCode
+
+    def extend(self, table, values, firstRow):
+        """Add rows to the table's column, encoding the values.
+
+        Dates, times, durations, and flags repeat a lot, so if all values
+        are of the column's type, each distinct value is encoded once.
+        Values of other types are encoded one by one, so that e.g. 1 does
+        not get the number of True.
+        Overrides the superclass method.
+        """
+        if self._valueTypes.issuperset(map(type, values)):
+            codes = {value: self.encode(value) for value in set(values)}
+            codes = array(self._typecode, [codes[value] for value in values])
+        else:
+            codes = array(self._typecode, [self.encode(value) for value in values])
+        table._columns[self.name].extend(codes)
+        if self.overflowCode in codes:
+            overflow = table._overflow[self.name]
+            for row, code, value in zip(range(firstRow, firstRow + len(values)), codes, values):
+                if code == self.overflowCode:
+                    overflow[row] = value
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+
+        code = view._table._columns[self.name][view._row]
+        if code > self.overflowCode:
+            return self._decode(code)
+
+        if code == self.noneCode:
+            return None
+
+        return view._table._overflow[self.name][view._row]
+
+    def __set__(self, view, value):
+        table = view._table
+        overflow = table._overflow[self.name]
+        code = self.encode(value)
+        table._columns[self.name][view._row] = code
+        if code == self.overflowCode:
+            overflow[view._row] = value
+        else:
+            overflow.pop(view._row, None)
+
+
+class _DateColumn(_CodedColumn):
+    """Descriptor of the scene date, held in an array of day numbers.
+
+    Changing a date discards the table's date index.
+    """
+
+    def __set__(self, view, value):
+        super().__set__(view, value)
+        view._table._dateIndex = None
+
+
+class _IdLists:
+    """Storage of a list column, with the IDs of all rows in one array.
+
+    Public methods:
+        compact() -- drop the IDs of replaced values.
+
+    Public instance variables:
+        starts -- array of int: position of each row's first ID.
+        lengths -- array of int: number of IDs of each row, or a marker.
+        ids -- array of int: the IDs.
+        garbage -- int: number of IDs of replaced values.
+    """
+    __slots__ = ('starts', 'lengths', 'ids', 'garbage')
+
+    def __init__(self):
+        self.starts = array('i')
+        self.lengths = array('h')
+        self.ids = array('i')
+        self.garbage = 0
+
+    def compact(self):
+        """Drop the IDs of replaced values."""
+        ids = array('i')
+        for row, (start, length) in enumerate(zip(self.starts, self.lengths)):
+            if length > 0:
+                self.starts[row] = len(ids)
+                ids.extend(self.ids[start:start + length])
+        self.ids = ids
+        self.garbage = 0
+
+
+class _ListColumn(_Column):
+    """Descriptor of a scene attribute holding a list or tuple of IDs, held in arrays.
+
+    The IDs of all rows are held in one array, with each row's start
+    and length in two more arrays. So a list takes up four bytes per ID
+    and six bytes per row, instead of a list object and an int object per ID.
+    Values that cannot be encoded, e.g. lists of strings, are held
+    in the table's overflow dictionary instead.
+    A new list is decoded on each access, so changing it in place
+    does not change the scene; the changed list must be assigned.
+    """
+    NONE_LENGTH = -1
+    OVERFLOW_LENGTH = -2
+    MAX_LENGTH = 0x7fff
+    # Number of IDs of replaced values that is not worth compacting.
+    MIN_GARBAGE = 0x10000
+    ID_TYPES = {int}
+
+    def __init__(self, valueType):
+        """Initialize instance variables.
+
+        Positional arguments:
+            valueType -- type: list or tuple.
+        """
+        self._valueType = valueType
+        self._valueTypes = {valueType, type(None)}
+
+    def new_column(self):
+        """Return an empty column.
+
+        Overrides the superclass method.
+        """
+        return _IdLists()
+
+    def extend(self, table, values, firstRow):
+        """Add rows to the table's column, encoding the values.
+
+        If all values can be encoded, the IDs of all rows are added at once.
+        Otherwise, the rows are added one by one.
+        Overrides the superclass method.
+        """
+        lists = table._columns[self.name]
+        if self._valueTypes.issuperset(map(type, values)):
+            sizes = [0 if value is None else len(value) for value in values]
+            ids = list(chain.from_iterable(filter(None, values)))
+            if max(sizes) <= self.MAX_LENGTH and self.ID_TYPES.issuperset(map(type, ids)):
+                try:
+                    ids = array('i', ids)
+                except OverflowError:
+                    pass
+                else:
+                    lists.starts.extend(array('i', accumulate(sizes[:-1], initial=len(lists.ids))))
+                    lists.lengths.extend(array('h', [self.NONE_LENGTH if value is None else size for value, size in zip(values, sizes)]))
+                    lists.ids.extend(ids)
+                    return
+
+        for row, value in enumerate(values, firstRow):
+            lists.starts.append(0)
+            lists.lengths.append(self.NONE_LENGTH)
+            if value is not None:
+                self._set(table, row, value)
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+
+        lists = view._table._columns[self.name]
+        length = lists.lengths[view._row]
+        if length >= 0:
+            start = lists.starts[view._row]
+            return self._valueType(lists.ids[start:start + length])
+
+        if length == self.NONE_LENGTH:
+            return None
+
+        return view._table._overflow[self.name][view._row]
+
+    def __set__(self, view, value):
+        self._set(view._table, view._row, value)
+
+    def _set(self, table, row, value):
+        """Set the value of a row.
+
+        Positional arguments:
+            table -- SceneTable: the table holding the row.
+            row -- int: index of the row.
+            value -- the value to set.
+
+        The IDs are added at the end of the array. When the IDs of
+        replaced values take up half of the array, it is compacted.
+        """
+        lists = table._columns[self.name]
+        overflow = table._overflow[self.name]
+        oldLength = lists.lengths[row]
+        if oldLength == self.OVERFLOW_LENGTH:
+            del overflow[row]
+        elif oldLength > 0:
+            lists.garbage += oldLength
+        if value is None:
+            lists.lengths[row] = self.NONE_LENGTH
+            return
+
+        codes = None
+        if type(value) is self._valueType and len(value) <= self.MAX_LENGTH and all(type(item) is int for item in value):
+            try:
+                codes = array('i', value)
+            except OverflowError:
+                pass
+        if codes is None:
+            lists.lengths[row] = self.OVERFLOW_LENGTH
+            overflow[row] = value
+            return
+
+        lists.starts[row] = len(lists.ids)
+        lists.ids.extend(codes)
+        lists.lengths[row] = len(codes)
+        if lists.garbage > self.MIN_GARBAGE and lists.garbage * 2 > len(lists.ids):
+            lists.compact()
+
+
+class SceneView:
+    """Proxy of a scene held in a SceneTable, with the Scene instance variables.
+
+    Views are created on each access to a table's scene; they hold no data
+    of their own, so changes go to the table.
+    Lists of IDs are decoded on each access; to change one, assign the changed list.
+    """
+    __slots__ = ('_table', '_row')
+
+    STATUS = Scene.STATUS
+    ACTION_MARKER = Scene.ACTION_MARKER
+    REACTION_MARKER = Scene.REACTION_MARKER
+    NULL_DATE = Scene.NULL_DATE
+    NULL_TIME = Scene.NULL_TIME
+
+    title = _StringColumn()
+    desc = _StringColumn()
+    sceneNotes = _StringColumn()
+    date = _DateColumn('i', str, _encode_date, _decode_date)
+    time = _CodedColumn('i', str, _encode_time, _decode_time)
+    lastsDays = _CodedColumn('i', str, _encode_number, _decode_number)
+    lastsHours = _CodedColumn('h', str, _encode_number, _decode_number)
+    lastsMinutes = _CodedColumn('h', str, _encode_number, _decode_number)
+    status = _CodedColumn('b', int, _encode_int, _decode_int)
+    isUnused = _CodedColumn('b', bool, _encode_flag, _decode_flag)
+    isNotesScene = _CodedColumn('b', bool, _encode_flag, _decode_flag)
+    isTodoScene = _CodedColumn('b', bool, _encode_flag, _decode_flag)
+    doNotExport = _CodedColumn('b', bool, _encode_flag, _decode_flag)
+    appendToPrev = _CodedColumn('b', bool, _encode_flag, _decode_flag)
+    isReactionScene = _CodedColumn('b', bool, _encode_flag, _decode_flag)
+    isSubPlot = _CodedColumn('b', bool, _encode_flag, _decode_flag)
+    characters = _ListColumn(list)
+    locations = _ListColumn(list)
+    items = _ListColumn(list)
+    narrativePosition = _ListColumn(tuple)
+    tags = _Column()
+    _sceneContent = _Column()
+    rtfFile = _Column()
+    wordCount = _Column(0)
+    letterCount = _Column(0)
+    field1 = _Column()
+    field2 = _Column()
+    field3 = _Column()
+    field4 = _Column()
+    goal = _Column()
+    conflict = _Column()
+    outcome = _Column()
+    minute = _Column()
+    hour = _Column()
+    day = _Column()
+    image = _Column()
+
+    sceneContent = Scene.sceneContent
+    # The Scene property works with the view's columns.
+
+    def __init__(self, table, row):
+        """Initialize instance variables.
+
+        Positional arguments:
+            table -- SceneTable: the table holding the scene.
+            row -- int: the scene's row in the table.
+        """
+        self._table = table
+        self._row = row
+
+
+_NAMES = Scene.__slots__
+# Scene instance variables.
+
+_COLUMNS = [SceneView.__dict__[name] for name in _NAMES]
+# Column descriptors in the order of the names.
+
+_NEW_SCENE = Scene()
+# Instance variables of a scene not yet set.
+
+
+class SceneTable(MutableMapping):
+    """Mapping of scene IDs to scenes held in parallel columns.
+
+    Public methods:
+        get_scenes_between(startDate, endDate) -- return the IDs of the scenes dated within a period.
+
+    Replaces the novel's scenes dictionary, if a reader is called with
+    the scene_table option, for processes that hold many large models at a time.
+    Instead of a Scene instance per scene, there is a column per Scene instance variable:
+    - dates, times, durations, status, and flags in arrays of numbers,
+    - titles, descriptions, and notes in lists of interned strings,
+    - character, location, and item IDs, and narrative positions in arrays of IDs,
+    - the other variables, which are rarely set, in dictionaries by row.
+    Getting a scene returns a SceneView proxy of its row.
+    Setting a scene takes the values of a Scene instance's variables.
+    The keys are the model's scene IDs, i.e. non-negative ints, as densely
+    numbered as the readers do, because the row index has an entry per ID.
+    """
+    MAX_ID_GAP = 0x10000
+    # Maximum distance of a new scene ID from the highest one.
+
+    def __init__(self, scenes=None):
+        """Initialize instance variables.
+
+        Optional arguments:
+            scenes -- dict: Scene instances by scene ID, to be copied into the table.
+        """
+        self._columns = {}
+        # key = Scene instance variable
+        # value = column with a value per row
+        self._overflow = {}
+        # key = Scene instance variable held in arrays
+        # value = dict: values that cannot be encoded, by row
+        for name, column in zip(_NAMES, _COLUMNS):
+            self._columns[name] = column.new_column()
+            if isinstance(column, (_CodedColumn, _ListColumn)):
+                self._overflow[name] = {}
+        self._ids = array('i')
+        # Scene IDs by row; -1 for rows of deleted scenes.
+        self._rows = array('i')
+        # Rows by scene ID; -1 for IDs not in the table.
+        self._deleted = 0
+        self._dateIndex = None
+        # Rows sorted by date, and their day numbers; built by the first period query.
+        if scenes:
+            self._add_scenes(scenes)
+
+    def __getitem__(self, scId):
+        if scId not in self:
+            raise KeyError(scId)
+
+        return SceneView(self, self._rows[scId])
+
+    def __setitem__(self, scId, scene):
+        if scId not in self:
+            self._add_scenes({scId: scene})
+            return
+
+        view = SceneView(self, self._rows[scId])
+        for name in _NAMES:
+            setattr(view, name, getattr(scene, name))
+
+    def __delitem__(self, scId):
+        view = self[scId]
+        for name in _NAMES:
+            setattr(view, name, getattr(_NEW_SCENE, name))
+        self._ids[view._row] = -1
+        self._rows[scId] = -1
+        self._deleted += 1
+
+    def __contains__(self, scId):
+        try:
+            return scId >= 0 and self._rows[scId] >= 0
+
+        except (IndexError, TypeError):
+            return False
+
+    def __iter__(self):
+        if not self._deleted:
+            return iter(self._ids)
+
+        return (scId for scId in self._ids if scId >= 0)
+
+    def __len__(self):
+        return len(self._ids) - self._deleted
+
+    def get_scenes_between(self, startDate, endDate):
+        """Return a list of the IDs of the scenes dated within a period.
+
+        Positional arguments:
+            startDate -- str: first day of the period in ISO format (yyyy-mm-dd).
+            endDate -- str: last day of the period in ISO format (yyyy-mm-dd).
+
+        The scenes are listed by date, scenes of the same day in the order they were added.
+        The first query sorts the rows by day number; further queries just look up
+        the bounds of the period by bisection, until a date is changed.
+        Scenes without a date are never found, because the markers are negative.
+        Dates not in ISO format are compared as strings; their scenes come last.
+        Raise a ValueError, if a period date is not in ISO format.
+        """
+        firstDay = _encode_date(startDate)
+        lastDay = _encode_date(endDate)
+        if self._dateIndex is None:
+            dates = self._columns['date']
+            rows = array('i', sorted(range(len(dates)), key=dates.__getitem__))
+            self._dateIndex = rows, array('i', map(dates.__getitem__, rows))
+        rows, days = self._dateIndex
+        scIds = list(map(self._ids.__getitem__, rows[bisect_left(days, firstDay):bisect_right(days, lastDay)]))
+        overflow = self._overflow['date']
+        for row in sorted(overflow):
+            if type(overflow[row]) is str and startDate <= overflow[row] <= endDate:
+                scIds.append(self._ids[row])
+        return scIds
+
+    def _add_scenes(self, scenes):
+        """Copy new scenes into the columns, a column at a time.
+
+        Positional arguments:
+            scenes -- dict: Scene instances by scene ID not in the table.
+
+        Raise a TypeError, if a scene ID is not a non-negative int.
+        Raise a ValueError, if the scene IDs leave too big gaps.
+        """
+        scIds = list(scenes)
+        if not all(type(scId) is int and scId >= 0 for scId in scIds):
+            raise TypeError('Scene IDs must be non-negative ints.')
+
+        missing = max(scIds) + 1 - len(self._rows)
+        if missing > len(scIds) + self.MAX_ID_GAP:
+            raise ValueError(f'Scene ID {max(scIds)} is too far beyond the highest one.')
+
+        if missing > 0:
+            self._rows.extend(array('i', [-1]) * missing)
+        firstRow = len(self._ids)
+        for row, scId in enumerate(scIds, firstRow):
+            self._rows[scId] = row
+        self._ids.extend(scIds)
+        scenes = list(scenes.values())
+        for name, column in zip(_NAMES, _COLUMNS):
+            column.extend(self, list(map(attrgetter(name), scenes)), firstRow)
+        self._dateIndex = None
@@ -0,0 +1,91 @@
+"""Provide a class for a project-level tag table.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from sys import intern
+
+
+class TagTable:
+    """Table of the tags used in a project, shared by all entity types.
+
+    Public methods:
+        get_id(key) -- return the tag ID for a key, adding a tag if necessary.
+        set_label(key, label) -- set the label of the tag with the key given.
+        get_labels(tagIds) -- return a list of the labels of the tags given.
+        intern_labels(labels) -- return a list of the table's label strings for the labels given.
+
+    Public instance variables:
+        labels -- list of str: tag labels by tag ID.
+        keys -- list of str: tag keys by tag ID.
+
+    Tags are identified by small integer IDs in order of appearance.
+    Each label is an interned string, held only once, no matter how many
+    entities are tagged with it. So tags compare by identity first.
+    Tags can be added before their labels are known.
+    """
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self.labels = []
+        self.keys = []
+        self._idsByKey = {}
+
+    def get_id(self, key):
+        """Return the tag ID for a key, adding a tag if necessary.
+
+        Positional arguments:
+            key -- str: tag key, e.g. the Aeon tag GUID or the tag label.
+
+        The label of a tag added is None until set.
+        """
+        tagId = self._idsByKey.get(key, None)
+        if tagId is None:
+            tagId = len(self.labels)
+            self._idsByKey[key] = tagId
+            self.labels.append(None)
+            self.keys.append(key)
+        return tagId
+
+    def set_label(self, key, label):
+        """Set the label of the tag with the key given.
+
+        Positional arguments:
+            key -- str: tag key.
+            label -- str: tag label.
+        """
+        self.labels[self.get_id(key)] = intern(label)
+
+    def get_labels(self, tagIds):
+        """Return a list of the labels of the tags given.
+
+        Positional arguments:
+            tagIds -- iterable of int: tag IDs.
+
+        Tags without a label, e.g. tags not listed in the project's tag section,
+        are kept under their key, so that no tag gets lost.
+        """
+        labels = []
+        for tagId in tagIds:
+            label = self.labels[tagId]
+            if label is None:
+                label = intern(self.keys[tagId])
+            labels.append(label)
+        return labels
+
+    def intern_labels(self, labels):
+        """Return a list of the table's label strings for the labels given.
+
+        Positional arguments:
+            labels -- iterable of str: tag labels.
+
+        Labels not in the table yet are added, with the label as key.
+        """
+        tagIds = []
+        for label in labels:
+            tagId = self.get_id(label)
+            if self.labels[tagId] is None:
+                self.labels[tagId] = intern(label)
+            tagIds.append(tagId)
+        return self.get_labels(tagIds)
@@ -163,7 +163,7 @@ class FileExport(Novel):
         """Return a mapping dictionary for a chapter section.
         
         Positional arguments:
-            chId -- str: chapter ID.
+            chId -- int: chapter ID.
             chapterNumber -- int: chapter number.
         
         This is a template method that can be extended or overridden by subclasses.
@@ -172,7 +172,7 @@ class FileExport(Novel):
             chapterNumber = ''
         
         chapterMapping = dict(
-            ID=chId,
+            ID=str(chId),
             ChapterNumber=chapterNumber,
             Title=self._convert_from_yw(self.chapters[chId].title, True),
             Desc=self._convert_from_yw(self.chapters[chId].desc),
@@ -185,7 +185,7 @@ class FileExport(Novel):
         """Return a mapping dictionary for a scene section.
         
         Positional arguments:
-            scId -- str: scene ID.
+            scId -- int: scene ID.
             sceneNumber -- int: scene number to be displayed.
             wordsTotal -- int: accumulated wordcount.
             lettersTotal -- int: accumulated lettercount.
@@ -297,7 +297,7 @@ class FileExport(Novel):
         duration = f'{days}{hours}{minutes}'
         
         sceneMapping = dict(
-            ID=scId,
+            ID=str(scId),
             SceneNumber=sceneNumber,
             Title=self._convert_from_yw(self.scenes[scId].title, True),
             Desc=self._convert_from_yw(self.scenes[scId].desc),
@@ -346,7 +346,7 @@ class FileExport(Novel):
         """Return a mapping dictionary for a character section.
         
         Positional arguments:
-            crId -- str: character ID.
+            crId -- int: character ID.
         
         This is a template method that can be extended or overridden by subclasses.
         """
@@ -360,7 +360,7 @@ class FileExport(Novel):
             characterStatus = Character.MINOR_MARKER
         
         characterMapping = dict(
-            ID=crId,
+            ID=str(crId),
             Title=self._convert_from_yw(self.characters[crId].title, True),
             Desc=self._convert_from_yw(self.characters[crId].desc),
             Tags=self._convert_from_yw(tags),
@@ -380,7 +380,7 @@ class FileExport(Novel):
         """Return a mapping dictionary for a location section.
         
         Positional arguments:
-            lcId -- str: location ID.
+            lcId -- int: location ID.
         
         This is a template method that can be extended or overridden by subclasses.
         """
@@ -390,7 +390,7 @@ class FileExport(Novel):
             tags = ''
         
         locationMapping = dict(
-            ID=lcId,
+            ID=str(lcId),
             Title=self._convert_from_yw(self.locations[lcId].title, True),
             Desc=self._convert_from_yw(self.locations[lcId].desc),
             Tags=self._convert_from_yw(tags, True),
@@ -405,7 +405,7 @@ class FileExport(Novel):
         """Return a mapping dictionary for an item section.
         
         Positional arguments:
-            itId -- str: item ID.
+            itId -- int: item ID.
         
         This is a template method that can be extended or overridden by subclasses.
         """
@@ -415,7 +415,7 @@ class FileExport(Novel):
             tags = ''
         
         itemMapping = dict(
-            ID=itId,
+            ID=str(itId),
             Title=self._convert_from_yw(self.items[itId].title, True),
             Desc=self._convert_from_yw(self.items[itId].desc),
             Tags=self._convert_from_yw(tags, True),
@@ -444,7 +444,7 @@ class FileExport(Novel):
         """Process the scenes.
         
         Positional arguments:
-            chId -- str: chapter ID.
+            chId -- int: chapter ID.
             sceneNumber -- int: number of previously processed scenes.
             wordsTotal -- int: accumulated wordcount of the previous scenes.
             lettersTotal -- int: accumulated lettercount of the previous scenes.
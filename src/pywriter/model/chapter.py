@@ -19,9 +19,16 @@ class Chapter:
         suppressChapterTitle -- bool: uppress chapter title when exporting.
         isTrash -- bool: True, if the chapter is the project's trash bin.
         suppressChapterBreak -- bool: Suppress chapter break when exporting.
-        srtScenes -- list of str: the chapter's sorted scene IDs.        
+        srtScenes -- list of int: the chapter's sorted scene IDs.        
+        narrativePosition -- tuple of int: position in a source's narrative structure, if any.
     """
 
+    __slots__ = (
+        'title', 'desc', 'chLevel', 'oldType', 'chType', 'isUnused', 'suppressChapterTitle',
+        'isTrash', 'suppressChapterBreak', 'srtScenes', 'narrativePosition',
+    )
+    # No instance dictionaries, to save memory with large projects.
+
     def __init__(self):
         """Initialize instance variables."""
         self.title = None
@@ -74,8 +81,14 @@ class Chapter:
         # xml: <Fields><Field_SuppressChapterBreak> 0
 
         self.srtScenes = []
-        # list of str
+        # list of int
         # xml: <Scenes><ScID>
         # The chapter's scene IDs. The order of its elements
         # corresponds to the chapter's order of the scenes.
 
+        self.narrativePosition = None
+        # tuple of int
+        # Not in the xml file.
+        # Position numbers from the outermost level down,
+        # e.g. (2, 3) for the 3rd chapter of the 2nd part.
+
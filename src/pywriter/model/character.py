@@ -17,6 +17,11 @@ class Character(WorldElement):
         fullName -- str: full name (the title inherited may be a short name).
         isMajor -- bool: True, if it's a major character.
     """
+    __slots__ = (
+        'notes', 'bio', 'goals', 'fullName', 'isMajor',
+    )
+    # No instance dictionaries, to save memory with large projects.
+
     MAJOR_MARKER = 'Major'
     MINOR_MARKER = 'Minor'
 
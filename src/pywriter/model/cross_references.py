@@ -70,7 +70,7 @@ class CrossReferences:
         # Chapter to which the scene belongs
 
         self.srtScenes = None
-        # list of str
+        # list of int
         # Scene IDs in the overall order
 
     def generate_xref(self, novel):
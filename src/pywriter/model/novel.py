@@ -103,7 +103,7 @@ class Novel:
         # the order of the chapters and the order of the scenes within the chapters)
 
         self.srtChapters = []
-        # list of str
+        # list of int
         # The novel's chapter IDs. The order of its elements corresponds to the novel's order of the chapters.
 
         self.locations = {}
@@ -113,7 +113,7 @@ class Novel:
         # The order of the elements does not matter.
 
         self.srtLocations = []
-        # list of str
+        # list of int
         # The novel's location IDs. The order of its elements
         # corresponds to the XML project file.
 
@@ -124,7 +124,7 @@ class Novel:
         # The order of the elements does not matter.
 
         self.srtItems = []
-        # list of str
+        # list of int
         # The novel's item IDs. The order of its elements corresponds to the XML project file.
 
         self.characters = {}
@@ -134,7 +134,7 @@ class Novel:
         # The order of the elements does not matter.
 
         self.srtCharacters = []
-        # list of str
+        # list of int
         # The novel's character IDs. The order of its elements corresponds to the XML project file.
 
         self._filePath = None
@@ -46,7 +46,17 @@ class Scene:
         lastsHours -- str: scene duration: hours.
         lastsDays -- str: scene duration: days. 
         image -- str:  path to an image related to the scene. 
+        narrativePosition -- tuple of int: position in a source's narrative structure, if any.
     """
+    __slots__ = (
+        'title', 'desc', '_sceneContent', 'rtfFile', 'wordCount', 'letterCount', 'isUnused',
+        'isNotesScene', 'isTodoScene', 'doNotExport', 'status', 'sceneNotes', 'tags', 'field1',
+        'field2', 'field3', 'field4', 'appendToPrev', 'isReactionScene', 'isSubPlot', 'goal',
+        'conflict', 'outcome', 'characters', 'locations', 'items', 'date', 'time', 'minute',
+        'hour', 'day', 'lastsMinutes', 'lastsHours', 'lastsDays', 'image', 'narrativePosition',
+    )
+    # No instance dictionaries, to save memory with large projects.
+
     STATUS = (None, 'Outline', 'Draft', '1st Edit', '2nd Edit', 'Done')
     # Emulate an enumeration for the scene status
     # Since the items are used to replace text,
@@ -161,15 +171,15 @@ class Scene:
         # xml: <Outcome>
 
         self.characters = None
-        # list of str
+        # list of int
         # xml: <Characters><CharID>
 
         self.locations = None
-        # list of str
+        # list of int
         # xml: <Locations><LocID>
 
         self.items = None
-        # list of str
+        # list of int
         # xml: <Items><ItemID>
 
         self.date = None
@@ -210,6 +220,12 @@ class Scene:
         # str
         # xml: <ImageFile>
 
+        self.narrativePosition = None
+        # tuple of int
+        # Not in the xml file.
+        # Position numbers from the outermost level down,
+        # e.g. (2, 3, 1) for the 1st scene of the 3rd chapter of the 2nd part.
+
     @property
     def sceneContent(self):
         return self._sceneContent
@@ -137,7 +137,7 @@ class Splitter:
                         novel.chapters[chapterId].srtScenes = srtScenes
                         srtScenes = []
                         chIdMax += 1
-                        chapterId = str(chIdMax)
+                        chapterId = chIdMax
                         create_chapter(chapterId, 'New part', line.replace(self.PART_SEPARATOR, ''), 1)
                         srtChapters.append(chapterId)
                     elif line.startswith(self.CHAPTER_SEPARATOR):
@@ -149,7 +149,7 @@ class Splitter:
                         novel.chapters[chapterId].srtScenes = srtScenes
                         srtScenes = []
                         chIdMax += 1
-                        chapterId = str(chIdMax)
+                        chapterId = chIdMax
                         create_chapter(chapterId, 'New chapter', line.replace(self.CHAPTER_SEPARATOR, ''), 0)
                         srtChapters.append(chapterId)
                     elif line.startswith(self._SCENE_SEPARATOR):
@@ -157,7 +157,7 @@ class Splitter:
                         newLines = []
                         sceneSplitCount += 1
                         scIdMax += 1
-                        sceneId = str(scIdMax)
+                        sceneId = scIdMax
                         create_scene(sceneId, novel.scenes[scId], sceneSplitCount)
                         srtScenes.append(sceneId)
                         inScene = True
@@ -165,7 +165,7 @@ class Splitter:
                         newLines.append(line)
                         sceneSplitCount += 1
                         scIdMax += 1
-                        sceneId = str(scIdMax)
+                        sceneId = scIdMax
                         create_scene(sceneId, novel.scenes[scId], sceneSplitCount)
                         srtScenes.append(sceneId)
                         inScene = True
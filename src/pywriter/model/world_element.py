@@ -17,6 +17,11 @@ class WorldElement:
         aka -- str: alternate name.
     """
 
+    __slots__ = (
+        'title', 'image', 'desc', 'tags', 'aka',
+    )
+    # No instance dictionaries, to save memory with large projects.
+
     def __init__(self):
         """Initialize instance variables."""
         self.title = None
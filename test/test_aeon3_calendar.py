@@ -0,0 +1,129 @@
+"""Unit test for the Aeon Timeline 3 calendar functions.
+
+Compare the results with the former datetime based calculation.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import random
+import unittest
+from datetime import datetime
+from datetime import timedelta
+from aeon3ywlib.aeon3_calendar import get_date_time
+from aeon3ywlib.aeon3_calendar import get_duration
+from aeon3ywlib.aeon3_calendar import get_ordinal
+from aeon3ywlib.aeon3_calendar import get_ymd
+from aeon3ywlib.aeon3_calendar import get_date
+from aeon3ywlib.aeon3_calendar import get_time
+from aeon3ywlib.aeon3_calendar import CACHE_SIZE
+from aeon3ywlib.json_timeline3 import JsonTimeline3
+
+DATE_LIMIT = (datetime(100, 1, 1) - datetime.min).total_seconds()
+MAX_TIMESTAMP = (datetime(9999, 12, 31, 23, 59, 59) - datetime.min).total_seconds()
+
+
+def legacy_date_time(timestamp):
+    """Return date and time strings as calculated before."""
+    return tuple((datetime.min + timedelta(seconds=timestamp)).isoformat().split('T'))
+
+
+def legacy_duration(timestamp, years, months, weeks, days, hours, minutes, seconds):
+    """Return the duration as calculated before."""
+    sceneStart = datetime.min + timedelta(seconds=timestamp)
+    if years > 0 or months > 0:
+        endYear = sceneStart.year + years
+        endMonth = sceneStart.month
+        if months > 0:
+            endMonth += months
+            while endMonth > 12:
+                endMonth -= 12
+                endYear += 1
+        sceneDuration = datetime(endYear, endMonth, sceneStart.day) - \
+                datetime(sceneStart.year, sceneStart.month, sceneStart.day)
+        lastsDays = sceneDuration.days
+        lastsHours = sceneDuration.seconds // 3600
+        lastsMinutes = (sceneDuration.seconds % 3600) // 60
+    else:
+        lastsDays = 0
+        lastsHours = 0
+        lastsMinutes = 0
+    lastsDays += weeks * 7
+    lastsDays += days
+    lastsDays += hours // 24
+    lastsHours += hours % 24
+    lastsHours += minutes // 60
+    lastsMinutes += minutes % 60
+    lastsMinutes += seconds // 60
+    lastsHours += lastsMinutes // 60
+    lastsMinutes %= 60
+    lastsDays += lastsHours // 24
+    lastsHours %= 24
+    return lastsDays, lastsHours, lastsMinutes
+
+
+class Equivalence(unittest.TestCase):
+    """Test case: Get the same results as with datetime."""
+
+    def setUp(self):
+        self.random = random.Random(3)
+        self.timestamps = [
+            DATE_LIMIT - 1,
+            DATE_LIMIT,
+            DATE_LIMIT + 86399,
+            MAX_TIMESTAMP,
+            (datetime(2000, 2, 29, 12, 30, 15) - datetime.min).total_seconds(),
+            (datetime(1900, 3, 1) - datetime.min).total_seconds(),
+            (datetime(2023, 12, 31, 23, 59, 59) - datetime.min).total_seconds(),
+            ]
+        for __ in range(2000):
+            self.timestamps.append(self.random.randrange(int(DATE_LIMIT), int(MAX_TIMESTAMP)))
+
+    def test_date_limit(self):
+        self.assertEqual(JsonTimeline3.DATE_LIMIT, DATE_LIMIT)
+        self.assertEqual(get_date_time(DATE_LIMIT), ('0100-01-01', '00:00:00'))
+        self.assertEqual(get_date_time(DATE_LIMIT - 1), ('0099-12-31', '23:59:59'))
+
+    def test_date_time(self):
+        for timestamp in self.timestamps + [0, 1.5, DATE_LIMIT + 0.25]:
+            self.assertEqual(get_date_time(timestamp), legacy_date_time(timestamp))
+
+    def test_memo(self):
+        self.assertIs(get_date(730178), get_date(730178))
+        self.assertIs(get_time(45015), get_time(45015))
+        for function in (get_date, get_time):
+            self.assertEqual(function.cache_info().maxsize, CACHE_SIZE)
+
+    def test_ordinal(self):
+        for timestamp in self.timestamps:
+            ordinal = int(timestamp) // 86400
+            self.assertEqual(get_ordinal(*get_ymd(ordinal)), ordinal)
+            self.assertEqual(get_ordinal(*get_ymd(ordinal)), datetime.min.toordinal() + ordinal - 1)
+
+    def test_duration(self):
+        for timestamp in self.timestamps:
+            duration = [
+                self.random.choice((0, 0, 1, 3)),
+                self.random.choice((0, 0, 1, 11, 14, 25)),
+                self.random.randrange(3),
+                self.random.randrange(40),
+                self.random.randrange(60),
+                self.random.randrange(200),
+                self.random.randrange(200),
+                ]
+            try:
+                expected = legacy_duration(timestamp, *duration)
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    get_duration(timestamp, *duration)
+                continue
+
+            self.assertEqual(get_duration(timestamp, *duration), expected)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Unit test for the Aeon Timeline 3 file operation helpers.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import mmap
+import unittest
+import tempfile
+from aeon3ywlib.aeon3_fop import open_file
+from aeon3ywlib.aeon3_fop import read_offset_index
+from aeon3ywlib.aeon3_fop import write_offset_index
+from aeon3ywlib.aeon3_fop import INDEX_EXTENSION
+from pywriter.pywriter_globals import ERROR
+
+# Test environment
+
+# Files are written to a temporary directory, so the test directory stays unchanged.
+TEST_EXEC_DIR = tempfile.TemporaryDirectory()
+TEST_AEON = TEST_EXEC_DIR.name + '/offsets.aeon'
+TEST_INDEX = TEST_AEON + INDEX_EXTENSION
+
+HEADER = b'\x01\x00\x00\x00(\x00\x00\x00""""'
+JSON_PART = b'{"label":"A {brace}","summary":"Quote \\" and }","notes":"\\\\","children":[{},{"id":"x"}]}'
+PAYLOAD = b'\x00\x7b\x7d\x22attachment'
+SPAN = (len(HEADER), len(HEADER) + len(JSON_PART))
+
+
+def tearDownModule():
+    TEST_EXEC_DIR.cleanup()
+
+
+class FileOpening(unittest.TestCase):
+    """Test case: Open a project file."""
+
+    def setUp(self):
+        with open(TEST_AEON, 'wb') as f:
+            f.write(HEADER + JSON_PART + PAYLOAD)
+
+    def test_mapped(self):
+        data = open_file(TEST_AEON, True)
+        self.assertIsInstance(data, mmap.mmap)
+        with data:
+            self.assertEqual(data[:], HEADER + JSON_PART + PAYLOAD)
+
+    def test_read(self):
+        self.assertEqual(open_file(TEST_AEON, False), HEADER + JSON_PART + PAYLOAD)
+
+    def test_not_found(self):
+        os.remove(TEST_AEON)
+        message = open_file(TEST_AEON)
+        self.assertTrue(message.startswith(f'{ERROR}"'))
+        self.assertIn('not found', message)
+
+    def tearDown(self):
+        try:
+            os.remove(TEST_AEON)
+        except:
+            pass
+
+
+class OffsetIndex(unittest.TestCase):
+    """Test case: Use the sidecar offset index."""
+
+    def setUp(self):
+        with open(TEST_AEON, 'wb') as f:
+            f.write(HEADER + JSON_PART + PAYLOAD)
+
+    def test_index_written_and_used(self):
+        data = open_file(TEST_AEON, False)
+        self.assertIsNone(read_offset_index(TEST_AEON, data))
+        write_offset_index(TEST_AEON, data, SPAN)
+        self.assertEqual(read_offset_index(TEST_AEON, data), SPAN)
+
+    def test_index_invalidated(self):
+        write_offset_index(TEST_AEON, open_file(TEST_AEON, False), SPAN)
+        with open(TEST_AEON, 'wb') as f:
+            f.write(HEADER + b'{}' + PAYLOAD)
+        self.assertIsNone(read_offset_index(TEST_AEON, open_file(TEST_AEON, False)))
+
+    def test_brackets_checked(self):
+        data = open_file(TEST_AEON, False)
+        write_offset_index(TEST_AEON, data, (SPAN[0] + 1, SPAN[1]))
+        self.assertIsNone(read_offset_index(TEST_AEON, data))
+
+    def tearDown(self):
+        for filePath in (TEST_AEON, TEST_INDEX):
+            try:
+                os.remove(filePath)
+            except:
+                pass
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,9 +5,26 @@ For further information see https://github.com/peter88213/aeon3yw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 from shutil import copyfile
+from shutil import rmtree
 import os
 import unittest
+import tempfile
+import json
+import csv
+import pickle
 import aeon3md_
+from aeon3mdlib.aeon3md_converter import Aeon3mdConverter
+from aeon3mdlib.project_cache import ProjectCache
+from pywriter.pywriter_globals import ERROR
+from pywriter.ui.ui import Ui
+from aeon3ywlib.json_timeline3 import JsonTimeline3
+from aeon3ywlib.csv_timeline3 import CsvTimeline3
+from aeon3ywlib.field_memo import FieldMemo
+from aeon3ywlib.scene_table import SceneTable
+from aeon3ywlib.aeon3_fop import INDEX_EXTENSION
+from aeon3ywlib.aeon3_calendar import get_ordinal
+from aeon3ywlib.aeon3_calendar import SECONDS_PER_DAY
+from pywriter.model.scene import Scene
 
 # Test environment
 
@@ -17,7 +34,10 @@ UPDATE = False
 
 TEST_PATH = os.getcwd() + '/../test'
 TEST_DATA_PATH = TEST_PATH + '/data/'
-TEST_EXEC_PATH = TEST_PATH + '/'
+
+# Files are written to a temporary directory, so the test directory stays unchanged.
+TEST_EXEC_DIR = tempfile.TemporaryDirectory()
+TEST_EXEC_PATH = TEST_EXEC_DIR.name + '/'
 
 NORMAL_AEON = TEST_DATA_PATH + 'normal.aeon'
 NORMAL_CSV = TEST_DATA_PATH + 'normal.csv'
@@ -41,6 +61,11 @@ TEST_CHARACTERS = TEST_EXEC_PATH + 'yw7 Sample Project_character_sheets.md'
 TEST_LOCATIONS = TEST_EXEC_PATH + 'yw7 Sample Project_location_sheets.md'
 TEST_REPORT = TEST_EXEC_PATH + 'yw7 Sample Project_report.md'
 TEST_OUTLINE = TEST_EXEC_PATH + 'yw7 Sample Project_outline.md'
+TEST_CACHE = TEST_EXEC_PATH + 'cache'
+
+
+def tearDownModule():
+    TEST_EXEC_DIR.cleanup()
 
 
 def read_file(inputFile):
@@ -53,6 +78,31 @@ def read_file(inputFile):
             return f.read()
 
 
+def read_aeon(filePath):
+    """Return the header and the decoded JSON part of an .aeon file."""
+    with open(filePath, 'rb') as f:
+        binInput = f.read()
+    start = binInput.find(b'{')
+    jsonData, end = json.JSONDecoder().raw_decode(binInput[start:].decode('utf-8', errors='ignore'))
+    return binInput[:start], jsonData
+
+
+def write_aeon(filePath, header, jsonData):
+    """Write an .aeon file with the header and the JSON part given."""
+    with open(filePath, 'wb') as f:
+        f.write(header)
+        f.write(json.dumps(jsonData).encode('utf-8'))
+
+
+def get_attributes(entity):
+    """Return a dict of the instance variables of a model entity."""
+    attributes = {}
+    for cls in type(entity).__mro__:
+        for attribute in getattr(cls, '__slots__', ()):
+            attributes[attribute] = getattr(entity, attribute)
+    return attributes
+
+
 def remove_all_testfiles():
 
     try:
@@ -206,6 +256,771 @@ class NormalOperation(unittest.TestCase):
         remove_all_testfiles()
 
 
+class CachedOperation(unittest.TestCase):
+    """Test case: Convert with the project cache."""
+
+    def setUp(self):
+        remove_all_testfiles()
+        rmtree(TEST_CACHE, ignore_errors=True)
+
+    def convert(self, sourcePath, suffix):
+        kwargs = {'suffix': suffix}
+        kwargs.update(aeon3md_.SETTINGS)
+        kwargs.update(aeon3md_.OPTIONS)
+        kwargs['use_cache'] = True
+        kwargs['cache_dir'] = TEST_CACHE
+        converter = Aeon3mdConverter()
+        converter.run(sourcePath, **kwargs)
+        return converter.projectCache
+
+    def test_aeon_report(self):
+        copyfile(NORMAL_AEON, TEST_AEON)
+        projectCache = self.convert(TEST_AEON, '_report')
+        self.assertEqual((projectCache.hits, projectCache.misses), (0, 1))
+        os.remove(TEST_REPORT)
+        projectCache = self.convert(TEST_AEON, '_report')
+        self.assertEqual((projectCache.hits, projectCache.misses), (1, 0))
+        self.assertEqual(read_file(TEST_REPORT), read_file(REPORT_A))
+
+    def test_csv_report(self):
+        copyfile(NORMAL_CSV, TEST_CSV)
+        self.convert(TEST_CSV, '_report')
+        os.remove(TEST_REPORT)
+        projectCache = self.convert(TEST_CSV, '_report')
+        self.assertEqual((projectCache.hits, projectCache.misses), (1, 0))
+        self.assertEqual(read_file(TEST_REPORT), read_file(REPORT_C))
+
+    def test_invalid_cache(self):
+        copyfile(NORMAL_AEON, TEST_AEON)
+        self.convert(TEST_AEON, '_report')
+        cacheFile = [entry.path for entry in os.scandir(TEST_CACHE) if entry.name.endswith(ProjectCache.EXTENSION)][0]
+        with open(cacheFile, 'rb') as f:
+            data = f.read()
+        model = pickle.loads(data)
+        del model['srtItems']
+        incomplete = pickle.dumps(model)
+        model['srtItems'] = None
+        for cacheData in (data[:len(data) // 2], incomplete, pickle.dumps(model)):
+            with open(cacheFile, 'wb') as f:
+                f.write(cacheData)
+            os.remove(TEST_REPORT)
+            projectCache = self.convert(TEST_AEON, '_report')
+            self.assertEqual((projectCache.hits, projectCache.misses), (0, 1))
+            self.assertEqual(read_file(TEST_REPORT), read_file(REPORT_A))
+
+    def tearDown(self):
+        remove_all_testfiles()
+        rmtree(TEST_CACHE, ignore_errors=True)
+
+
+class ItemHandlers(unittest.TestCase):
+    """Test case: Convert further item types by registered handlers."""
+
+    def setUp(self):
+        kwargs = dict(aeon3md_.SETTINGS)
+        kwargs.update(aeon3md_.OPTIONS)
+        self.source = JsonTimeline3(NORMAL_AEON, **kwargs)
+        self.clues = []
+
+    def read_clue(self, uid, dataItem):
+        self.clues.append(dataItem['label'])
+
+    def test_additional_type(self):
+        self.source.add_item_handler('Clue', self.read_clue)
+        self.source.read()
+        self.assertEqual(len(self.clues), 18)
+        self.assertEqual(len(self.source.scenes), 175)
+
+    def test_replaced_type(self):
+        self.source.add_item_handler('Event', self.read_clue)
+        self.source.read()
+        self.assertEqual(len(self.clues), 175)
+        self.assertEqual(len(self.source.scenes), 0)
+
+
+class Viewpoints(unittest.TestCase):
+    """Test case: Put the viewpoint character first."""
+
+    def setUp(self):
+        header, jsonData = read_aeon(NORMAL_AEON)
+        references = jsonData['definitions']['references']['byId']
+        refParticipant = [uid for uid in references if references[uid]['label'] == 'Participant'][0]
+        participants = {}
+        for relationship in jsonData['data']['relationships']['byId'].values():
+            if relationship['reference'] == refParticipant:
+                participants.setdefault(relationship['subject'], []).append(relationship['object'])
+        self.eventGuid = [uid for uid in participants if len(participants[uid]) > 1][0]
+        self.vpGuid = participants[self.eventGuid][-1]
+        self.participantCount = len(participants[self.eventGuid])
+        self.eventTitle = jsonData['data']['items']['byId'][self.eventGuid]['label']
+        self.vpName = jsonData['data']['items']['byId'][self.vpGuid]['label']
+        jsonData['definitions']['properties']['byId']['viewpoint'] = {'label': 'Viewpoint'}
+        jsonData['data']['items']['byId'][self.eventGuid]['propertyValues']['viewpoint'] = self.vpGuid
+        write_aeon(TEST_AEON, header, jsonData)
+
+    def test_viewpoint_among_participants(self):
+        kwargs = dict(aeon3md_.SETTINGS)
+        kwargs.update(aeon3md_.OPTIONS)
+        source = JsonTimeline3(TEST_AEON, **kwargs)
+        source.read()
+        for scId in source.scenes:
+            if source.scenes[scId].title == self.eventTitle:
+                break
+
+        characters = source.scenes[scId].characters
+        self.assertEqual(source.characters[characters[0]].fullName, self.vpName)
+        self.assertEqual(len(characters), self.participantCount)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class NarrativeDepth(unittest.TestCase):
+    """Test case: Convert a narrative with four levels."""
+
+    def setUp(self):
+        header, jsonData = read_aeon(NORMAL_AEON)
+        types = jsonData['definitions']['types']['byId']
+        folderType = [uid for uid in types if types[uid]['isNarrativeFolder']][0]
+        jsonData['data']['items']['byId']['book'] = dict(
+            type=folderType,
+            label='Book',
+            summary='',
+            shortLabel='',
+            tags=[],
+            propertyValues={},
+            )
+        narrative = jsonData['data']['narrative']
+        narrative['children'] = [{'id': 'book', 'children': narrative['children']}]
+        write_aeon(TEST_AEON, header, jsonData)
+
+    def read(self, filePath):
+        kwargs = dict(aeon3md_.SETTINGS)
+        kwargs.update(aeon3md_.OPTIONS)
+        source = JsonTimeline3(filePath, **kwargs)
+        source.read()
+        return source
+
+    def test_four_levels(self):
+        source = self.read(TEST_AEON)
+        reference = self.read(NORMAL_AEON)
+        self.assertEqual(source.chapters[source.srtChapters[0]].desc, 'Book')
+        self.assertEqual(source.chapters[source.srtChapters[0]].chLevel, 1)
+        self.assertEqual(len(source.srtChapters), len(reference.srtChapters) + 1)
+        for chapterIds in zip(source.srtChapters[1:], reference.srtChapters):
+            chapters = [source.chapters[chapterIds[0]], reference.chapters[chapterIds[1]]]
+            self.assertEqual(chapters[0].desc, chapters[1].desc)
+            self.assertEqual(chapters[0].chLevel, chapters[1].chLevel)
+            self.assertEqual(len(chapters[0].srtScenes), len(chapters[1].srtScenes))
+            if chapters[1].narrativePosition is not None:
+                self.assertEqual(chapters[0].narrativePosition, (1,) + chapters[1].narrativePosition)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class OffsetIndexReading(unittest.TestCase):
+    """Test case: Read the JSON part at the position stored in the sidecar index."""
+
+    def setUp(self):
+        copyfile(NORMAL_AEON, TEST_AEON)
+        self.kwargs = dict(aeon3md_.SETTINGS)
+        self.kwargs.update(aeon3md_.OPTIONS)
+        self.kwargs['use_offset_index'] = True
+
+    def read(self):
+        source = JsonTimeline3(TEST_AEON, **self.kwargs)
+        self.assertFalse(source.read().startswith(ERROR))
+        return [get_attributes(source.scenes[scId]) for scId in source.scenes]
+
+    def test_index_written_and_used(self):
+        scenes = self.read()
+        self.assertTrue(os.path.isfile(f'{TEST_AEON}{INDEX_EXTENSION}'))
+        self.assertEqual(self.read(), scenes)
+
+    def tearDown(self):
+        remove_all_testfiles()
+        try:
+            os.remove(f'{TEST_AEON}{INDEX_EXTENSION}')
+        except:
+            pass
+
+
+class SchemaCache(unittest.TestCase):
+    """Test case: Resolve the schema once for each version of the definitions."""
+
+    def setUp(self):
+        header, jsonData = read_aeon(NORMAL_AEON)
+        jsonData['definitions']['properties']['byId']['viewpoint'] = {'label': 'Viewpoint'}
+        write_aeon(TEST_AEON, header, jsonData)
+        JsonTimeline3._schemaCache.clear()
+        self.kwargs = {}
+
+    def read(self, filePath):
+        kwargs = dict(aeon3md_.SETTINGS)
+        kwargs.update(aeon3md_.OPTIONS)
+        kwargs.update(self.kwargs)
+        source = JsonTimeline3(filePath, **kwargs)
+        source.read()
+        return source
+
+    def test_cached_schema(self):
+        reference = self.read(NORMAL_AEON)
+        self.assertEqual(len(JsonTimeline3._schemaCache), 1)
+        source = self.read(NORMAL_AEON)
+        self.assertEqual(len(JsonTimeline3._schemaCache), 1)
+        self.assertEqual(len(source.scenes), len(reference.scenes))
+        self.read(TEST_AEON)
+        self.assertEqual(len(JsonTimeline3._schemaCache), 2)
+
+    def test_eviction(self):
+        self.read(NORMAL_AEON)
+        self.read(TEST_AEON)
+        normalKey, testKey = JsonTimeline3._schemaCache
+        self.read(NORMAL_AEON)
+        self.assertEqual(list(JsonTimeline3._schemaCache), [testKey, normalKey])
+        for i in range(JsonTimeline3.SCHEMA_CACHE_SIZE - 1):
+            self.kwargs['notes_label'] = f'Notes {i}'
+            self.read(NORMAL_AEON)
+        del self.kwargs['notes_label']
+        self.assertEqual(len(JsonTimeline3._schemaCache), JsonTimeline3.SCHEMA_CACHE_SIZE)
+        self.assertNotIn(testKey, JsonTimeline3._schemaCache)
+        self.assertIn(normalKey, JsonTimeline3._schemaCache)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class InvalidDuration(unittest.TestCase):
+    """Test case: Read an event whose end date does not exist."""
+
+    def setUp(self):
+        header, jsonData = read_aeon(NORMAL_AEON)
+        types = jsonData['definitions']['types']['byId']
+        eventType = [uid for uid in types if types[uid]['label'] == 'Event'][0]
+        for item in jsonData['data']['items']['byId'].values():
+            if item['type'] == eventType and item['startDate'] is not None:
+                item['label'] = 'Invalid duration'
+                item['startDate']['timestamp'] = get_ordinal(2021, 1, 31) * SECONDS_PER_DAY
+                item['duration'].update(years=0, months=1, weeks=0, days=1, hours=0, minutes=0, seconds=0)
+                break
+
+        write_aeon(TEST_AEON, header, jsonData)
+
+    def test_empty_duration(self):
+        kwargs = dict(aeon3md_.SETTINGS)
+        kwargs.update(aeon3md_.OPTIONS)
+        source = JsonTimeline3(TEST_AEON, **kwargs)
+        self.assertFalse(source.read().startswith(ERROR))
+        scenes = [source.scenes[scId] for scId in source.scenes if source.scenes[scId].title == 'Invalid duration']
+        self.assertEqual(len(scenes), 1)
+        self.assertEqual(scenes[0].date, '2021-01-31')
+        self.assertIsNone(scenes[0].lastsDays)
+        reference = JsonTimeline3(NORMAL_AEON, **kwargs)
+        reference.read()
+        self.assertEqual(len(source.scenes), len(reference.scenes))
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class MessageLog(Ui):
+    """Ui keeping all messages shown."""
+
+    def __init__(self, title):
+        super().__init__(title)
+        self.messages = []
+
+    def set_info_how(self, message):
+        super().set_info_how(message)
+        self.messages.append(message)
+
+
+class Preflight(unittest.TestCase):
+    """Test case: Check the labels before reading the data."""
+
+    def setUp(self):
+        header, jsonData = read_aeon(NORMAL_AEON)
+        jsonData['definitions']['properties']['byId']['notes'] = {'label': 'Notes'}
+        types = jsonData['definitions']['types']['byId']
+        eventType = [uid for uid in types if types[uid]['label'] == 'Event'][0]
+        for item in jsonData['data']['items']['byId'].values():
+            if item['type'] == eventType:
+                item['propertyValues']['notes'] = 'Scene notes'
+                break
+
+        write_aeon(TEST_AEON, header, jsonData)
+        self.kwargs = dict(aeon3md_.SETTINGS)
+        self.kwargs.update(aeon3md_.OPTIONS)
+
+    def test_default_settings(self):
+        self.kwargs['preflight'] = True
+        source = JsonTimeline3(NORMAL_AEON, **self.kwargs)
+        message = source.check_labels()
+        self.assertFalse(message.startswith(ERROR))
+        for setting in ('type_item', 'notes_label', 'character_desc_label2', 'viewpoint_label', 'item_label'):
+            self.assertIn(setting, message)
+        self.assertFalse(source.read().startswith(ERROR))
+        self.assertTrue(source.scenes)
+
+    def test_undefined_labels(self):
+        self.kwargs.update(type_character='Person', character_label='')
+        source = JsonTimeline3(NORMAL_AEON, **self.kwargs)
+        message = source.check_labels()
+        self.assertTrue(message.startswith(ERROR))
+        self.assertIn('type_character = Person', message)
+        self.assertNotIn('character_label', message)
+
+    def test_preflight(self):
+        self.kwargs.update(preflight=True, type_character='Person')
+        source = JsonTimeline3(NORMAL_AEON, **self.kwargs)
+        self.assertTrue(source.read().startswith(ERROR))
+        self.assertFalse(source.scenes)
+        self.kwargs.update(type_character='Character')
+        source = JsonTimeline3(TEST_AEON, **self.kwargs)
+        self.assertFalse(source.read().startswith(ERROR))
+        self.assertTrue(source.scenes)
+
+    def test_warning(self):
+        self.kwargs['preflight'] = True
+        message = JsonTimeline3(NORMAL_AEON, **self.kwargs).read()
+        self.assertFalse(message.startswith(ERROR))
+        self.assertIn('Optional labels not defined in the project', message)
+        self.assertIn('viewpoint_label', message)
+        copyfile(NORMAL_AEON, TEST_AEON)
+        kwargs = {'suffix': '_report'}
+        kwargs.update(self.kwargs)
+        converter = Aeon3mdConverter()
+        converter.ui = MessageLog('')
+        converter.run(TEST_AEON, **kwargs)
+        self.assertIn(message, converter.ui.messages)
+        self.assertTrue(os.path.isfile(TEST_REPORT))
+        self.kwargs['preflight'] = False
+        self.assertNotIn('Optional labels', JsonTimeline3(NORMAL_AEON, **self.kwargs).read())
+
+    def test_notes(self):
+        source = JsonTimeline3(TEST_AEON, **self.kwargs)
+        source.read()
+        notes = [source.scenes[scId].sceneNotes for scId in source.scenes]
+        self.assertIn('Scene notes', notes)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class SharedTags(unittest.TestCase):
+    """Test case: Share the tag labels among all entities."""
+
+    def test_aeon_tags(self):
+        kwargs = dict(aeon3md_.SETTINGS)
+        kwargs.update(aeon3md_.OPTIONS)
+        source = JsonTimeline3(NORMAL_AEON, **kwargs)
+        source.read()
+        __, jsonData = read_aeon(NORMAL_AEON)
+        tagLabels = set(jsonData['data']['tags'].values())
+        tagCount = 0
+        for elements in (source.scenes, source.characters, source.locations, source.items):
+            for elemId in elements:
+                for tag in elements[elemId].tags or []:
+                    self.assertIn(tag, tagLabels)
+                    self.assertTrue(any(tag is label for label in source.tagTable.labels))
+                    tagCount += 1
+        self.assertGreater(tagCount, len(tagLabels))
+
+    def test_unknown_tag(self):
+        header, jsonData = read_aeon(NORMAL_AEON)
+        for item in jsonData['data']['items']['byId'].values():
+            if item['tags']:
+                item['label'] = 'Unknown tag'
+                item['tags'].append('unknown-tag-guid')
+                break
+
+        write_aeon(TEST_AEON, header, jsonData)
+        kwargs = dict(aeon3md_.SETTINGS)
+        kwargs.update(aeon3md_.OPTIONS)
+        source = JsonTimeline3(TEST_AEON, **kwargs)
+        self.assertFalse(source.read().startswith(ERROR))
+        tags = []
+        for elements in (source.scenes, source.characters, source.locations, source.items):
+            for elemId in elements:
+                if elements[elemId].title == 'Unknown tag':
+                    tags = elements[elemId].tags
+        self.assertEqual(tags[-1], 'unknown-tag-guid')
+        self.assertEqual(len(tags), len(item['tags']))
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class CsvColumns(unittest.TestCase):
+    """Test case: Pick the csv fields by the header's column indexes."""
+
+    def setUp(self):
+        self.kwargs = dict(aeon3md_.SETTINGS)
+        self.kwargs.update(aeon3md_.OPTIONS)
+        remove_all_testfiles()
+
+    def get_scenes(self, filePath):
+        source = CsvTimeline3(filePath, **self.kwargs)
+        self.assertFalse(source.read().startswith(ERROR))
+        return [(source.scenes[scId].title, source.scenes[scId].desc, source.scenes[scId].characters) for scId in source.scenes]
+
+    def test_column_order(self):
+        with open(NORMAL_CSV, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        with open(TEST_CSV, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            for row in rows:
+                writer.writerow(reversed(row))
+        self.assertEqual(self.get_scenes(TEST_CSV), self.get_scenes(NORMAL_CSV))
+
+    def test_missing_column(self):
+        with open(NORMAL_CSV, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        column = rows[0].index(self.kwargs['scene_desc_label'])
+        with open(TEST_CSV, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            for row in rows:
+                writer.writerow(row[:column] + row[column + 1:])
+        for title, desc, __ in self.get_scenes(TEST_CSV):
+            self.assertIsNone(desc)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class CsvNarrative(unittest.TestCase):
+    """Test case: Assign the csv events to the chapters at their parent positions."""
+
+    def setUp(self):
+        self.kwargs = dict(aeon3md_.SETTINGS)
+        self.kwargs.update(aeon3md_.OPTIONS)
+        remove_all_testfiles()
+
+    def test_position_width(self):
+        with open(TEST_CSV, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Type', 'Label', 'Narrative Position', 'Start Date', 'End Date'])
+            writer.writerow(['Narrative Folder', 'Part', 'Part 1', '', ''])
+            writer.writerow(['Narrative Folder', 'Short', 'Chapter 1.1000', '', ''])
+            writer.writerow(['Narrative Folder', 'Long', 'Chapter 1.10000', '', ''])
+            writer.writerow(['Event', 'A', 'Scene 1.1000.1', '', ''])
+            writer.writerow(['Event', 'B', 'Scene 1.10000.1', '', ''])
+            writer.writerow(['Event', 'C', 'Scene 1.10000.2', '', ''])
+        source = CsvTimeline3(TEST_CSV, **self.kwargs)
+        self.assertFalse(source.read().startswith(ERROR))
+        scenesByChapter = {}
+        for chId in source.srtChapters:
+            scenesByChapter[source.chapters[chId].desc] = [source.scenes[scId].title for scId in source.chapters[chId].srtScenes]
+        self.assertEqual(scenesByChapter['Short'], ['A'])
+        self.assertEqual(scenesByChapter['Long'], ['B', 'C'])
+        self.assertEqual(scenesByChapter['Part'], [])
+
+    def test_position_order(self):
+        with open(TEST_CSV, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Type', 'Label', 'Narrative Position', 'Start Date', 'End Date'])
+            writer.writerow(['Narrative Folder', 'Long', 'Chapter 10000', '', ''])
+            writer.writerow(['Narrative Folder', 'Short', 'Chapter 9999', '', ''])
+            writer.writerow(['Event', 'B', 'Scene 10000.1', '', ''])
+            writer.writerow(['Event', 'A', 'Scene 9999.1', '', ''])
+        source = CsvTimeline3(TEST_CSV, **self.kwargs)
+        self.assertFalse(source.read().startswith(ERROR))
+        chapters = [source.chapters[chId] for chId in source.srtChapters]
+        self.assertEqual([chapter.desc for chapter in chapters[:2]], ['Short', 'Long'])
+        self.assertEqual([chapter.narrativePosition for chapter in chapters[:2]], [(9999,), (10000,)])
+        self.assertEqual(chapters[0].title, f'{self.kwargs["chapter_number_prefix"]} 1')
+        scene = source.scenes[chapters[1].srtScenes[0]]
+        self.assertEqual(scene.title, 'B')
+        self.assertEqual(scene.narrativePosition, (10000, 1))
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class FieldMemos(unittest.TestCase):
+    """Test case: Resolve repeated csv field texts once."""
+
+    def test_csv_references(self):
+        kwargs = dict(aeon3md_.SETTINGS)
+        kwargs.update(aeon3md_.OPTIONS)
+        source = CsvTimeline3(NORMAL_CSV, **kwargs)
+        self.assertFalse(source.read().startswith(ERROR))
+        characterMemo = source.fieldMemos['characters']
+        self.assertGreater(characterMemo.hits, 0)
+        self.assertGreater(characterMemo.get_hit_rate(), 0.5)
+        characterLists = [source.scenes[scId].characters for scId in source.scenes if source.scenes[scId].characters]
+        self.assertEqual(len(set(map(id, characterLists))), len(characterLists))
+        # Scenes hold their own lists, even if resolved from the memo.
+
+    def test_bound(self):
+        fieldMemo = FieldMemo(str.upper, size=2)
+        for text in ('a', 'b', 'a', 'c', 'a', 'b'):
+            self.assertEqual(fieldMemo.get(text), text.upper())
+        self.assertEqual((fieldMemo.hits, fieldMemo.misses), (2, 4))
+        # "c" displaced "b", the least recently used text, and "b" displaced "c".
+
+
+class SmallRangeCsvTimeline3(CsvTimeline3):
+    """CsvTimeline3 splitting even the test files for reading in parallel."""
+    PARALLEL_RANGE_SIZE = 2000
+
+
+class ParallelCsv(unittest.TestCase):
+    """Test case: Read csv files in byte ranges by a process pool."""
+
+    def setUp(self):
+        self.kwargs = dict(aeon3md_.SETTINGS)
+        self.kwargs.update(aeon3md_.OPTIONS)
+        remove_all_testfiles()
+
+    def get_model(self, sourceClass, filePath, **kwargs):
+        settings = dict(self.kwargs)
+        settings.update(kwargs)
+        source = sourceClass(filePath, **settings)
+        self.assertFalse(source.read().startswith(ERROR))
+        scenes = [get_attributes(source.scenes[scId]) for scId in source.scenes]
+        characters = [get_attributes(source.characters[crId]) for crId in source.srtCharacters]
+        chapters = [source.chapters[chId].srtScenes for chId in source.srtChapters]
+        return scenes, characters, chapters
+
+    def test_quoted_line_breaks(self):
+        with open(NORMAL_CSV, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        column = rows[0].index(self.kwargs['scene_desc_label'])
+        with open(TEST_CSV, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(rows[0])
+            for i, row in enumerate(rows[1:]):
+                row[column] = f'{row[column]}\n"Line"\n{i},\n'
+                writer.writerow(row)
+        serial = self.get_model(CsvTimeline3, TEST_CSV)
+        parallel = self.get_model(SmallRangeCsvTimeline3, TEST_CSV, parallel_csv=True, csv_workers='4')
+        self.assertEqual(parallel, serial)
+        self.assertIn('\n"Line"\n', serial[0][0]['desc'])
+
+    def test_worker_setting(self):
+        for setting, expected in (('3', 3), ('0', os.cpu_count() or 1), ('-2', os.cpu_count() or 1), ('many', os.cpu_count() or 1)):
+            settings = dict(self.kwargs)
+            settings['csv_workers'] = setting
+            self.assertEqual(CsvTimeline3(NORMAL_CSV, **settings).csvWorkers, expected)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class DeferredReferences(unittest.TestCase):
+    """Test case: Bind the csv references when the file is read."""
+
+    def setUp(self):
+        self.kwargs = dict(aeon3md_.SETTINGS)
+        self.kwargs.update(aeon3md_.OPTIONS)
+        remove_all_testfiles()
+
+    def get_references(self, filePath):
+        source = CsvTimeline3(filePath, **self.kwargs)
+        self.assertFalse(source.read().startswith(ERROR))
+        references = []
+        for scId in source.scenes:
+            characters = [source.characters[crId].title for crId in source.scenes[scId].characters or []]
+            references.append((source.scenes[scId].title, characters))
+        return references
+
+    def test_characters_last(self):
+        with open(NORMAL_CSV, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        typeColumn = rows[0].index('Type')
+        characterRows = [row for row in rows[1:] if row[typeColumn] == self.kwargs['type_character']]
+        otherRows = [row for row in rows[1:] if row[typeColumn] != self.kwargs['type_character']]
+        with open(TEST_CSV, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerows([rows[0]] + otherRows + characterRows)
+        references = self.get_references(TEST_CSV)
+        self.assertEqual(references, self.get_references(NORMAL_CSV))
+        self.assertTrue(any(characters for __, characters in references))
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class InvalidCsv(unittest.TestCase):
+    """Test case: Report a csv file that is not UTF-8 encoded."""
+
+    def setUp(self):
+        self.kwargs = dict(aeon3md_.SETTINGS)
+        self.kwargs.update(aeon3md_.OPTIONS)
+        with open(NORMAL_CSV, 'rb') as f:
+            data = f.read()
+        with open(TEST_CSV, 'wb') as f:
+            f.write(data[:len(data) // 2])
+            f.write(b'\xff\xfe Invalid bytes')
+            f.write(data[len(data) // 2:])
+
+    def test_invalid_bytes(self):
+        for sourceClass, kwargs in ((CsvTimeline3, {}), (SmallRangeCsvTimeline3, dict(parallel_csv=True, csv_workers='2'))):
+            settings = dict(self.kwargs)
+            settings.update(kwargs)
+            message = sourceClass(TEST_CSV, **settings).read()
+            self.assertTrue(message.startswith(f'{ERROR}Can not parse csv file'), message)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class IntegerIds(unittest.TestCase):
+    """Test case: Identify the entities by integer IDs."""
+
+    def setUp(self):
+        self.kwargs = dict(aeon3md_.SETTINGS)
+        self.kwargs.update(aeon3md_.OPTIONS)
+
+    def check_ids(self, source):
+        self.assertFalse(source.read().startswith(ERROR))
+        for entities, srtIds in (
+                (source.chapters, source.srtChapters),
+                (source.characters, source.srtCharacters),
+                (source.locations, source.srtLocations),
+                (source.items, source.srtItems),
+                ):
+            self.assertTrue(all(type(entityId) is int for entityId in entities))
+            self.assertEqual(sorted(srtIds), sorted(entities))
+        for chId in source.srtChapters:
+            for scId in source.chapters[chId].srtScenes:
+                scene = source.scenes[scId]
+                for ids in (scene.characters, scene.locations, scene.items):
+                    self.assertTrue(all(type(entityId) is int for entityId in ids or []))
+
+    def test_aeon_ids(self):
+        self.check_ids(JsonTimeline3(NORMAL_AEON, **self.kwargs))
+
+    def test_csv_ids(self):
+        self.check_ids(CsvTimeline3(NORMAL_CSV, **self.kwargs))
+
+
+class SceneTables(unittest.TestCase):
+    """Test case: Hold the scenes read in a columnar scene table."""
+
+    def setUp(self):
+        self.kwargs = dict(aeon3md_.SETTINGS)
+        self.kwargs.update(aeon3md_.OPTIONS)
+        remove_all_testfiles()
+        rmtree(TEST_CACHE, ignore_errors=True)
+
+    def get_scenes(self, sourceClass, filePath, **kwargs):
+        settings = dict(self.kwargs)
+        settings.update(kwargs)
+        source = sourceClass(filePath, **settings)
+        self.assertFalse(source.read().startswith(ERROR))
+        return source.scenes
+
+    def get_variables(self, scenes):
+        return [(scId, {name: getattr(scenes[scId], name) for name in Scene.__slots__}) for scId in scenes]
+
+    def test_scene_views(self):
+        for sourceClass, filePath in ((JsonTimeline3, NORMAL_AEON), (CsvTimeline3, NORMAL_CSV)):
+            scenes = self.get_scenes(sourceClass, filePath)
+            self.assertIsInstance(scenes, dict)
+            table = self.get_scenes(sourceClass, filePath, scene_table=True)
+            self.assertIsInstance(table, SceneTable)
+            self.assertEqual(self.get_variables(table), self.get_variables(scenes))
+
+    def test_cached_report(self):
+        copyfile(NORMAL_CSV, TEST_CSV)
+        kwargs = {'suffix': '_report'}
+        kwargs.update(self.kwargs)
+        kwargs.update(scene_table=True, use_cache=True, cache_dir=TEST_CACHE)
+        for hits in (0, 1):
+            converter = Aeon3mdConverter()
+            converter.run(TEST_CSV, **kwargs)
+            self.assertEqual(converter.projectCache.hits, hits)
+            self.assertEqual(read_file(TEST_REPORT), read_file(REPORT_C))
+            os.remove(TEST_REPORT)
+
+    def test_pickle(self):
+        scenes = self.get_scenes(JsonTimeline3, NORMAL_AEON)
+        table = SceneTable(scenes)
+        table[max(scenes) + 1] = Scene()
+        restored = pickle.loads(pickle.dumps(table, pickle.HIGHEST_PROTOCOL))
+        self.assertIsInstance(restored, SceneTable)
+        self.assertEqual(self.get_variables(restored), self.get_variables(table))
+
+    def test_scenes_between(self):
+        scenes = self.get_scenes(CsvTimeline3, NORMAL_CSV)
+        table = SceneTable(scenes)
+        dates = sorted(set(scenes[scId].date for scId in scenes))
+        startDate = dates[1]
+        endDate = dates[-2]
+        expected = sorted((scId for scId in scenes if startDate <= scenes[scId].date <= endDate),
+                          key=lambda scId: scenes[scId].date)
+        self.assertTrue(expected)
+        self.assertEqual(table.get_scenes_between(startDate, endDate), expected)
+        scId = expected[0]
+        table[scId].date = dates[-1]
+        self.assertNotIn(scId, table.get_scenes_between(startDate, endDate))
+
+    def test_overflow(self):
+        table = SceneTable()
+        scene = Scene()
+        scene.date = '2020-02-30'
+        scene.time = '12:00'
+        scene.lastsDays = '05'
+        scene.status = -128
+        scene.isUnused = 1
+        scene.characters = ['1', 2]
+        scene.tags = ('Tag',)
+        table[3] = scene
+        self.assertEqual(self.get_variables(table), [(3, {name: getattr(scene, name) for name in Scene.__slots__})])
+        self.assertIs(table[3].isUnused, 1)
+        self.assertEqual(table.get_scenes_between('2020-02-01', '2020-03-01'), [3])
+        table[3].date = '2020-02-29'
+        self.assertEqual(table[3].date, '2020-02-29')
+        self.assertEqual(table.get_scenes_between('2020-02-01', '2020-02-29'), [3])
+
+    def test_lists(self):
+        table = SceneTable()
+        for scId in range(1, 4):
+            table[scId] = Scene()
+            table[scId].characters = [scId, scId + 1]
+        table[1].characters.append(5)
+        self.assertEqual(table[1].characters, [1, 2])
+        table[1].characters = [5]
+        table[2].characters = [6, 7, 8, 9]
+        table[3].characters = None
+        table[3].tags = ['Tag', 'Tag']
+        self.assertEqual([table[scId].characters for scId in table], [[5], [6, 7, 8, 9], None])
+        self.assertEqual(table[3].tags, ['Tag', 'Tag'])
+        for i in range(0x30000):
+            table[2].locations = [i] * (1 + i % 2)
+        self.assertEqual(table[2].locations, [0x2ffff, 0x2ffff])
+        self.assertEqual(table[2].characters, [6, 7, 8, 9])
+
+    def test_mapping(self):
+        table = SceneTable()
+        for scId in (2, 1, 5):
+            table[scId] = Scene()
+            table[scId].title = f'Scene {scId}'
+        table[1].sceneContent = 'Two words.'
+        self.assertEqual(table[1].wordCount, 2)
+        scene = Scene()
+        scene.title = 'New scene 5'
+        table[5] = scene
+        scene.title = 'Changed'
+        del table[2]
+        self.assertEqual(list(table), [1, 5])
+        self.assertEqual(len(table), 2)
+        self.assertNotIn(2, table)
+        self.assertNotIn('1', table)
+        with self.assertRaises(KeyError):
+            table[2]
+        with self.assertRaises(TypeError):
+            SceneTable({'1': Scene()})
+        self.assertEqual([scene.title for scene in table.values()], ['Scene 1', 'New scene 5'])
+
+    def tearDown(self):
+        remove_all_testfiles()
+        rmtree(TEST_CACHE, ignore_errors=True)
+
+
 def main():
     unittest.main()
 
@@ -0,0 +1,106 @@
+"""Unit test for the csv date/time parser.
+
+Compare the results with the former datetime based calculation.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import random
+import unittest
+from datetime import datetime
+from datetime import timedelta
+from aeon3ywlib.dt_helper import fix_iso_dt
+from aeon3ywlib.dt_helper import parse_iso_dt
+from aeon3ywlib.dt_helper import CACHE_SIZE
+
+
+def legacy_date_time(dateTimeStr):
+    """Return date and time strings as fixed before, or None."""
+    dateTimeStr = fix_iso_dt(dateTimeStr)
+    if dateTimeStr is None:
+        return None
+
+    return tuple(dateTimeStr.split(' ')[:2])
+
+
+def legacy_duration(startStr, endStr):
+    """Return the duration strings as calculated before."""
+    sceneDuration = datetime.fromisoformat(fix_iso_dt(endStr)) - datetime.fromisoformat(fix_iso_dt(startStr))
+    lastsHours = sceneDuration.seconds // 3600
+    lastsMinutes = (sceneDuration.seconds % 3600) // 60
+    return str(sceneDuration.days), str(lastsHours), str(lastsMinutes)
+
+
+def duration(startStr, endStr):
+    """Return the duration strings as calculated by CsvTimeline3."""
+    startSeconds = parse_iso_dt(startStr)[2]
+    endSeconds = parse_iso_dt(endStr)[2]
+    if startSeconds is None or endSeconds is None:
+        raise ValueError
+
+    lastsDays, sceneSeconds = divmod(endSeconds - startSeconds, 86400)
+    return str(lastsDays), str(sceneSeconds // 3600), str((sceneSeconds % 3600) // 60)
+
+
+class Equivalence(unittest.TestCase):
+    """Test case: Get the same results as with datetime."""
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.dateTimes = [
+            '',
+            'BC 20-01-01',
+            '99-12-31 23:59:59',
+            '100-01-01 00:00:00',
+            '2000-02-29',
+            '2000-02-29 12:30',
+            '2001-02-29 12:30:00',
+            '1900-6-1 20:38:00',
+            '1900-06-01 24:00:00',
+            '1900-06-01 20:38:00.5',
+            '1900-06',
+            '1900',
+            '9999-12-31 23:59:59',
+            ]
+        start = datetime(100, 1, 1)
+        for __ in range(500):
+            dateTime = start + timedelta(seconds=rng.randrange(300000000000))
+            self.dateTimes.append(dateTime.isoformat(' '))
+
+    def test_date_time(self):
+        for dateTimeStr in self.dateTimes:
+            dateTime = parse_iso_dt(dateTimeStr)
+            if dateTime is None:
+                self.assertIsNone(legacy_date_time(dateTimeStr))
+            else:
+                self.assertEqual(dateTime[:2], legacy_date_time(dateTimeStr))
+
+    def test_duration(self):
+        dateTimes = [dateTimeStr for dateTimeStr in self.dateTimes if parse_iso_dt(dateTimeStr) is not None]
+        for startStr in dateTimes:
+            for endStr in dateTimes[::25]:
+                try:
+                    expected = legacy_duration(startStr, endStr)
+                except ValueError:
+                    with self.assertRaises(ValueError):
+                        duration(startStr, endStr)
+                    continue
+
+                self.assertEqual(duration(startStr, endStr), expected)
+
+    def test_memo(self):
+        self.assertIs(parse_iso_dt('2000-02-29 12:30:15'), parse_iso_dt('2000-02-29 12:30:15'))
+        self.assertEqual(parse_iso_dt.cache_info().maxsize, CACHE_SIZE)
+
+    def test_invalid_year(self):
+        with self.assertRaises(ValueError):
+            parse_iso_dt('x-01-01 00:00:00')
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
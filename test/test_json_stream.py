@@ -0,0 +1,162 @@
+"""Unit test for the incremental JSON reader.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import json
+import unittest
+from aeon3ywlib.json_stream import JsonStream
+from aeon3ywlib.json_backends import BACKENDS
+
+DOCUMENT = {
+    'definitions': {'types': {'byId': {'t1': {'label': 'Event ÄÖÜ'}}}},
+    'data': {
+        'items': {'byId': {'i1': {'label': 'A {brace}', 'tags': [1, 2]}, 'i2': {'label': 'Quote " and ]', 'tags': []}}},
+        'mindmaps': {'m1': [1.5, -20, True, None]},
+        'tags': {'1': 'one', '2': 'two'},
+    },
+    'fileVersion': 12345,
+}
+HEADER = b'\x01\x00\x00\x00"{'
+PAYLOAD = b'\xff\xfe{binary'
+JSON_PART = b'{"label":"A {brace}","summary":"Quote \\" and }","notes":"\\\\","children":[{},{"id":"x"}]}'
+
+
+class JsonStreamReading(unittest.TestCase):
+    """Test case: Read selected values chunk by chunk."""
+
+    def setUp(self):
+        self.data = HEADER + json.dumps(DOCUMENT, ensure_ascii=False, indent=2).encode('utf-8') + PAYLOAD
+        self.start = len(HEADER)
+        self.targets = {
+            ('definitions',): False,
+            ('data', 'items', 'byId'): True,
+            ('data', 'tags'): False,
+            ('fileVersion',): False,
+            }
+        self.events = [
+            (('definitions',), None, DOCUMENT['definitions']),
+            (('data', 'items', 'byId'), 'i1', DOCUMENT['data']['items']['byId']['i1']),
+            (('data', 'items', 'byId'), 'i2', DOCUMENT['data']['items']['byId']['i2']),
+            (('data', 'tags'), None, DOCUMENT['data']['tags']),
+            (('fileVersion',), None, 12345),
+            ]
+
+    def test_events(self):
+        stream = JsonStream(self.data, self.start)
+        self.assertEqual(list(stream.iter_events(self.targets)), self.events)
+        self.assertEqual(stream.tell(), len(self.data) - len(PAYLOAD))
+
+    def test_chunk_boundaries(self):
+        for chunkSize in (1, 2, 3, 5, 64):
+            stream = JsonStream(self.data, self.start)
+            stream.CHUNK_SIZE = chunkSize
+            self.assertEqual(list(stream.iter_events(self.targets)), self.events)
+            self.assertEqual(stream.tell(), len(self.data) - len(PAYLOAD))
+
+    def test_text(self):
+        targets = dict(self.targets)
+        targets[('definitions',)] = None
+        targets[('fileVersion',)] = None
+        for chunkSize in (1, 2, 3, 5, 64):
+            stream = JsonStream(self.data, self.start)
+            stream.CHUNK_SIZE = chunkSize
+            events = list(stream.iter_events(targets))
+            self.assertEqual(json.loads(events[0][2]), DOCUMENT['definitions'])
+            self.assertEqual(events[-1][2], '12345')
+            self.assertEqual(events[1:-1], self.events[1:-1])
+
+    def test_array(self):
+        stream = JsonStream(b'[1, [2, 3], {"a": 4}, 56789]')
+        stream.CHUNK_SIZE = 2
+        values = []
+        for __ in stream.iter_array():
+            values.append(stream.read_value())
+        self.assertEqual(values, [1, [2, 3], {'a': 4}, 56789])
+
+    def test_every_chunk_size(self):
+        data = json.dumps({'a': 12345.5, 'b': 1, 'c': [-0.25e-3, 6E+2, 7], 'd': 'x', 'e': 1e10}).encode('utf-8')
+        for chunkSize in range(1, len(data) + 1):
+            stream = JsonStream(data)
+            stream.CHUNK_SIZE = chunkSize
+            self.assertEqual(stream.read_value(), json.loads(data), chunkSize)
+            stream = JsonStream(data)
+            stream.CHUNK_SIZE = chunkSize
+            values = {}
+            for key in stream.iter_object():
+                if key in ('a', 'c'):
+                    stream.skip_value()
+                else:
+                    values[key] = stream.read_value()
+            self.assertEqual(values, {'b': 1, 'd': 'x', 'e': 1e10}, chunkSize)
+
+    def test_incomplete(self):
+        stream = JsonStream(self.data[:len(self.data) // 2], self.start)
+        with self.assertRaises(ValueError):
+            list(stream.iter_events(self.targets))
+
+    def test_invalid(self):
+        stream = JsonStream(b'{"data" "items"}')
+        with self.assertRaises(ValueError):
+            list(stream.iter_events(self.targets))
+
+
+class JsonPartLocation(unittest.TestCase):
+    """Test case: Find the end of a project file's JSON part."""
+
+    def test_braces_within_strings(self):
+        data = HEADER + JSON_PART + PAYLOAD
+        for chunkSize in (1, 2, 3, 5, 64):
+            stream = JsonStream(data, len(HEADER))
+            stream.CHUNK_SIZE = chunkSize
+            stream.skip_value()
+            self.assertEqual(stream.tell(), len(HEADER) + len(JSON_PART), chunkSize)
+            self.assertEqual(json.loads(data[len(HEADER):stream.tell()]), json.loads(JSON_PART))
+
+    def test_incomplete_json_part(self):
+        for data in (JSON_PART[:-1], b'{"label":"}'):
+            stream = JsonStream(data)
+            with self.assertRaises(ValueError):
+                stream.skip_value()
+
+
+class JsonBackends(unittest.TestCase):
+    """Test case: Read with each decoder backend installed."""
+
+    def setUp(self):
+        self.data = HEADER + json.dumps(DOCUMENT, ensure_ascii=False).encode('utf-8') + PAYLOAD
+        self.targets = {
+            ('definitions',): False,
+            ('data', 'items', 'byId'): True,
+            ('data', 'mindmaps'): False,
+            }
+        self.backends = []
+        for backendClass in BACKENDS:
+            try:
+                self.backends.append(backendClass())
+            except ImportError:
+                pass
+
+    def test_events(self):
+        reference = list(JsonStream(self.data, len(HEADER)).iter_events(self.targets))
+        for backend in self.backends:
+            stream = JsonStream(self.data, len(HEADER), backend=backend)
+            stream.CHUNK_SIZE = 5
+            self.assertEqual(list(stream.iter_events(self.targets)), reference, backend.NAME)
+
+    def test_invalid(self):
+        for backend in self.backends:
+            with self.assertRaises(ValueError):
+                backend.loads('{"data": [1, 2}')
+            stream = JsonStream(b'{"data": {"items": [1, 2}}}', backend=backend)
+            with self.assertRaises(ValueError):
+                list(stream.iter_events({('data',): False}))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
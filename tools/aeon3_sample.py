@@ -0,0 +1,127 @@
+"""Provide a function for creating large Aeon Timeline 3 sample files.
+
+The sample is made of multiple copies of the test project's data,
+so it has the shape of test/data/normal.aeon scaled up.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import csv
+import json
+
+SOURCE_FILE = '../test/data/normal.aeon'
+CSV_SOURCE_FILE = '../test/data/normal.csv'
+
+
+def copy_narrative(node, suffix):
+    """Return a copy of a narrative node with modified IDs."""
+    children = []
+    for child in node['children']:
+        children.append(copy_narrative(child, suffix))
+    return {'children': children, 'id': f'{node["id"]}{suffix}'}
+
+
+def make_sample(targetPath, copies=10, payloadSize=0, sourcePath=SOURCE_FILE):
+    """Write a sample project file.
+
+    Positional arguments:
+        targetPath -- str: path of the sample file to create.
+
+    Optional arguments:
+        copies -- int: number of copies of the source project's items, relationships, and narrative.
+        payloadSize -- int: number of bytes appended after the JSON part, emulating attachments.
+        sourcePath -- str: path of the Aeon 3 project file to scale up.
+
+    Return the size of the sample file in bytes.
+    """
+    with open(sourcePath, 'rb') as f:
+        binInput = f.read()
+    start = binInput.find(b'{')
+    decoder = json.JSONDecoder()
+    jsonData, end = decoder.raw_decode(binInput[start:].decode('utf-8', errors='ignore'))
+    items = jsonData['data']['items']['byId']
+    relationships = jsonData['data']['relationships']['byId']
+    narrative = jsonData['data']['narrative']
+    newItems = {}
+    newRelationships = {}
+    newChildren = []
+    for i in range(copies):
+        suffix = f'-{i}' if i else ''
+        for uid in items:
+            item = dict(items[uid])
+            item['id'] = f'{uid}{suffix}'
+            newItems[item['id']] = item
+        for uid in relationships:
+            relationship = dict(relationships[uid])
+            relationship['id'] = f'{uid}{suffix}'
+            relationship['subject'] = f'{relationship["subject"]}{suffix}'
+            relationship['object'] = f'{relationship["object"]}{suffix}'
+            newRelationships[relationship['id']] = relationship
+        for child in narrative['children']:
+            newChildren.append(copy_narrative(child, suffix))
+    jsonData['data']['items']['byId'] = newItems
+    jsonData['data']['items']['allIds'] = list(newItems)
+    jsonData['data']['relationships']['byId'] = newRelationships
+    jsonData['data']['relationships']['allIds'] = list(newRelationships)
+    narrative['children'] = newChildren
+    with open(targetPath, 'wb') as f:
+        f.write(binInput[:start])
+        f.write(json.dumps(jsonData, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+        block = bytes(range(256)) * 4096
+        while payloadSize > 0:
+            f.write(block[:payloadSize])
+            payloadSize -= len(block)
+        return f.tell()
+
+
+def make_csv_sample(targetPath, copies=10, sourcePath=CSV_SOURCE_FILE):
+    """Write a sample csv export.
+
+    Positional arguments:
+        targetPath -- str: path of the sample file to create.
+
+    Optional arguments:
+        copies -- int: number of copies of the source export's records.
+        sourcePath -- str: path of the Aeon 3 csv export to scale up.
+
+    In each copy, the narrative positions are moved behind the previous copy's,
+    and characters, locations, and items are renamed along with the references to them.
+    Return the number of records written.
+    """
+    with open(sourcePath, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    header = rows[0]
+    typeCol = header.index('Type')
+    labelCol = header.index('Label')
+    positionCol = header.index('Narrative Position')
+    referenceCols = [i for i, label in enumerate(header) if label in ('Participant', 'Location', 'Item')]
+    elementTitles = set()
+    topLevels = 1
+    for row in rows[1:]:
+        if row[typeCol] in ('Character', 'Location', 'Item'):
+            elementTitles.add(row[labelCol])
+        if row[positionCol]:
+            topLevels = max(topLevels, int(row[positionCol].split(' ')[1].split('.')[0]))
+    with open(targetPath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(copies):
+            for row in rows[1:]:
+                row = list(row)
+                if i:
+                    if row[typeCol] in ('Character', 'Location', 'Item'):
+                        row[labelCol] = f'{row[labelCol]} ({i})'
+                    for col in referenceCols:
+                        titles = row[col].split(',')
+                        for j, title in enumerate(titles):
+                            if title in elementTitles:
+                                titles[j] = f'{title} ({i})'
+                        row[col] = ','.join(titles)
+                    if row[positionCol]:
+                        marker, position = row[positionCol].split(' ')
+                        numbers = position.split('.')
+                        numbers[0] = str(int(numbers[0]) + i * topLevels)
+                        row[positionCol] = f'{marker} {".".join(numbers)}'
+                writer.writerow(row)
+    return copies * (len(rows) - 1)
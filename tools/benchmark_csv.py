@@ -0,0 +1,68 @@
+"""Benchmark for reading Aeon Timeline 3 csv exports.
+
+Measure the time for reading a scaled-up sample of the test project's
+csv export with CsvTimeline3.
+
+usage: benchmark_csv.py [Copies] [Repetitions]
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import sys
+import timeit
+import tempfile
+
+SRC = '../src/'
+COPIES = 600
+REPETITIONS = 3
+
+sys.path.insert(0, SRC)
+from aeon3md_ import SETTINGS
+from aeon3md_ import OPTIONS
+from aeon3ywlib.csv_timeline3 import CsvTimeline3
+from aeon3_sample import make_csv_sample
+
+
+def time_read(samplePath, repetitions, **kwargs):
+    """Return the shortest time in seconds for reading the sample, and the field memos."""
+    settings = dict(SETTINGS)
+    settings.update(OPTIONS)
+    settings.update(kwargs)
+
+    fieldMemos = {}
+
+    def read():
+        source = CsvTimeline3(samplePath, **settings)
+        message = source.read()
+        if message.startswith('!'):
+            raise RuntimeError(message)
+
+        fieldMemos.update(source.fieldMemos)
+
+    return min(timeit.repeat(read, number=1, repeat=repetitions)), fieldMemos
+
+
+def run(copies, repetitions):
+    with tempfile.TemporaryDirectory() as tempDir:
+        samplePath = f'{tempDir}/sample.csv'
+        records = make_csv_sample(samplePath, copies)
+        print(f'Sample: {copies} copies, {records} records, {repetitions} repetitions')
+        readTime, fieldMemos = time_read(samplePath, repetitions)
+        print(f'read: {readTime * 1000:8.1f} ms')
+        parallelTime, __ = time_read(samplePath, repetitions, parallel_csv=True)
+        print(f'read in parallel: {parallelTime * 1000:8.1f} ms')
+        for kind, fieldMemo in fieldMemos.items():
+            hitRate = fieldMemo.get_hit_rate()
+            if hitRate is not None:
+                print(f'{kind:>10} memo: {fieldMemo.hits} hits, {fieldMemo.misses} misses, hit rate {hitRate:.1%}')
+
+
+if __name__ == '__main__':
+    copies = COPIES
+    repetitions = REPETITIONS
+    if len(sys.argv) > 1:
+        copies = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        repetitions = int(sys.argv[2])
+    run(copies, repetitions)
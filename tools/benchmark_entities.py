@@ -0,0 +1,82 @@
+"""Report the memory used per model entity.
+
+For each entity class, create many instances with the instance variables
+set by an Aeon import, and report the traced memory per instance.
+The values assigned are shared among the instances, so only the
+instances' own memory is counted.
+
+usage: benchmark_entities.py [Count]
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import sys
+import tracemalloc
+
+SRC = '../src/'
+COUNT = 100000
+
+sys.path.insert(0, SRC)
+from pywriter.model.scene import Scene
+from pywriter.model.chapter import Chapter
+from pywriter.model.character import Character
+from pywriter.model.world_element import WorldElement
+
+SCENE_VALUES = dict(
+    title='Title',
+    desc='Description',
+    sceneNotes='Notes',
+    isNotesScene=False,
+    status=1,
+    date='1934-12-31',
+    time='12:00:00',
+    lastsDays='0',
+    lastsHours='1',
+    lastsMinutes='30',
+    )
+CHAPTER_VALUES = dict(
+    title='Chapter',
+    desc='Description',
+    chLevel=0,
+    )
+CHARACTER_VALUES = dict(
+    title='Name',
+    desc='Description',
+    bio='Summary',
+    notes='Notes',
+    )
+ELEMENT_VALUES = dict(
+    title='Name',
+    desc='Description',
+    )
+
+
+def measure(entityClass, values, count):
+    """Return the traced memory per instance in bytes."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = []
+    for __ in range(count):
+        entity = entityClass()
+        for attribute, value in values.items():
+            setattr(entity, attribute, value)
+        entities.append(entity)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def run(count):
+    print(f'{count} instances per class')
+    for entityClass, values in ((Scene, SCENE_VALUES), (Chapter, CHAPTER_VALUES),
+                                (Character, CHARACTER_VALUES), (WorldElement, ELEMENT_VALUES)):
+        bytesPerInstance = measure(entityClass, values, count)
+        print(f'{entityClass.__name__:>12}: {bytesPerInstance:6.0f} bytes per instance')
+
+
+if __name__ == '__main__':
+    count = COUNT
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    run(count)
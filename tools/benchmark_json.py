@@ -0,0 +1,82 @@
+"""Benchmark for the JSON decoder backends.
+
+Compare the backends installed on a scaled-up sample of the test project:
+- whole: decoding the whole JSON part at once.
+- stream: reading the project with JsonTimeline3, decoding the values one by one.
+
+usage: benchmark_json.py [Copies] [Repetitions]
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import sys
+import timeit
+import tempfile
+
+SRC = '../src/'
+COPIES = 50
+REPETITIONS = 3
+
+sys.path.insert(0, SRC)
+from aeon3md_ import SETTINGS
+from aeon3md_ import OPTIONS
+from aeon3ywlib.json_backends import BACKENDS
+from aeon3ywlib.json_timeline3 import JsonTimeline3
+from aeon3_sample import make_sample
+from benchmark_scan_file import stream_scan
+
+
+def time_whole(backend, jsonText, repetitions):
+    """Return the shortest time in seconds for decoding the whole JSON text."""
+    return min(timeit.repeat(lambda: backend.loads(jsonText), number=1, repeat=repetitions))
+
+
+def time_stream(backendName, samplePath, repetitions):
+    """Return the shortest time in seconds for reading the sample with JsonTimeline3."""
+    kwargs = dict(SETTINGS)
+    kwargs.update(OPTIONS)
+    kwargs['json_backend'] = backendName
+
+    def read():
+        JsonTimeline3._schemaCache.clear()
+        source = JsonTimeline3(samplePath, **kwargs)
+        message = source.read()
+        if message.startswith('!'):
+            raise RuntimeError(message)
+
+    return min(timeit.repeat(read, number=1, repeat=repetitions))
+
+
+def run(copies, repetitions):
+    with tempfile.TemporaryDirectory() as tempDir:
+        samplePath = f'{tempDir}/sample.aeon'
+        size = make_sample(samplePath, copies)
+        with open(samplePath, 'rb') as f:
+            data = f.read()
+        jsonText = stream_scan(data).decode('utf-8')
+        print(f'Sample: {copies} copies, {size} bytes, {repetitions} repetitions')
+        for backendName in ['auto'] + [backendClass.NAME for backendClass in BACKENDS]:
+            wholeTime = ''
+            for backendClass in BACKENDS:
+                if backendClass.NAME == backendName:
+                    try:
+                        backend = backendClass()
+                    except ImportError:
+                        print(f'{backendName:>8}: not installed')
+                        break
+
+                    wholeTime = f'whole {time_whole(backend, jsonText, repetitions) * 1000:8.1f} ms, '
+            else:
+                streamTime = time_stream(backendName, samplePath, repetitions)
+                print(f'{backendName:>8}: {wholeTime}stream {streamTime * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    copies = COPIES
+    repetitions = REPETITIONS
+    if len(sys.argv) > 1:
+        copies = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        repetitions = int(sys.argv[2])
+    run(copies, repetitions)
@@ -0,0 +1,151 @@
+"""Report the peak memory usage when reading a large project.
+
+Each reading mode runs in a separate process, whose peak resident set size is reported.
+- legacy: the former byte-by-byte scanning loop, building a list of ints.
+- read: aeon3_fop.open_file() reading the whole file, and decoding the JSON part.
+- mmap: aeon3_fop.open_file() mapping the file, and decoding the JSON part.
+- tree: as mmap, and json.loads(), decoding the whole JSON document.
+- model: JsonTimeline3.read(), building the novel model while reading the JSON part.
+- phases: JsonTimeline3.read(), reporting the high-water mark of each phase of reading.
+
+usage: benchmark_memory.py [Copies] [PayloadMB]
+
+Note: The resource module is only available on Unix-like systems.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import subprocess
+import resource
+import json
+import codecs
+import tracemalloc
+
+SRC = '../src/'
+SAMPLE_FILE = 'large_sample.aeon'
+COPIES = 20
+PAYLOAD_MB = 200
+
+sys.path.insert(0, SRC)
+from aeon3ywlib.aeon3_fop import open_file
+from aeon3ywlib.json_timeline3 import JsonTimeline3
+from aeon3md_ import SETTINGS
+from aeon3md_ import OPTIONS
+from aeon3_sample import make_sample
+from benchmark_scan_file import legacy_scan
+from benchmark_scan_file import stream_scan
+
+
+def read_legacy(filePath):
+    with open(filePath, 'rb') as f:
+        binInput = f.read()
+    jsonStr = codecs.decode(legacy_scan(binInput), encoding='utf-8')
+    return f'JSON part {len(jsonStr) / 1e6:.1f} MB'
+
+
+def get_json_text(filePath, useMmap):
+    """Return the decoded JSON part of the project file."""
+    data = open_file(filePath, useMmap)
+    try:
+        return codecs.decode(stream_scan(data), encoding='utf-8')
+
+    finally:
+        if useMmap:
+            data.close()
+
+
+def read_file(filePath):
+    return f'JSON part {len(get_json_text(filePath, False)) / 1e6:.1f} MB'
+
+
+def map_json(filePath):
+    return f'JSON part {len(get_json_text(filePath, True)) / 1e6:.1f} MB'
+
+
+def decode_tree(filePath):
+    jsonData = json.loads(get_json_text(filePath, True))
+    return f'{len(jsonData["data"]["items"]["byId"])} items'
+
+
+def read_model(filePath):
+    kwargs = dict(SETTINGS)
+    kwargs.update(OPTIONS)
+    source = JsonTimeline3(filePath, **kwargs)
+    source.read()
+    return f'{len(source.scenes)} scenes'
+
+
+class PhaseMonitor(JsonTimeline3):
+    """JsonTimeline3 reporting the memory usage at the end of each phase of reading."""
+
+    def _end_phase(self, phase):
+        """Print the phase's peak of traced memory, and the peak RSS so far.
+
+        Overrides the superclass method.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        print(f'{phase:>25}: traced peak {peak / 1e6:.1f} MB, current {current / 1e6:.1f} MB, peak RSS {peak_rss():.1f} MB')
+
+
+def read_phases(filePath):
+    kwargs = dict(SETTINGS)
+    kwargs.update(OPTIONS)
+    source = PhaseMonitor(filePath, **kwargs)
+    tracemalloc.start()
+    source.read()
+    tracemalloc.stop()
+    return f'{len(source.scenes)} scenes'
+
+
+MODES = dict(
+    legacy=read_legacy,
+    read=read_file,
+    mmap=map_json,
+    tree=decode_tree,
+    model=read_model,
+    phases=read_phases,
+)
+
+
+def peak_rss():
+    """Return the peak resident set size of the current process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode, filePath):
+    """Read the file and print the peak RSS before and after."""
+    before = peak_rss()
+    result = MODES[mode](filePath)
+    print(f'{mode:>7}: {result}, peak RSS {before:.1f} MB before, {peak_rss():.1f} MB after')
+
+
+def run(copies, payloadMb):
+    # Create the sample in a separate process, so the peak RSS is not passed on to the measuring processes.
+    subprocess.run([sys.executable, __file__, '--make', str(copies), str(payloadMb)], check=True)
+    try:
+        for mode in MODES:
+            subprocess.run([sys.executable, __file__, '--measure', mode, SAMPLE_FILE], check=True)
+    finally:
+        os.remove(SAMPLE_FILE)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        measure(sys.argv[2], sys.argv[3])
+    elif len(sys.argv) > 1 and sys.argv[1] == '--make':
+        copies = int(sys.argv[2])
+        payloadMb = int(sys.argv[3])
+        size = make_sample(SAMPLE_FILE, copies, payloadMb * 1024 * 1024)
+        print(f'Sample file: {size / 1e6:.1f} MB ({copies} copies, {payloadMb} MB binary payload)')
+    else:
+        copies = COPIES
+        payloadMb = PAYLOAD_MB
+        if len(sys.argv) > 1:
+            copies = int(sys.argv[1])
+        if len(sys.argv) > 2:
+            payloadMb = int(sys.argv[2])
+        run(copies, payloadMb)
@@ -0,0 +1,115 @@
+"""Benchmark for reading Aeon Timeline 3 project files.
+
+Read a scaled-up sample of the test project once per export target,
+restricting the novel model to the parts the target needs.
+Then read the sample again, replaying the JSON values decoded before,
+so as to get the item ingestion throughput without the decoding time.
+
+usage: benchmark_read.py [Copies] [Repetitions]
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import sys
+import timeit
+import tempfile
+
+SRC = '../src/'
+COPIES = 50
+REPETITIONS = 3
+
+sys.path.insert(0, SRC)
+from aeon3md_ import SETTINGS
+from aeon3md_ import OPTIONS
+from aeon3ywlib import json_timeline3
+from aeon3ywlib.json_timeline3 import JsonTimeline3
+from aeon3ywlib.json_stream import JsonStream
+from aeon3mdlib.aeon3md_converter import Aeon3mdConverter
+from aeon3_sample import make_sample
+
+
+def count_items(samplePath):
+    """Return the number of items in the sample's JSON part."""
+    source = JsonTimeline3(samplePath, **SETTINGS, **OPTIONS)
+    source.read()
+    return len(source.scenes) + len(source.chapters) + len(source.characters) + len(source.locations) + len(source.items)
+
+
+def time_read(samplePath, modelParts, repetitions):
+    """Return the shortest time in seconds for reading the sample."""
+
+    def read():
+        source = JsonTimeline3(samplePath, model_parts=modelParts, **SETTINGS, **OPTIONS)
+        message = source.read()
+        if message.startswith('ERROR'):
+            raise RuntimeError(message)
+
+    return min(timeit.repeat(read, number=1, repeat=repetitions))
+
+
+class ReplayStream:
+    """Stand-in for JsonStream, yielding the values recorded before."""
+    events = []
+
+    def __init__(self, data, start=0, end=None, backend=None):
+        pass
+
+    def iter_events(self, targets):
+        for event in self.events:
+            if event[0] in targets:
+                yield event
+
+
+def time_ingestion(samplePath, repetitions):
+    """Return the shortest time in seconds for converting the sample's items without decoding, and the number of items.
+
+    Relationships are not read.
+    """
+    targets = {
+        ('definitions',): None,
+        ('data', 'items', 'byId'): True,
+        ('data', 'relationships', 'byId'): True,
+        ('data', 'narrative'): False,
+        ('data', 'tags'): False,
+        }
+    with open(samplePath, 'rb') as f:
+        data = f.read()
+    ReplayStream.events = list(JsonStream(data, data.find(b'{')).iter_events(targets))
+    itemCount = 0
+    for path, __, __ in ReplayStream.events:
+        if path == ('data', 'items', 'byId'):
+            itemCount += 1
+    json_timeline3.JsonStream = ReplayStream
+    try:
+        modelParts = [part for part in JsonTimeline3.MODEL_PARTS if part != 'relationships']
+        seconds = time_read(samplePath, modelParts, repetitions)
+    finally:
+        json_timeline3.JsonStream = JsonStream
+    return seconds, itemCount
+
+
+def run(copies, repetitions):
+    with tempfile.TemporaryDirectory() as tempDir:
+        samplePath = f'{tempDir}/sample.aeon'
+        size = make_sample(samplePath, copies)
+        itemCount = count_items(samplePath)
+        print(f'Sample: {copies} copies, {size} bytes, {itemCount} model elements, {repetitions} repetitions')
+        targets = [('(all parts)', JsonTimeline3.MODEL_PARTS)]
+        for fileClass in Aeon3mdConverter.EXPORT_TARGET_CLASSES:
+            targets.append((fileClass.SUFFIX, fileClass.MODEL_PARTS))
+        for suffix, modelParts in targets:
+            seconds = time_read(samplePath, modelParts, repetitions)
+            print(f'{suffix:20} {seconds * 1000:8.1f} ms {itemCount / seconds:10.0f} items/s')
+        seconds, jsonItemCount = time_ingestion(samplePath, repetitions)
+        print(f'Item ingestion only: {seconds * 1000:.1f} ms for {jsonItemCount} items, {jsonItemCount / seconds:.0f} items/s')
+
+
+if __name__ == '__main__':
+    copies = COPIES
+    repetitions = REPETITIONS
+    if len(sys.argv) > 1:
+        copies = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        repetitions = int(sys.argv[2])
+    run(copies, repetitions)
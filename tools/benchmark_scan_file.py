@@ -0,0 +1,70 @@
+"""Micro-benchmark for locating the JSON part of an Aeon 3 project file.
+
+Compare the former byte-by-byte scanning loop with skipping the JSON part
+by a JsonStream, as JsonTimeline3 does when writing the sidecar offset index.
+
+usage: benchmark_scan_file.py [Sourcefile] [Repetitions]
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import sys
+import timeit
+
+SRC = '../src/'
+SOURCE_FILE = '../test/data/normal.aeon'
+REPETITIONS = 10
+
+sys.path.insert(0, SRC)
+from aeon3ywlib.json_stream import JsonStream
+
+
+def legacy_scan(binInput):
+    """Return the JSON part as located by the former scanning loop."""
+    chrData = []
+    opening = ord('{')
+    closing = ord('}')
+    level = 0
+    for c in binInput:
+        if c == opening:
+            level += 1
+        if level > 0:
+            chrData.append(c)
+            if c == closing:
+                level -= 1
+                if level == 0:
+                    break
+    return bytes(chrData)
+
+
+def stream_scan(binInput):
+    """Return the JSON part as located by a JsonStream."""
+    start = binInput.find(b'{')
+    if start < 0:
+        return b''
+
+    stream = JsonStream(binInput, start)
+    stream.skip_value()
+    return binInput[start:stream.tell()]
+
+
+def run(sourcePath, repetitions):
+    with open(sourcePath, 'rb') as f:
+        binInput = f.read()
+    if legacy_scan(binInput) != stream_scan(binInput):
+        print('Warning: The results differ (braces within strings?).')
+    print(f'File size: {len(binInput)} bytes, {repetitions} repetitions')
+    for name, scan in (('Legacy loop', legacy_scan), ('JsonStream', stream_scan)):
+        seconds = min(timeit.repeat(lambda: scan(binInput), number=repetitions, repeat=3)) / repetitions
+        print(f'{name}: {seconds * 1000:.2f} ms per scan, {len(binInput) / seconds / 1e6:.1f} MB/s')
+
+
+if __name__ == '__main__':
+    sourcePath = SOURCE_FILE
+    repetitions = REPETITIONS
+    if len(sys.argv) > 1:
+        sourcePath = sys.argv[1]
+    if len(sys.argv) > 2:
+        repetitions = int(sys.argv[2])
+    run(sourcePath, repetitions)
@@ -0,0 +1,127 @@
+"""Benchmark for holding the scenes in a SceneTable.
+
+Compare the scenes dictionary with the columnar SceneTable:
+- storage: the traced memory per scene, with the instance variables set by
+  an Aeon import. The values assigned are shared among the scenes, so only
+  the storage's own memory is counted.
+- read: reading a scaled-up sample of the test project's csv export,
+  with and without the scene_table option.
+- held: the memory held by the scenes read, i.e. released when dropping them.
+- scan: finding the scenes of the sample dated within a period;
+  for the table, the first query, which sorts the dates, and further queries.
+
+usage: benchmark_scene_table.py [Copies] [Repetitions]
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3md
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import gc
+import sys
+import timeit
+import tempfile
+import tracemalloc
+
+SRC = '../src/'
+COPIES = 600
+REPETITIONS = 3
+COUNT = 100000
+START_DATE = '1900-01-01'
+END_DATE = '1949-12-31'
+
+sys.path.insert(0, SRC)
+from aeon3md_ import SETTINGS
+from aeon3md_ import OPTIONS
+from pywriter.model.scene import Scene
+from aeon3ywlib.csv_timeline3 import CsvTimeline3
+from aeon3ywlib.scene_table import SceneTable
+from aeon3_sample import make_csv_sample
+from benchmark_entities import SCENE_VALUES
+
+
+def measure_storage(scenes, count):
+    """Return the traced memory per scene in bytes."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for scId in range(1, count + 1):
+        scene = Scene()
+        for attribute, value in SCENE_VALUES.items():
+            setattr(scene, attribute, value)
+        scenes[scId] = scene
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def read(samplePath, sceneTable):
+    """Return the scenes of a CsvTimeline3 instance with the sample read."""
+    settings = dict(SETTINGS)
+    settings.update(OPTIONS)
+    settings['scene_table'] = sceneTable
+    source = CsvTimeline3(samplePath, **settings)
+    message = source.read()
+    if message.startswith('!'):
+        raise RuntimeError(message)
+
+    return source.scenes
+
+
+def measure_scenes(samplePath, sceneTable):
+    """Return the traced memory per scene held by the scenes read."""
+    tracemalloc.start()
+    scenes = read(samplePath, sceneTable)
+    gc.collect()
+    sceneCount = len(scenes)
+    before = tracemalloc.get_traced_memory()[0]
+    scenes = None
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (before - after) / sceneCount
+
+
+def scan_dict(scenes):
+    """Return the IDs of the scenes dated within the period, looking at each scene."""
+    scIds = []
+    for scId in scenes:
+        scDate = scenes[scId].date
+        if scDate is not None and START_DATE <= scDate <= END_DATE:
+            scIds.append(scId)
+    return scIds
+
+
+def scan_table(scenes):
+    """Return the IDs of the scenes dated within the period, looking them up in the date index."""
+    return scenes.get_scenes_between(START_DATE, END_DATE)
+
+
+def run(copies, repetitions):
+    print(f'Storage: {COUNT} scenes')
+    dictBytes = measure_storage({}, COUNT)
+    tableBytes = measure_storage(SceneTable(), COUNT)
+    print(f'  dict: {dictBytes:6.0f} bytes per scene')
+    print(f' table: {tableBytes:6.0f} bytes per scene')
+    with tempfile.TemporaryDirectory() as tempDir:
+        samplePath = f'{tempDir}/sample.csv'
+        make_csv_sample(samplePath, copies)
+        print(f'Sample: {copies} copies, {repetitions} repetitions')
+        for name, sceneTable, scan in (('dict', False, scan_dict), ('table', True, scan_table)):
+            readTime = min(timeit.repeat(lambda: read(samplePath, sceneTable), number=1, repeat=repetitions))
+            sceneBytes = measure_scenes(samplePath, sceneTable)
+            scenes = read(samplePath, sceneTable)
+            firstTime = timeit.timeit(lambda: scan(scenes), number=1)
+            scanTime = min(timeit.repeat(lambda: scan(scenes), number=1, repeat=repetitions))
+            found = len(scan(scenes))
+            print(f'{name:>6}: read {readTime * 1000:8.1f} ms, {sceneBytes:6.0f} bytes per scene held, '
+                  f'scan {firstTime * 1000:8.1f} ms first, {scanTime * 1000:8.3f} ms then '
+                  f'({found} of {len(scenes)} scenes)')
+
+
+if __name__ == '__main__':
+    copies = COPIES
+    repetitions = REPETITIONS
+    if len(sys.argv) > 1:
+        copies = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        repetitions = int(sys.argv[2])
+    run(copies, repetitions)